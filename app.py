@@ -2,34 +2,284 @@
 
 import streamlit as st
 from streamlit_option_menu import option_menu
-from long_term_investment_programming import run_optimization
+from long_term_investment_programming import SOLVED_STATUSES, available_solvers, run_optimization
+from heuristic import mip_start
+from optimization_jobs import CANCELLED, FAILED, JobManager
+from result_cache import ResultCache, cache_key
+from frontier import budget_frontier
+from result_tables import result_frames
+from charts import (AGGREGATE_THRESHOLD, benefit_chart, benefit_distribution_chart, completion_distribution_chart,
+                    expenditure_chart, portfolio_spending_chart, selection_frequency_chart, should_aggregate)
+from robustness import DISTRIBUTIONS, robustness_analysis, robustness_frames
+from data_store import DataStore
+from bulk_io import FILE_FORMATS, budget_table, projects_table, read_budget, read_projects, table_bytes
 import pandas as pd
 import plotly.express as px
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
-import json
 import os
 import time
+import uuid
 
 # --- Functions for Data Persistence ---
 def load_data():
-    """Load projects and budget data from JSON files into session state."""
-    if os.path.exists('projects.json'):
-        with open('projects.json', 'r') as f:
-            st.session_state.projects = json.load(f)
-    if os.path.exists('budget.json'):
-        with open('budget.json', 'r') as f:
-            st.session_state.budget = json.load(f)
-
-def save_data():
-    """Save projects and budget data from session state to JSON files."""
-    with open('projects.json', 'w') as f:
-        json.dump(st.session_state.projects, f)
-    with open('budget.json', 'w') as f:
-        json.dump(st.session_state.budget, f)
+    """Load projects and budget data from the data store into session state if they changed since the last load."""
+    store = get_data_store()
+    if store.revision() == 0:
+        # First start: keep the default portfolio
+        store.replace_all(st.session_state.projects, st.session_state.budget)
+    if st.session_state.get('data_revision') == store.revision():
+        return
+    st.session_state.projects, st.session_state.budget, st.session_state.data_revision = store.load()
+
+@st.cache_resource
+def get_data_store():
+    """Data store shared by all sessions of this server. Data saved as JSON files by earlier versions is imported once."""
+    store = DataStore("investment.db")
+    store.import_json('projects.json', 'budget.json')
+    return store
+
+@st.cache_resource
+def get_result_cache():
+    """Result cache shared by all sessions of this server, persisted under .cache/results."""
+    return ResultCache(max_entries=256, directory=os.path.join(".cache", "results"))
+
+@st.cache_resource
+def get_job_manager():
+    """Background optimization jobs shared by all sessions of this server."""
+    return JobManager(max_workers=2)
+
+@st.cache_resource
+def get_available_solvers():
+    """Solver backends installed on this server, checked once."""
+    return available_solvers()
+
+def add_result_summary(results, computation_time):
+    """Add computation time, funded project count and average ROI to a result dict."""
+    results['computation_time'] = computation_time
+    results['funded_projects_count'] = len([
+        k for k, v in (results.get('projects') or {}).items() 
+        if v.get('completion_year') != "NOT FUNDED"
+    ])
+    results['average_roi'] = (
+        sum([v.get("ROI", 0) for v in (results.get('projects') or {}).values()]) / 
+        len(results['projects']) if results.get('projects') else 0
+    )
+    return results
+
+def collect_finished_job():
+    """Move the result of this session's background job into session state once it is done."""
+    job_info = st.session_state.job
+    if job_info is None:
+        return
+    job = get_job_manager().get(job_info["id"])
+    if job is None or not job.done:
+        if job is None:
+            st.session_state.job = None
+        return
+
+    st.session_state.job = None
+    st.session_state.job_outcome = {"status": job.status, "error": job.error}
+    if job_info["capture_log"]:
+        st.session_state.solver_log = job.log()
+    if job.status in (CANCELLED, FAILED):
+        if job.status == FAILED:
+            st.session_state.results = None
+            st.session_state.last_solution = None
+        return
+
+    results = job.result
+    if results["status"] == "Optimal":
+        get_result_cache().put(job_info["key"], results)
+    if job.solution is not None:
+        st.session_state.last_solution = job.solution
+    st.session_state.results = add_result_summary(results, job.elapsed())
+    get_data_store().save_result(job_info["key"], st.session_state.results)
+
+def show_result_status(results):
+    """Report the outcome of an optimization run."""
+    if "windows" in results:
+        # Rolling horizon plans are Feasible unless they meet the bound of the full model
+        if results["gap"] is not None:
+            st.info(f"Plan found in {results['windows']} windows. It is at most {results['gap']:.1%} below the optimum (dual bound {results['bound']:.2f}).")
+        else:
+            st.info(f"Plan found in {results['windows']} windows. No bound on its distance to the optimum is available.")
+    elif results["status"] == "Optimal":
+        st.success("Optimization completed successfully.")
+    elif results["status"] == "Feasible":
+        st.warning("The time limit was reached. The best solution found so far is shown; it may not be optimal.")
+    else:
+        st.warning("Optimization completed, but no optimal solution was found.")
+
+def show_performance(performance):
+    """Show the phase timings, model size, solver statistics and memory of the run that produced a result."""
+    with st.expander("Performance"):
+        st.write("Measured when the result was computed; cached results show the figures of their original run.")
+        phases = pd.DataFrame(
+            [(name, seconds) for name, seconds in performance["phases"].items()],
+            columns=["Phase", "Seconds"],
+        )
+        phases["Share (%)"] = phases["Seconds"] / performance["total"] * 100 if performance["total"] else 0.0
+        st.dataframe(phases, hide_index=True, use_container_width=True)
+        st.caption(f"Total: {performance['total']:.3f} seconds.")
+
+        model = performance["model"]
+        solver = performance["solver"]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(label="Variables", value=f"{model.get('variables', '–')}")
+            st.metric(label="Solver Nodes", value=f"{solver.get('nodes', '–')}")
+        with col2:
+            st.metric(label="Constraints", value=f"{model.get('constraints', '–')}")
+            st.metric(label="Solver Iterations", value=f"{solver.get('iterations', '–')}")
+        with col3:
+            st.metric(label="Nonzeros", value=f"{model.get('nonzeros', '–')}")
+            peak = performance.get("peak_memory_mb")
+            st.metric(label="Peak Memory (MB)", value=f"{peak:.0f}" if peak is not None else "–")
+
+def show_job_progress():
+    """Show the status of this session's running background job with a cancel button."""
+    job_info = st.session_state.job
+    job = get_job_manager().get(job_info["id"]) if job_info else None
+    if job is None:
+        return
+    if job.done:
+        # Rerun the whole page so that the result is collected and displayed
+        rerun_app()
+        return
+
+    position = get_job_manager().queue_position(job.id)
+    if position:
+        st.info(f"Optimization queued (position {position}). It starts as soon as a worker is free.")
+    else:
+        st.info("Optimization running in the background. You can keep using the app; the result appears here when it is done.")
+    progress = job.progress()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Elapsed (Seconds)", value=f"{progress['elapsed']:.1f}")
+    with col2:
+        st.metric(label="Best Solution", value="–" if progress["incumbent"] is None else f"{progress['incumbent']:.2f}")
+    with col3:
+        st.metric(label="Best Bound", value="–" if progress["bound"] is None else f"{progress['bound']:.2f}")
+    with col4:
+        st.metric(label="Gap (%)", value="–" if progress["gap"] is None else f"{progress['gap'] * 100:.2f}")
+    if st.button("Cancel Optimization", key="cancel_job"):
+        get_job_manager().cancel(job.id)
+
+# Refresh the progress panel every second without rerunning the rest of the page
+if hasattr(st, 'fragment'):
+    show_job_progress = st.fragment(run_every=1)(show_job_progress)
+
+EXPORT_FILES = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/octet-stream"),
+    "excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+def show_import(label, reader, key):
+    """Upload and validate a CSV, Parquet or Excel file.
+
+    Returns (data, replace) when the user starts the import and the file can be read, None otherwise.
+    """
+    uploaded = st.file_uploader(f"Import {label} (CSV, Parquet or Excel)", type=["csv", "txt", "parquet", "xlsx"], key=f"{key}_upload")
+    mode = st.radio("Import Mode", ["Add or update", "Replace all"], horizontal=True, key=f"{key}_import_mode")
+    if uploaded is None or not st.button(f"Import {label}", key=f"{key}_import"):
+        return None
+    try:
+        data, errors = reader(uploaded)
+    except ValueError as e:
+        st.error(f"Error during import: {e}")
+        return None
+    if len(errors):
+        st.warning(f"{len(errors)} rows were rejected and not imported.")
+        st.dataframe(errors, use_container_width=True)
+    return data, mode == "Replace all"
+
+def show_export(frame, label, file_stem, key):
+    """Offer a table for download in the chosen file format."""
+    file_format = st.selectbox(f"Export Format for {label}", options=FILE_FORMATS, key=f"{key}_export_format")
+    if st.button(f"Prepare {label} Export", key=f"{key}_export"):
+        suffix, mime = EXPORT_FILES[file_format]
+        try:
+            data = table_bytes(frame, file_format)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.download_button(label=f"Download {label}", data=data, file_name=f"{file_stem}.{suffix}", mime=mime, key=f"{key}_download")
+
+def project_editor_changes(page_df, changes, projects):
+    """Translate the edits of the projects grid into rows to upsert and IDs to delete.
+
+    Returns (upserts, deletes, error); error is a message if the edits are invalid.
+    """
+    records = page_df.to_dict("records")
+    upserts, deletes = {}, [records[pos]["id"] for pos in changes["deleted_rows"]]
+    rows = [({**records[pos], **edits}, records[pos]["id"]) for pos, edits in changes["edited_rows"].items()]
+    rows += [(row, None) for row in changes["added_rows"]]
+    for row, old_id in rows:
+        project_id = str(row.get("id") or "").strip()
+        if project_id == "":
+            return None, None, "Project ID cannot be empty."
+        if row.get("cost") is None or row["cost"] <= 0:
+            return None, None, f"The cost of project {project_id} must be positive."
+        if row.get("benefit") is None or row["benefit"] < 0:
+            return None, None, f"The benefit of project {project_id} cannot be negative."
+        if project_id != old_id:
+            # New or renamed project
+            if project_id in upserts or (project_id in projects and project_id not in deletes):
+                return None, None, f"Project ID {project_id} already exists."
+            if old_id is not None:
+                deletes.append(old_id)
+        upserts[project_id] = {"cost": row["cost"], "benefit": row["benefit"]}
+    return upserts, deletes, None
+
+def budget_editor_changes(budget_df, changes):
+    """Translate the edits of the budget grid into years to upsert and years to delete.
+
+    Returns (upserts, deletes, error); upserts maps year to amount and error is a message if the edits are invalid.
+    """
+    records = budget_df.to_dict("records")
+    years = {record["year"] for record in records}
+    upserts, deletes = {}, [records[pos]["year"] for pos in changes["deleted_rows"]]
+    rows = [({**records[pos], **edits}, records[pos]["year"]) for pos, edits in changes["edited_rows"].items()]
+    rows += [(row, None) for row in changes["added_rows"]]
+    for row, old_year in rows:
+        if row.get("year") is None:
+            return None, None, "Year cannot be empty."
+        year = int(row["year"])
+        if row.get("amount") is None or row["amount"] < 0:
+            return None, None, f"The budget of year {year} cannot be negative."
+        if year != old_year:
+            if year in upserts or (year in years and year not in deletes):
+                return None, None, f"Year {year} already exists."
+            if old_year is not None:
+                deletes.append(old_year)
+        upserts[year] = row["amount"]
+    return upserts, deletes, None
+
+def get_result_frames():
+    """Per-project and long-format expenditure tables of the current result, built once per result."""
+    results = st.session_state.results
+    cached = st.session_state.get('result_frames')
+    if cached is None or cached[0] is not results:
+        cached = (results, *result_frames(results))
+        st.session_state.result_frames = cached
+    return cached[1], cached[2]
+
+def flash(message):
+    """Keep a success message to show after the next rerun."""
+    st.session_state.flash_message = message
+
+def show_flash():
+    """Show and clear the message kept by flash()."""
+    message = st.session_state.pop('flash_message', None)
+    if message:
+        st.success(message)
 
 def rerun_app():
     """Attempt to rerun the Streamlit app, if supported."""
-    if hasattr(st, 'experimental_rerun'):
+    if hasattr(st, 'rerun'):
+        st.rerun()
+    elif hasattr(st, 'experimental_rerun'):
         st.experimental_rerun()
     else:
         st.warning("UI update requires a manual restart of the app.")
@@ -73,17 +323,40 @@ if 'budget' not in st.session_state:
     ]
 
 if 'results' not in st.session_state:
-    st.session_state.results = None
+    st.session_state.results = get_data_store().latest_result()
+
+if 'last_solution' not in st.session_state:
+    st.session_state.last_solution = None
+
+if 'job' not in st.session_state:
+    st.session_state.job = None
+
+if 'session_id' not in st.session_state:
+    # Names this session's solver process in the job manager
+    st.session_state.session_id = uuid.uuid4().hex
+
+if 'job_outcome' not in st.session_state:
+    st.session_state.job_outcome = None
+
+if 'frontier' not in st.session_state:
+    st.session_state.frontier = None
+
+if 'robustness' not in st.session_state:
+    st.session_state.robustness = None
+
+if 'solver_log' not in st.session_state:
+    st.session_state.solver_log = None
 
 # --- Load Data on Start ---
 load_data()
+collect_finished_job()
 
 # --- Custom Navigation Menu with streamlit-option-menu ---
 with st.sidebar:
     selected = option_menu(
         menu_title="Navigation",  # Required
-        options=["Home", "Manage Projects", "Manage Budget", "Run Optimization", "View Results"],  # Added "Home"
-        icons=["house", "clipboard-data", "cash", "gear", "graph-up"],  # Customized Icons
+        options=["Home", "Manage Projects", "Manage Budget", "Run Optimization", "View Results", "Budget Frontier", "Robustness"],  # Added "Home"
+        icons=["house", "clipboard-data", "cash", "gear", "graph-up", "bar-chart-line", "shuffle"],  # Customized Icons
         menu_icon="cast",  # Optional
         default_index=0,  # Optional
         styles={
@@ -108,7 +381,7 @@ if selected == "Home":
     - **[Plotly Express](https://plotly.com/python/plotly-express/):** For creating appealing charts and visualizations.
     - **[Pandas](https://pandas.pydata.org/):** For data manipulation and analysis.
     - **[st_aggrid](https://github.com/PablocFonseca/streamlit-aggrid):** For interactive tables and data displays.
-    - **[JSON](https://docs.python.org/3/library/json.html):** For data storage and loading.
+    - **[SQLite](https://www.sqlite.org/):** For storing projects, budgets and results.
     
     ### **Mathematical Foundations and Formulas**
     
@@ -164,53 +437,69 @@ elif selected == "Manage Projects":
     st.header("Manage Projects")
     st.write("In this section, you can edit existing projects, add new projects, or delete existing ones. Each project has specific costs and benefits used for optimization calculations.")
 
+    # --- Import and Export Projects ---
+    with st.expander("Import and Export Projects"):
+        st.write("Import projects from a file with the columns **id**, **cost** and **benefit**. Rows with a missing or duplicate ID, a cost that is not positive or a negative benefit are reported and skipped.")
+        imported = show_import("Projects", read_projects, "projects")
+        if imported is not None:
+            projects, replace = imported
+            store = get_data_store()
+            if replace:
+                store.replace_projects(projects)
+            else:
+                store.upsert_projects(projects)
+            st.session_state.projects, st.session_state.budget, st.session_state.data_revision = store.load()
+            st.success(f"{len(projects)} projects have been imported.")
+        show_export(projects_table(st.session_state.projects), "Projects", "projects", "projects")
+
     # --- Edit Existing Projects ---
     st.subheader("Edit Existing Projects")
-    for project_id, details in list(st.session_state.projects.items()):
-        with st.expander(f"Edit Project {project_id}"):
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                new_cost = st.number_input(
-                    f"Cost (k PLN) for Project {project_id}",
-                    value=int(details["cost"]),
-                    step=10,
-                    key=f"cost_{project_id}"
-                )
-            with col2:
-                new_benefit = st.number_input(
-                    f"Benefit for Project {project_id}",
-                    value=int(details["benefit"]),
-                    step=1,
-                    key=f"benefit_{project_id}"
-                )
-            with col3:
-                update_button = st.button(f"Update Project {project_id}", key=f"update_{project_id}")
+    st.write("Edit costs, benefits and IDs directly in the table, add rows at the bottom or select rows and press Delete to remove them. Changes are saved together when you click **Save Changes**.")
+    show_flash()
+    projects_df = projects_table(st.session_state.projects)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        id_filter = st.text_input("Filter by Project ID", key="projects_filter")
+    with col2:
+        page_size = st.selectbox("Rows per Page", options=[25, 50, 100, 250], key="projects_page_size")
+    if id_filter:
+        projects_df = projects_df[projects_df["id"].str.contains(id_filter, case=False, regex=False)]
+    num_pages = max(1, -(-len(projects_df) // page_size))
+    # Only the current page is sent to the browser
+    if st.session_state.get("projects_page", 1) > num_pages:
+        st.session_state.projects_page = num_pages
+    with col3:
+        page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, step=1, key="projects_page")
+    page_df = projects_df.iloc[(page - 1) * page_size:page * page_size].reset_index(drop=True)
 
-            # Handle Update Button Click
-            if update_button:
-                st.session_state.projects[project_id]["cost"] = new_cost
-                st.session_state.projects[project_id]["benefit"] = new_benefit
-                st.success(f"Project {project_id} has been updated.")
-                # Save Data
-                save_data()
-
-            # --- Delete Project Section ---
-            st.markdown("### Delete Project")
-            with st.form(f"delete_form_{project_id}"):
-                st.warning(f"Are you sure you want to delete Project {project_id}? This action cannot be undone.")
-                confirm = st.checkbox("Yes, delete this project.")
-                delete_submit = st.form_submit_button("Delete")
-
-                if delete_submit:
-                    if confirm:
-                        del st.session_state.projects[project_id]
-                        st.success(f"Project {project_id} has been deleted.")
-                        # Save Data
-                        save_data()
-                        # Rerun to update UI
-                        rerun_app()
-                    else:
-                        st.error("Please confirm the deletion by checking the box.")
+    # A new key after every save or view change discards edits that belong to the old view
+    editor_key = f"projects_editor_{st.session_state.data_revision}_{id_filter}_{page}_{page_size}"
+    st.data_editor(
+        page_df,
+        key=editor_key,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "id": st.column_config.TextColumn("Project ID", required=True),
+            "cost": st.column_config.NumberColumn("Cost (k PLN)", min_value=0, step=10, required=True),
+            "benefit": st.column_config.NumberColumn("Benefit", min_value=0, step=1, required=True),
+        },
+    )
+    st.caption(f"{len(projects_df)} of {len(st.session_state.projects)} projects match the filter.")
+
+    if st.button("Save Changes", key="projects_save"):
+        upserts, deletes, error = project_editor_changes(page_df, st.session_state[editor_key], st.session_state.projects)
+        if error:
+            st.error(error)
+        elif upserts or deletes:
+            # Save Data
+            store = get_data_store()
+            store.apply_project_changes(upserts, deletes)
+            st.session_state.projects, st.session_state.budget, st.session_state.data_revision = store.load()
+            flash(f"{len(upserts)} projects have been saved and {len(set(deletes) - set(upserts))} deleted.")
+            # Rerun to update UI
+            rerun_app()
 
     st.markdown("---")
 
@@ -232,7 +521,7 @@ elif selected == "Manage Projects":
                 st.session_state.projects[new_project_id] = {"cost": new_project_cost, "benefit": new_project_benefit}
                 st.success(f"Project {new_project_id} has been successfully added!")
                 # Save Data
-                save_data()
+                get_data_store().upsert_project(new_project_id, new_project_cost, new_project_benefit)
                 # Rerun to display the new project
                 rerun_app()
 
@@ -240,62 +529,51 @@ elif selected == "Manage Budget":
     st.header("Manage Budget")
     st.write("In this section, you can manage the annual budget. Edit existing budget years, add new ones, or delete existing budget entries. These data are used for optimization calculations.")
 
+    # --- Import and Export Budget ---
+    with st.expander("Import and Export Budget"):
+        st.write("Import budget entries from a file with the columns **year** and **amount**. Rows with a missing or duplicate year or a negative amount are reported and skipped.")
+        imported = show_import("Budget", read_budget, "budget")
+        if imported is not None:
+            budget, replace = imported
+            store = get_data_store()
+            if replace:
+                store.replace_budget(budget)
+            else:
+                store.upsert_budget_entries(budget)
+            st.session_state.projects, st.session_state.budget, st.session_state.data_revision = store.load()
+            st.success(f"{len(budget)} budget years have been imported.")
+        show_export(budget_table(st.session_state.budget), "Budget", "budget", "budget")
+
     # --- Edit Existing Budget Entries ---
     st.subheader("Edit Existing Budget Entries")
-    for entry in st.session_state.budget:
-        with st.expander(f"Edit Budget Year {entry['year']}"):
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                new_year = st.number_input(
-                    "Year",
-                    value=int(entry["year"]),
-                    step=1,
-                    key=f"year_edit_{entry['year']}"
-                )
-            with col2:
-                new_amount = st.number_input(
-                    f"Budget (k PLN) for Year {entry['year']}",
-                    value=int(entry["amount"]),
-                    step=10,
-                    key=f"amount_edit_{entry['year']}"
-                )
-            with col3:
-                update_button = st.button(f"Update Budget Year {entry['year']}", key=f"update_budget_{entry['year']}")
-
-            # Handle Update Button Click
-            if update_button:
-                # Check if the new year is unique or the same as the current
-                if new_year != entry["year"] and any(b['year'] == new_year for b in st.session_state.budget):
-                    st.error(f"Year {new_year} already exists.")
-                else:
-                    # Find and update the budget entry
-                    for b in st.session_state.budget:
-                        if b['year'] == entry['year']:
-                            b['year'] = new_year
-                            b['amount'] = new_amount
-                            break
-                    st.success(f"Budget Year {new_year} has been updated.")
-                    # Save Data
-                    save_data()
-
-            # --- Delete Budget Year Section ---
-            st.markdown("### Delete Budget Year")
-            with st.form(f"delete_budget_form_{entry['year']}"):
-                st.warning(f"Are you sure you want to delete Budget Year {entry['year']}?")
-                confirm_budget = st.checkbox("Yes, delete this budget year.")
-                delete_budget_submit = st.form_submit_button("Delete Budget Year")
-
-                if delete_budget_submit:
-                    if confirm_budget:
-                        # Remove the budget entry
-                        st.session_state.budget = [b for b in st.session_state.budget if b['year'] != entry['year']]
-                        st.success(f"Budget Year {entry['year']} has been deleted.")
-                        # Save Data
-                        save_data()
-                        # Rerun to update UI
-                        rerun_app()
-                    else:
-                        st.error("Please confirm the deletion by checking the box.")
+    st.write("Edit years and amounts directly in the table, add rows at the bottom or select rows and press Delete to remove them. Changes are saved together when you click **Save Changes**.")
+    show_flash()
+    budget_df = budget_table(st.session_state.budget)
+    editor_key = f"budget_editor_{st.session_state.data_revision}"
+    st.data_editor(
+        budget_df,
+        key=editor_key,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "year": st.column_config.NumberColumn("Year", min_value=1900, max_value=2100, step=1, format="%d", required=True),
+            "amount": st.column_config.NumberColumn("Budget (k PLN)", min_value=0, step=10, required=True),
+        },
+    )
+
+    if st.button("Save Changes", key="budget_save"):
+        upserts, deletes, error = budget_editor_changes(budget_df, st.session_state[editor_key])
+        if error:
+            st.error(error)
+        elif upserts or deletes:
+            # Save Data
+            store = get_data_store()
+            store.apply_budget_changes(upserts, deletes)
+            st.session_state.projects, st.session_state.budget, st.session_state.data_revision = store.load()
+            flash(f"{len(upserts)} budget years have been saved and {len(set(deletes) - set(upserts))} deleted.")
+            # Rerun to update UI
+            rerun_app()
 
     st.markdown("---")
 
@@ -315,7 +593,7 @@ elif selected == "Manage Budget":
                 st.session_state.budget = sorted(st.session_state.budget, key=lambda x: x['year'])
                 st.success(f"Budget for the year {new_budget_year} has been successfully added!")
                 # Save Data
-                save_data()
+                get_data_store().upsert_budget(new_budget_year, new_budget_amount)
                 # Rerun to display the new budget entry
                 rerun_app()
 
@@ -357,33 +635,95 @@ elif selected == "Run Optimization":
     - \( \text{Budget}_j \): Available budget in year \( j \)
     """)
 
-    # --- Start Optimization ---
-    if st.button("Start Optimization"):
-        with st.spinner("Running optimization..."):
-            # Sort the budget by year
-            sorted_budget = sorted(st.session_state.budget, key=lambda x: x['year'])
-            try:
-                start_time = time.time()
-                results = run_optimization(st.session_state.projects, sorted_budget)
-                end_time = time.time()
-                computation_time = end_time - start_time
-                results['computation_time'] = computation_time  # Add computation time to results
-                results['funded_projects_count'] = len([
-                    k for k, v in results.get('projects', {}).items() 
-                    if v.get('completion_year') != "NOT FUNDED"
-                ])
-                results['average_roi'] = (
-                    sum([v.get("ROI", 0) for v in results.get('projects', {}).values()]) / 
-                    len(results.get('projects', {})) if results.get('projects') else 0
+    # --- Solver Settings ---
+    with st.expander("Solver Settings"):
+        st.write("Choose the solver backend and limit the solve time. When the time limit is reached, the best solution found so far is returned with status **Feasible**.")
+        col1, col2 = st.columns(2)
+        with col1:
+            solver = st.selectbox("Solver Backend", options=get_available_solvers(), key="solver_backend")
+            time_limit = st.number_input("Time Limit (Seconds, 0 = No Limit)", min_value=0, value=0, step=10, key="solver_time_limit")
+        with col2:
+            gap = st.number_input("Relative MIP Gap (%, 0 = Solver Default)", min_value=0.0, max_value=100.0, value=0.0, step=0.5, key="solver_gap")
+            threads = st.number_input("Threads (0 = Solver Default)", min_value=0, value=0, step=1, key="solver_threads")
+        capture_log = st.checkbox("Capture Solver Log", key="solver_capture_log")
+        rolling = st.checkbox(
+            "Rolling Horizon", key="solver_rolling",
+            help="For long horizons: solve the first years in detail with the later years aggregated, fix the first years and slide on. Runs with CBC or HiGHS and reports the gap to the bound of the full model.",
+        )
+        if rolling:
+            col1, col2 = st.columns(2)
+            with col1:
+                window = st.number_input("Window (Years in Detail)", min_value=1, value=5, step=1, key="solver_window")
+            with col2:
+                window_step = st.number_input(
+                    "Years Fixed per Solve (0 = Window)", min_value=0, max_value=int(window), value=0, step=1, key="solver_window_step",
+                    help="Fewer years per solve look further ahead before fixing a year, but solve more windows.",
                 )
-                st.session_state.results = results
-                if results["status"] == "Optimal":
-                    st.success("Optimization completed successfully.")
-                else:
-                    st.warning("Optimization completed, but no optimal solution was found.")
-            except Exception as e:
-                st.error(f"Error during optimization: {e}")
-                st.session_state.results = None
+
+    solver_options = {
+        "solver": solver,
+        "time_limit": time_limit or None,
+        "gap": gap / 100 if gap else None,
+        "threads": threads or None,
+    }
+    if rolling:
+        solver_options.update(engine="rolling", window=int(window), window_step=int(window_step) or None)
+
+    # --- Start Optimization ---
+    if st.button("Start Optimization", disabled=st.session_state.job is not None):
+        # Sort the budget by year
+        sorted_budget = sorted(st.session_state.budget, key=lambda x: x['year'])
+        start_time = time.time()
+        key = cache_key(st.session_state.projects, sorted_budget, **solver_options)
+        results = get_result_cache().get(key)
+        st.session_state.solver_log = None
+        if results is not None:
+            st.session_state.results = add_result_summary(results, time.time() - start_time)
+            get_data_store().save_result(key, st.session_state.results)
+            show_result_status(results)
+        else:
+            # Solve in the background, warm-started from the previous solution
+            job = get_job_manager().submit(
+                st.session_state.projects, sorted_budget, start=st.session_state.last_solution,
+                session_id=st.session_state.session_id, **solver_options
+            )
+            st.session_state.job = {"id": job.id, "key": key, "capture_log": capture_log}
+
+        cache_stats = get_result_cache().stats()
+        st.caption(f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries in memory.")
+
+    # --- Quick Estimate ---
+    if st.button("Quick Estimate", disabled=st.session_state.job is not None,
+                 help="Greedy scheduling with local search instead of the exact model. The estimate also serves as the starting point of the next optimization."):
+        sorted_budget = sorted(st.session_state.budget, key=lambda x: x['year'])
+        start_time = time.time()
+        try:
+            # The bound would cost as long as the estimate itself
+            results = run_optimization(st.session_state.projects, sorted_budget, engine="heuristic", bound=False)
+        except Exception as e:
+            st.error(f"Error during estimation: {e}")
+        else:
+            st.session_state.results = add_result_summary(results, time.time() - start_time)
+            st.session_state.last_solution = mip_start(results, sorted_budget)
+            st.session_state.solver_log = None
+            st.info("Estimate found. Start Optimization to improve on it or prove it optimal.")
+
+    show_job_progress()
+
+    # --- Outcome of the last background job, shown once ---
+    job_outcome = st.session_state.job_outcome
+    if job_outcome is not None:
+        st.session_state.job_outcome = None
+        if job_outcome["status"] == CANCELLED:
+            st.info("Optimization cancelled.")
+        elif job_outcome["status"] == FAILED:
+            st.error(f"Error during optimization: {job_outcome['error']}")
+        elif st.session_state.results:
+            show_result_status(st.session_state.results)
+
+    if st.session_state.solver_log:
+        with st.expander("Solver Log"):
+            st.code(st.session_state.solver_log)
 
     # --- Display Optimization Results ---
     if st.session_state.results:
@@ -396,7 +736,7 @@ elif selected == "Run Optimization":
         st.write(f"**Status:** {results['status']}")
         st.write("**Interpretation:** This status indicates whether the optimization found an optimal solution.")
 
-        if results["status"] == "Optimal":
+        if results["status"] in SOLVED_STATUSES:
             st.subheader("Optimization Summary")
             st.write("""
             **Total Benefits:** The maximum benefits achieved through the selected projects.
@@ -413,6 +753,16 @@ elif selected == "Run Optimization":
             with col3:
                 st.metric(label="Number of Projects", value=f"{len(st.session_state.projects)}")
 
+            if results.get("bound") is not None:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric(label="Upper Bound (LP Relaxation)", value=f"{results['bound']:.2f}")
+                with col2:
+                    st.metric(label="Gap to Bound (%)", value=f"{results['gap'] * 100:.2f}")
+
+            if results.get("performance"):
+                show_performance(results["performance"])
+
             # Total Benefits Bar Chart
             fig_total_benefit = px.bar(
                 x=["Total Benefits"],
@@ -465,7 +815,7 @@ elif selected == "View Results":
         st.write(f"**Status:** {results['status']}")
         st.write("**Interpretation:** This status indicates whether the optimization found an optimal solution.")
 
-        if results["status"] == "Optimal":
+        if results["status"] in SOLVED_STATUSES:
             st.subheader("Total Benefits")
             st.write(f"**{results['objective']:.2f} Units**")
             st.write("**Interpretation:** This is the maximum benefit achieved by the selected projects.")
@@ -494,24 +844,7 @@ elif selected == "View Results":
 
             # --- Detailed Project Results ---
             st.subheader("Detailed Project Results")
-            project_details = []
-            for project, info in results.get('projects', {}).items():
-                expenditures = ", ".join([
-                    f"{exp['year']}: {exp['expenditure']:.1f}k PLN" 
-                    for exp in info.get("expenditures", [])
-                ]) if info.get("expenditures") else "No Expenditures"
-                project_details.append({
-                    "Project": project,
-                    "Completion Year": info.get("completion_year", "N/A"),
-                    "Total Benefit": info.get("total_benefit", 0),
-                    "Annual Expenditures": expenditures,
-                    "ROI (%)": info.get("ROI", 0)
-                })
-
-            project_details_df = pd.DataFrame(project_details)
-            # Ensure numeric types are correct
-            project_details_df["Total Benefit"] = pd.to_numeric(project_details_df["Total Benefit"], errors='coerce')
-            project_details_df["ROI (%)"] = pd.to_numeric(project_details_df["ROI (%)"], errors='coerce')
+            project_details_df, expenditures_df = get_result_frames()
 
             # --- Interactive Data Table with AgGrid ---
             st.write("**Note:** You can filter, sort, and select rows to view detailed project information.")
@@ -538,83 +871,45 @@ elif selected == "View Results":
             st.subheader("Interactive Visualizations")
             st.write("These visualizations help you better understand the financial aspects and benefits of the selected projects.")
 
-            # Dropdown to select projects for detailed view, all projects selected by default
+            # Large portfolios start with an empty selection, which stands for all projects
+            large_portfolio = len(project_details_df) > AGGREGATE_THRESHOLD
             selected_projects = st.multiselect(
-                "Select Projects for Visualization",
+                "Select Projects for Visualization" + (" (leave empty for all projects)" if large_portfolio else ""),
                 options=project_details_df["Project"],
-                default=project_details_df["Project"].tolist()  # All projects selected by default
+                default=[] if large_portfolio else project_details_df["Project"].tolist()
+            )
+            if large_portfolio and not selected_projects:
+                selected_projects = project_details_df["Project"].tolist()
+            chart_mode = st.radio(
+                "Chart Detail",
+                ["Automatic", "Per Project", "Top Projects + Other"],
+                horizontal=True,
+                help=f"Automatic shows the top {AGGREGATE_THRESHOLD} projects and groups the rest into 'Other' when more projects are selected."
+            )
+            aggregate = should_aggregate(
+                len(selected_projects),
+                {"Automatic": "auto", "Per Project": "per project", "Top Projects + Other": "aggregated"}[chart_mode]
             )
 
             if selected_projects:
-                # Filter results for selected projects
-                filtered_results = {
-                    k: v for k, v in results.get('projects', {}).items() if k in selected_projects
-                }
-
-                # Prepare data for visualization
-                viz_data = []
-                for project, info in filtered_results.items():
-                    if info.get("completion_year") != "NOT FUNDED":
-                        years = sorted([exp["year"] for exp in info.get("expenditures", [])])
-                        expenditures = sorted([exp["expenditure"] for exp in info.get("expenditures", [])])
-                        cumulative_expenditures = pd.Series(expenditures).cumsum().tolist()
-                        for i, year in enumerate(years):
-                            viz_data.append({
-                                "Project": project,
-                                "Year": year,
-                                "Expenditures": expenditures[i],
-                                "Cumulative Expenditures": cumulative_expenditures[i],
-                                "Benefit": info.get("total_benefit", 0)
-                            })
-
-                viz_df = pd.DataFrame(viz_data)
+                # Portfolio Spending
+                st.plotly_chart(portfolio_spending_chart(expenditures_df, st.session_state.budget), use_container_width=True)
+                st.write("**Interpretation:** This chart compares the cumulative spending of all funded projects with the cumulative budget.")
 
                 # Expenditures Over Time
-                fig_expenditure = px.line(
-                    viz_df,
-                    x='Year',
-                    y='Cumulative Expenditures',
-                    color='Project',
-                    markers=True,
-                    title='Cumulative Expenditures Over Years',
-                    labels={'Cumulative Expenditures': 'Cumulative Expenditures (k PLN)'},
-                    template='plotly_white'
-                )
-                fig_expenditure.update_layout(title_x=0.5)
-                st.plotly_chart(fig_expenditure, use_container_width=True)
+                st.plotly_chart(expenditure_chart(expenditures_df, selected_projects, aggregate), use_container_width=True)
                 st.write("**Interpretation:** This chart shows how the expenditures for each project accumulate over the years.")
 
                 # Benefit Comparison
-                fig_benefit = px.bar(
-                    pd.DataFrame([
-                        {"Project": project, "Total Benefit": info.get("total_benefit", 0), "ROI (%)": info.get("ROI", 0)}
-                        for project, info in filtered_results.items()
-                    ]),
-                    x='Project',
-                    y=['Total Benefit', 'ROI (%)'],
-                    barmode='group',
-                    title='Total Benefit and ROI of Selected Projects',
-                    labels={'value': 'Value', 'variable': 'Metric'},
-                    template='plotly_white',
-                    hover_data=['ROI (%)']
-                )
-                fig_benefit.update_layout(title_x=0.5)
-                st.plotly_chart(fig_benefit, use_container_width=True)
+                st.plotly_chart(benefit_chart(project_details_df, selected_projects, aggregate), use_container_width=True)
                 st.write("**Interpretation:** This bar chart compares the total benefit and Return on Investment (ROI) of the selected projects.")
             else:
                 st.warning("Please select at least one project for visualization.")
 
             # --- Download Detailed Results ---
             st.subheader("Download Detailed Results")
-            st.write("You can download the detailed project results as a CSV file for offline analysis.")
-            if st.button("Download Complete Results as CSV"):
-                csv = project_details_df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name='detailed_results.csv',
-                    mime='text/csv',
-                )
+            st.write("You can download the detailed project results as a CSV, Parquet or Excel file for offline analysis.")
+            show_export(project_details_df, "Complete Results", "detailed_results", "results")
 
             # --- Project Comparison ---
             st.subheader("Compare Projects")
@@ -622,23 +917,15 @@ elif selected == "View Results":
             comparison_projects = st.multiselect(
                 "Select Projects to Compare",
                 options=project_details_df["Project"],
-                default=project_details_df["Project"].tolist()  # All projects selected by default
+                default=[] if large_portfolio else project_details_df["Project"].tolist()
             )
 
             if len(comparison_projects) >= 2:
-                comparison_df = pd.DataFrame([
-                    {
-                        "Project": project,
-                        "Completion Year": results["projects"][project].get("completion_year", "N/A"),
-                        "Total Benefit": results["projects"][project].get("total_benefit", 0),
-                        "ROI (%)": results["projects"][project].get("ROI", 0),
-                        "Expenditures": ", ".join([
-                            f"{exp['year']}: {exp['expenditure']:.1f}k PLN" 
-                            for exp in results["projects"][project].get("expenditures", [])
-                        ]) if results["projects"][project].get("expenditures") else "No Expenditures"
-                    }
-                    for project in comparison_projects
-                ])
+                comparison_df = (
+                    project_details_df[project_details_df["Project"].isin(comparison_projects)]
+                    .drop(columns=["Annual Expenditures"])
+                    .assign(Expenditures=project_details_df["Annual Expenditures"])
+                )
 
                 # AgGrid for Comparison
                 st.subheader("Comparison Table")
@@ -680,4 +967,123 @@ elif selected == "View Results":
                 st.info("Select projects from the dropdown list to compare their performance.")
 
         else:
-            st.error("The optimization model did not find an optimal solution. Please review your input data and constraints.")
\ No newline at end of file
+            st.error("The optimization model did not find an optimal solution. Please review your input data and constraints.")
+
+elif selected == "Budget Frontier":
+    st.header("Budget Frontier")
+    st.write("""
+    The budget frontier shows how the total benefit changes when every annual budget is scaled by the same factor. Use it to justify budget requests: steep parts of the curve show where additional budget pays off, flat parts (plateaus) show where it does not.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        min_multiplier = st.number_input("Lowest Budget Multiplier", min_value=0.0, value=0.5, step=0.1, key="frontier_min")
+    with col2:
+        max_multiplier = st.number_input("Highest Budget Multiplier", min_value=0.0, value=2.0, step=0.1, key="frontier_max")
+    with col3:
+        num_points = st.number_input("Number of Points", min_value=2, max_value=200, value=16, step=1, key="frontier_points")
+
+    if st.button("Compute Frontier"):
+        if max_multiplier <= min_multiplier:
+            st.error("The highest multiplier must be greater than the lowest multiplier.")
+        else:
+            with st.spinner("Computing budget frontier..."):
+                step = (max_multiplier - min_multiplier) / (num_points - 1)
+                multipliers = [round(min_multiplier + k * step, 6) for k in range(int(num_points))]
+                try:
+                    start_time = time.time()
+                    frontier_df, _ = budget_frontier(st.session_state.projects, st.session_state.budget, multipliers)
+                    st.session_state.frontier = frontier_df
+                    solved = int((frontier_df["Method"] == "solved").sum())
+                    st.success(f"Frontier computed in {time.time() - start_time:.2f} seconds ({solved} of {len(frontier_df)} points solved, the rest lie on plateaus).")
+                except Exception as e:
+                    st.error(f"Error during frontier computation: {e}")
+                    st.session_state.frontier = None
+
+    if st.session_state.frontier is not None:
+        frontier_df = st.session_state.frontier
+        fig_frontier = px.line(
+            frontier_df,
+            x='Total Budget',
+            y='Total Benefits',
+            markers=True,
+            hover_data=['Multiplier', 'Number of Funded Projects', 'Method'],
+            title='Total Benefits vs. Total Budget',
+            labels={'Total Budget': 'Total Budget (k PLN)', 'Total Benefits': 'Total Benefits (Units)'},
+            template='plotly_white'
+        )
+        fig_frontier.update_layout(title_x=0.5)
+        st.plotly_chart(fig_frontier, use_container_width=True)
+        st.write("**Interpretation:** Each point is the maximum total benefit achievable with the scaled budget.")
+
+        st.subheader("Frontier Table")
+        st.dataframe(frontier_df, use_container_width=True)
+        st.download_button(
+            label="Download Frontier as CSV",
+            data=frontier_df.to_csv(index=False),
+            file_name='budget_frontier.csv',
+            mime='text/csv',
+        )
+
+elif selected == "Robustness":
+    st.header("Robustness Analysis")
+    st.write("""
+    Project costs and benefits are estimates. The robustness analysis solves the portfolio for many random perturbations of them and shows how often each project is funded and when it is completed. Projects funded in nearly every sample are safe choices; projects funded only in some samples depend on the accuracy of their estimates.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        num_samples = st.number_input("Number of Samples", min_value=10, max_value=10000, value=200, step=10, key="robust_samples")
+        distribution = st.selectbox("Distribution", options=DISTRIBUTIONS, key="robust_distribution")
+    with col2:
+        cost_spread = st.number_input("Cost Spread (%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="robust_cost_spread")
+        benefit_spread = st.number_input("Benefit Spread (%)", min_value=0.0, max_value=100.0, value=10.0, step=1.0, key="robust_benefit_spread")
+    with col3:
+        method = st.selectbox("Method", options=["heuristic", "exact"], key="robust_method",
+                              help="The heuristic solves every sample in milliseconds; exact solves are optimal but much slower.")
+        seed = st.number_input("Random Seed", min_value=0, value=0, step=1, key="robust_seed")
+    st.write("The spread is the standard deviation for the normal and lognormal distributions and the half-width of the range for the uniform and triangular distributions.")
+
+    if st.button("Run Robustness Analysis"):
+        with st.spinner("Solving samples..."):
+            try:
+                start_time = time.time()
+                solver_options = {"solver": get_available_solvers()[0]} if method == "exact" else {}
+                analysis = robustness_analysis(
+                    st.session_state.projects, st.session_state.budget, num_samples=int(num_samples),
+                    cost_spread=cost_spread / 100, benefit_spread=benefit_spread / 100, distribution=distribution,
+                    seed=int(seed), method=method, **solver_options
+                )
+                st.session_state.robustness = {"analysis": analysis, "frames": robustness_frames(analysis)}
+                st.success(f"{analysis['solved']} of {int(num_samples)} samples solved in {time.time() - start_time:.2f} seconds.")
+            except Exception as e:
+                st.error(f"Error during robustness analysis: {e}")
+                st.session_state.robustness = None
+
+    if st.session_state.robustness is not None:
+        analysis = st.session_state.robustness["analysis"]
+        robust_projects, robust_completion, robust_objectives = st.session_state.robustness["frames"]
+        large_portfolio = should_aggregate(len(robust_projects))
+
+        st.plotly_chart(selection_frequency_chart(robust_projects, aggregate=large_portfolio), use_container_width=True)
+        st.write("**Interpretation:** The share of samples in which a project is funded. The color shows whether the plan for the nominal estimates funds it.")
+
+        # Least certain projects first
+        ranked = robust_projects.assign(
+            Uncertainty=-(robust_projects["Selection Frequency (%)"] - 50).abs()
+        ).sort_values("Uncertainty", ascending=False, kind="stable")
+        shown = ranked["Project"].tolist()[:AGGREGATE_THRESHOLD] if large_portfolio else robust_projects["Project"].tolist()
+        st.plotly_chart(completion_distribution_chart(robust_completion, shown), use_container_width=True)
+        st.write("**Interpretation:** Each cell is the share of samples in which the project is completed in that year.")
+
+        if len(robust_objectives):
+            st.plotly_chart(benefit_distribution_chart(robust_objectives, analysis["nominal"].get("objective")), use_container_width=True)
+
+        st.subheader("Robustness Table")
+        st.dataframe(robust_projects, use_container_width=True)
+        st.download_button(
+            label="Download Robustness Table as CSV",
+            data=robust_projects.to_csv(index=False),
+            file_name='robustness.csv',
+            mime='text/csv',
+        )
@@ -0,0 +1,389 @@
+# benchmark.py
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from long_term_investment_programming import build_model, run_optimization
+from matrix_model import build_matrix_model, write_mps
+
+
+# Portfolio sizes of the benchmark suite; exact engines only run up to EXACT_MAX_PROJECTS
+SUITE_PROJECTS = (10, 100, 1000, 10000, 50000)
+SUITE_YEARS = (5, 10, 20, 50)
+SUITE_ENGINES = {
+    "pulp_cbc": {"engine": "pulp", "solver": "cbc"},
+    "matrix_highs": {"engine": "matrix", "solver": "highs"},
+    "heuristic": {"engine": "heuristic"},
+    "decomposition": {"engine": "decomposition"},
+    "rolling_highs": {"engine": "rolling", "solver": "highs"},
+}
+EXACT_MAX_PROJECTS = 1000
+
+# Profiler phases counted as model building and result extraction; all others count as solving
+BUILD_PHASES = ("validation", "presolve", "variables", "constraints", "build", "write")
+EXTRACT_PHASES = ("read", "extract")
+
+# Measurements of one suite run, set to None when the run fails
+CASE_COLUMNS = ("status", "objective", "gap", "build", "solve", "extract", "total", "variables", "constraints",
+                "nonzeros", "peak_memory_mb", "error")
+
+
+def synthetic_portfolio(num_projects, num_years, seed=0, num_types=None):
+    """
+    Generates a random portfolio with costs and benefits in the range of the app's defaults.
+
+    The same arguments always yield the same portfolio.
+
+    Parameters:
+    - num_types (int, optional): Draw every project from this many distinct (cost, benefit)
+      pairs, for portfolios of many identical projects.
+
+    Returns:
+    - tuple: (projects, budget) in the format run_optimization expects.
+    """
+    rng = random.Random(seed)
+    if num_types:
+        types = [(rng.randint(80, 200), rng.randint(7, 20)) for _ in range(num_types)]
+        projects = {f"P{k}": dict(zip(("cost", "benefit"), rng.choice(types))) for k in range(num_projects)}
+    else:
+        projects = {
+            f"P{k}": {"cost": rng.randint(80, 200), "benefit": rng.randint(7, 20)}
+            for k in range(num_projects)
+        }
+    # Roughly a tenth of the portfolio can be financed every year
+    annual_amount = max(100, 14 * num_projects)
+    budget = [{"year": 2024 + t, "amount": annual_amount} for t in range(num_years)]
+    return projects, budget
+
+
+def benchmark_build(sizes, seed=0):
+    """
+    Times model construction of the PuLP formulations against the matrix builder.
+
+    Parameters:
+    - sizes (list): (num_projects, num_years) pairs to benchmark.
+
+    Returns:
+    - list: One dict of build times in seconds per size.
+    """
+    rows = []
+    for num_projects, num_years in sizes:
+        projects, budget = synthetic_portfolio(num_projects, num_years, seed)
+        row = {"projects": num_projects, "years": num_years}
+
+        for formulation in ("classic", "cumulative"):
+            start = time.perf_counter()
+            build_model(projects, budget, formulation)
+            row[f"pulp_{formulation}"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matrix_model = build_matrix_model(projects, budget)
+        row["matrix"] = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start = time.perf_counter()
+            write_mps(matrix_model, os.path.join(tmp_dir, "model.mps"))
+            row["matrix_mps"] = time.perf_counter() - start
+
+        rows.append(row)
+    return rows
+
+
+def benchmark_solve_overhead(sizes, repeats=5, seed=0):
+    """
+    Times complete run_optimization calls of the solver paths on small portfolios, where the
+    cost of building, handing over and reading back the model outweighs the search itself.
+
+    Paths:
+    - pulp_cbc: PuLP model, CBC subprocess with MPS and solution files (the default).
+    - matrix_cbc: Matrix model, CBC subprocess with a bulk-written MPS file.
+    - matrix_highs: Matrix model passed to HiGHS in-process, values read back as an array.
+
+    Parameters:
+    - sizes (list): (num_projects, num_years) pairs to benchmark.
+    - repeats (int): Solves per path and size; the median time is reported.
+
+    Returns:
+    - list: One dict of median seconds per solve for every path, per size.
+    """
+    paths = {
+        "pulp_cbc": {"engine": "pulp", "solver": "cbc"},
+        "matrix_cbc": {"engine": "matrix", "solver": "cbc"},
+        "matrix_highs": {"engine": "matrix", "solver": "highs"},
+    }
+    rows = []
+    for num_projects, num_years in sizes:
+        projects, budget = synthetic_portfolio(num_projects, num_years, seed)
+        row = {"projects": num_projects, "years": num_years}
+        for name, options in paths.items():
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run_optimization(projects, budget, threads=1, **options)
+                times.append(time.perf_counter() - start)
+            row[name] = statistics.median(times)
+        rows.append(row)
+    return rows
+
+
+def benchmark_formulations(sizes, formulations=("cumulative", "tight"), time_limit=60, seed=0):
+    """
+    Compares branch-and-bound effort of the formulations on portfolios of many identical
+    projects, where the symmetry and weak LP relaxation of the cumulative formulation make
+    the search trees largest.
+
+    Paths:
+    - pulp_cbc: PuLP model solved by CBC; nodes and iterations are read from its log.
+    - matrix_highs: Matrix model solved by HiGHS in-process.
+
+    Parameters:
+    - sizes (list): (num_projects, num_years, num_types) triples, see synthetic_portfolio.
+    - formulations (tuple): Formulations to compare, from FORMULATIONS except "classic".
+    - time_limit (float): Time limit in seconds per solve; a run stopped by it has status "Feasible".
+
+    Returns:
+    - list: One dict per size, formulation and path with 'status', 'objective', 'nodes',
+      'iterations' and 'total' seconds.
+    """
+    paths = {
+        "pulp_cbc": {"engine": "pulp", "solver": "cbc"},
+        "matrix_highs": {"engine": "matrix", "solver": "highs"},
+    }
+    rows = []
+    for num_projects, num_years, num_types in sizes:
+        projects, budget = synthetic_portfolio(num_projects, num_years, seed, num_types)
+        for formulation in formulations:
+            for name, options in paths.items():
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    result = run_optimization(projects, budget, formulation=formulation, time_limit=time_limit,
+                                              threads=1, log_path=os.path.join(tmp_dir, "solver.log"), **options)
+                performance = result["performance"]
+                rows.append({
+                    "projects": num_projects,
+                    "years": num_years,
+                    "types": num_types,
+                    "formulation": formulation,
+                    "path": name,
+                    "status": result["status"],
+                    "objective": result["objective"],
+                    "nodes": performance["solver"].get("nodes"),
+                    "iterations": performance["solver"].get("iterations"),
+                    "total": performance["total"],
+                })
+    return rows
+
+
+def benchmark_suite(projects_sizes=SUITE_PROJECTS, years_sizes=SUITE_YEARS, engines=None, seed=0,
+                    time_limit=60, exact_max_projects=EXACT_MAX_PROJECTS):
+    """
+    Runs every engine on every portfolio size and reports build, solve and extraction times,
+    model size and memory.
+
+    Each run happens in a fresh process, so that its peak memory is not masked by earlier
+    runs, and with one solver thread, so that times are comparable between machines with
+    different core counts. Only the bundled CBC and the local HiGHS library are used.
+
+    Parameters:
+    - projects_sizes, years_sizes (tuple): Numbers of projects and years; every combination is run.
+    - engines (list, optional): Names from SUITE_ENGINES, all by default.
+    - time_limit (float): Time limit in seconds per solve.
+    - exact_max_projects (int): Largest portfolio the MIP engines (pulp_cbc, matrix_highs,
+      rolling_highs) are run on.
+
+    Returns:
+    - list: One dict per run with 'engine', 'projects', 'years', 'status', 'objective', 'gap' (None
+      for exact engines), seconds for 'build', 'solve', 'extract' and 'total', model size,
+      'peak_memory_mb' and 'error' (None unless the run failed).
+    """
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for num_projects in projects_sizes:
+        for num_years in years_sizes:
+            for name in engines or SUITE_ENGINES:
+                options = SUITE_ENGINES[name]
+                if options["engine"] in ("pulp", "matrix", "rolling") and num_projects > exact_max_projects:
+                    continue
+                row = {"engine": name, "projects": num_projects, "years": num_years}
+                with context.Pool(1) as pool:
+                    row.update(pool.apply(_run_case, (num_projects, num_years, seed, options, time_limit)))
+                rows.append(row)
+    return rows
+
+
+def _run_case(num_projects, num_years, seed, options, time_limit):
+    projects, budget = synthetic_portfolio(num_projects, num_years, seed)
+    try:
+        result = run_optimization(projects, budget, time_limit=time_limit, threads=1, **options)
+    except Exception as e:
+        return {**dict.fromkeys(CASE_COLUMNS), "status": "Error", "error": str(e)}
+
+    performance = result["performance"]
+    phases = performance["phases"]
+    build = sum(phases.get(name, 0.0) for name in BUILD_PHASES)
+    extract = sum(phases.get(name, 0.0) for name in EXTRACT_PHASES)
+    return {
+        "status": result["status"],
+        "objective": result["objective"],
+        "gap": result.get("gap"),
+        "build": build,
+        "solve": sum(phases.values()) - build - extract,
+        "extract": extract,
+        "total": performance["total"],
+        "variables": performance["model"].get("variables"),
+        "constraints": performance["model"].get("constraints"),
+        "nonzeros": performance["model"].get("nonzeros"),
+        "peak_memory_mb": performance["peak_memory_mb"],
+        "error": None,
+    }
+
+
+def write_results(rows, path):
+    """
+    Writes benchmark rows to a .json or .csv file, together with the commit, Python version
+    and platform they were measured on.
+    """
+    metadata = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if path.endswith(".csv"):
+        columns = list(dict.fromkeys(key for row in rows for key in row)) + list(metadata)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows({**row, **metadata} for row in rows)
+    else:
+        with open(path, "w") as f:
+            json.dump({"metadata": metadata, "results": rows}, f, indent=2)
+
+
+def read_results(path):
+    """Reads the rows of a file written by write_results."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return [
+                {key: _parse_csv_value(value) for key, value in row.items()}
+                for row in csv.DictReader(f)
+            ]
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(baseline, current, column="total"):
+    """
+    Matches two sets of benchmark rows by engine and portfolio size.
+
+    Returns:
+    - list: One dict per run present in both, with both values of column and their 'ratio'
+      (current / baseline; above 1 is slower).
+    """
+    before = {(row["engine"], row["projects"], row["years"]): row for row in baseline}
+    rows = []
+    for row in current:
+        key = (row["engine"], row["projects"], row["years"])
+        old, new = before.get(key, {}).get(column), row.get(column)
+        if old is None or new is None:
+            continue
+        rows.append({
+            "engine": row["engine"], "projects": row["projects"], "years": row["years"],
+            "baseline": old, "current": new, "ratio": new / old if old else float("inf"),
+        })
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_csv_value(value):
+    if value == "":
+        return None
+    for parse in (int, float):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _print_table(columns, rows):
+    print("".join(f"{c:>17}" for c in columns))
+    for row in rows:
+        print("".join(_format_cell(row.get(c)) for c in columns))
+
+
+def _format_cell(value):
+    if isinstance(value, float):
+        return f"{value:>17.3f}"
+    return f"{'' if value is None else value:>17}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the portfolio optimizer.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("build", help="Model construction times of the PuLP and matrix builders.")
+    commands.add_parser("overhead", help="Complete solve times of small portfolios per solver path.")
+    formulations = commands.add_parser("formulations", help="Nodes and solve times of the cumulative and tight formulations.")
+    formulations.add_argument("--time-limit", type=float, default=60)
+    suite = commands.add_parser("suite", help="Build, solve and extraction times of every engine and size.")
+    suite.add_argument("--projects", type=int, nargs="+", default=list(SUITE_PROJECTS))
+    suite.add_argument("--years", type=int, nargs="+", default=list(SUITE_YEARS))
+    suite.add_argument("--engines", nargs="+", choices=list(SUITE_ENGINES), default=list(SUITE_ENGINES))
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--time-limit", type=float, default=60)
+    suite.add_argument("--exact-max-projects", type=int, default=EXACT_MAX_PROJECTS)
+    suite.add_argument("--output", help="Write the results to this .json or .csv file.")
+    compare = commands.add_parser("compare", help="Compare two result files of the suite.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--column", default="total")
+    args = parser.parse_args(argv)
+
+    if args.command in (None, "build"):
+        _print_table(
+            ["projects", "years", "pulp_classic", "pulp_cumulative", "matrix", "matrix_mps"],
+            benchmark_build([(100, 10), (500, 20), (1000, 30), (2000, 30)]),
+        )
+    if args.command is None:
+        print()
+    if args.command in (None, "overhead"):
+        _print_table(
+            ["projects", "years", "pulp_cbc", "matrix_cbc", "matrix_highs"],
+            benchmark_solve_overhead([(5, 5), (10, 5), (20, 5)]),
+        )
+    if args.command == "formulations":
+        _print_table(
+            ["projects", "years", "types", "formulation", "path", "status", "nodes", "total"],
+            benchmark_formulations([(30, 10, 5), (50, 10, 5), (100, 10, 10)], time_limit=args.time_limit),
+        )
+    if args.command == "suite":
+        rows = benchmark_suite(args.projects, args.years, args.engines, args.seed, args.time_limit,
+                               args.exact_max_projects)
+        _print_table(["engine", "projects", "years", "status", "build", "solve", "extract", "peak_memory_mb"], rows)
+        if args.output:
+            write_results(rows, args.output)
+    if args.command == "compare":
+        rows = compare_results(read_results(args.baseline), read_results(args.current), args.column)
+        _print_table(["engine", "projects", "years", "baseline", "current", "ratio"], rows)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# bulk_io.py
+
+import io
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+FILE_FORMATS = ("csv", "parquet", "excel")
+
+# Accepted column headers, compared case-insensitively
+PROJECT_COLUMNS = {"id": ("id", "project", "project_id", "project id"), "cost": ("cost",), "benefit": ("benefit",)}
+BUDGET_COLUMNS = {"year": ("year",), "amount": ("amount", "budget")}
+
+_SUFFIXES = {".csv": "csv", ".txt": "csv", ".parquet": "parquet", ".pq": "parquet", ".xlsx": "excel", ".xlsm": "excel"}
+
+
+def read_projects(source, file_format=None, chunksize=50_000):
+    """
+    Reads projects from a CSV, Parquet or Excel file in chunks.
+
+    Rows are validated chunk by chunk with vectorized checks; valid rows go straight into the
+    projects dict, so the file is never held in memory as a whole.
+
+    Parameters:
+    - source (str or file): Path or binary file object, e.g. a Streamlit upload.
+    - file_format (str, optional): One of FILE_FORMATS; inferred from the file name when omitted.
+    - chunksize (int): Rows per chunk.
+
+    Returns:
+    - tuple: (projects, errors) where projects is a dict in the format run_optimization expects
+      and errors is a pandas.DataFrame with the 1-based row number, project ID and reason of
+      every rejected row. Of rows with the same project ID, the first valid one is kept.
+    """
+    projects = {}
+    errors = []
+    for offset, chunk in _iter_chunks(source, file_format, chunksize):
+        chunk = _select_columns(chunk, PROJECT_COLUMNS)
+        ids = chunk["id"].astype("string").str.strip()
+        cost = pd.to_numeric(chunk["cost"], errors="coerce")
+        benefit = pd.to_numeric(chunk["benefit"], errors="coerce")
+
+        missing_id = ids.isna() | (ids == "")
+        reason = np.select(
+            [
+                missing_id.to_numpy(),
+                cost.isna().to_numpy(),
+                (cost <= 0).to_numpy(),
+                benefit.isna().to_numpy(),
+                (benefit < 0).to_numpy(),
+            ],
+            ["missing project ID", "cost is not a number", "cost is not positive",
+             "benefit is not a number", "benefit is negative"],
+            default="",
+        )
+        # Duplicates only among otherwise valid rows, so that a bad first row does not reject a good second one
+        valid = reason == ""
+        duplicate = np.zeros(len(chunk), dtype=bool)
+        duplicate[valid] = (ids[valid].duplicated() | ids[valid].isin(projects.keys())).to_numpy()
+        reason = np.where(duplicate, "duplicate project ID", reason)
+        valid &= ~duplicate
+
+        errors.append(_error_frame(offset, reason, ids, "Project"))
+        projects.update(
+            (i, {"cost": c, "benefit": b})
+            for i, c, b in zip(ids[valid].tolist(), _numbers(cost[valid]), _numbers(benefit[valid]))
+        )
+    return projects, _concat_errors(errors, "Project")
+
+
+def read_budget(source, file_format=None, chunksize=50_000):
+    """
+    Reads budget entries from a CSV, Parquet or Excel file in chunks.
+
+    Parameters:
+    - source (str or file): Path or binary file object.
+    - file_format (str, optional): One of FILE_FORMATS; inferred from the file name when omitted.
+    - chunksize (int): Rows per chunk.
+
+    Returns:
+    - tuple: (budget, errors) where budget is a list of dicts with 'year' and 'amount' sorted by
+      year and errors is a pandas.DataFrame with the row number, year and reason of every
+      rejected row.
+    """
+    amounts = {}
+    errors = []
+    for offset, chunk in _iter_chunks(source, file_format, chunksize):
+        chunk = _select_columns(chunk, BUDGET_COLUMNS)
+        year = pd.to_numeric(chunk["year"], errors="coerce")
+        amount = pd.to_numeric(chunk["amount"], errors="coerce")
+
+        reason = np.select(
+            [
+                year.isna().to_numpy(),
+                (year != year.round()).to_numpy(),
+                amount.isna().to_numpy(),
+                (amount < 0).to_numpy(),
+            ],
+            ["year is not a number", "year is not a whole number", "amount is not a number", "amount is negative"],
+            default="",
+        )
+        valid = reason == ""
+        duplicate = np.zeros(len(chunk), dtype=bool)
+        duplicate[valid] = (year[valid].duplicated() | year[valid].isin(amounts.keys())).to_numpy()
+        reason = np.where(duplicate, "duplicate year", reason)
+        valid &= ~duplicate
+
+        errors.append(_error_frame(offset, reason, chunk["year"], "Year"))
+        amounts.update(zip(year[valid].astype(int).tolist(), _numbers(amount[valid])))
+    budget = [{"year": y, "amount": amounts[y]} for y in sorted(amounts)]
+    return budget, _concat_errors(errors, "Year")
+
+
+def projects_table(projects):
+    """Returns projects as a table with columns id, cost and benefit, the layout read_projects accepts."""
+    return pd.DataFrame.from_records(
+        ((i, details["cost"], details["benefit"]) for i, details in projects.items()),
+        columns=["id", "cost", "benefit"],
+    )
+
+
+def budget_table(budget):
+    """Returns budget entries as a table with columns year and amount, sorted by year."""
+    return pd.DataFrame.from_records(
+        sorted((entry["year"], entry["amount"]) for entry in budget),
+        columns=["year", "amount"],
+    )
+
+
+def write_table(frame, target, file_format=None):
+    """
+    Writes a table as CSV, Parquet or Excel.
+
+    Parameters:
+    - target (str or file): Path or binary file object.
+    - file_format (str, optional): One of FILE_FORMATS; inferred from the file name when omitted.
+    """
+    file_format = _file_format(target, file_format)
+    if file_format == "csv":
+        if isinstance(target, (str, os.PathLike)):
+            frame.to_csv(target, index=False)
+        else:
+            target.write(frame.to_csv(index=False).encode("utf-8"))
+    elif file_format == "parquet":
+        _require("pyarrow", "Parquet")
+        frame.to_parquet(target, index=False)
+    else:
+        _require("openpyxl", "Excel")
+        frame.to_excel(target, index=False)
+
+
+def table_bytes(frame, file_format):
+    """Returns a table written in file_format as bytes, e.g. for a download button."""
+    buffer = io.BytesIO()
+    write_table(frame, buffer, file_format)
+    return buffer.getvalue()
+
+
+def _iter_chunks(source, file_format, chunksize):
+    """Yields (offset, DataFrame) pairs, offset being the number of data rows before the chunk."""
+    file_format = _file_format(source, file_format)
+    offset = 0
+    if file_format == "csv":
+        chunks = pd.read_csv(source, dtype=str, chunksize=chunksize, skipinitialspace=True)
+    elif file_format == "parquet":
+        _require("pyarrow", "Parquet")
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize))
+    else:
+        chunks = _iter_excel_chunks(source, chunksize)
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(len(chunk))
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def _iter_excel_chunks(source, chunksize):
+    _require("openpyxl", "Excel")
+    import openpyxl
+    # Read-only mode streams the rows of the first sheet instead of loading the workbook
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value) if value is not None else "" for value in next(rows, ())]
+        while True:
+            block = list(itertools.islice(rows, chunksize))
+            if not block:
+                break
+            yield pd.DataFrame.from_records(block, columns=header)
+    finally:
+        workbook.close()
+
+
+def _select_columns(chunk, columns):
+    """Renames the accepted headers of a chunk to the canonical column names."""
+    headers = {str(column).strip().lower(): column for column in chunk.columns}
+    selected = {}
+    for name, aliases in columns.items():
+        column = next((headers[alias] for alias in aliases if alias in headers), None)
+        if column is None:
+            raise ValueError(f"Column '{name}' is missing. Expected columns: {', '.join(columns)}.")
+        selected[name] = chunk[column]
+    return pd.DataFrame(selected)
+
+
+def _error_frame(offset, reason, values, label):
+    bad = np.nonzero(reason != "")[0]
+    return pd.DataFrame({"Row": bad + offset + 1, label: values.iloc[bad].to_numpy(), "Reason": reason[bad]})
+
+
+def _concat_errors(errors, label):
+    errors = [frame for frame in errors if len(frame)]
+    if not errors:
+        return pd.DataFrame(columns=["Row", label, "Reason"])
+    return pd.concat(errors, ignore_index=True)
+
+
+def _numbers(series):
+    """Converts a numeric series to a list of Python numbers, keeping whole numbers as int."""
+    values = series.to_numpy(dtype=float)
+    if np.all(values == np.round(values)):
+        return values.astype(np.int64).tolist()
+    return values.tolist()
+
+
+def _file_format(source, file_format):
+    if file_format is not None:
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unknown file format '{file_format}'. Choose one of: {', '.join(FILE_FORMATS)}.")
+        return file_format
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    suffix = os.path.splitext(str(name))[1].lower()
+    if suffix not in _SUFFIXES:
+        raise ValueError(f"Cannot infer the file format of '{name}'. Pass one of: {', '.join(FILE_FORMATS)}.")
+    return _SUFFIXES[suffix]
+
+
+def _require(module, label):
+    try:
+        __import__(module)
+    except ImportError:
+        raise ValueError(f"{label} files need the '{module}' package, which is not installed.")
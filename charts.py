@@ -0,0 +1,219 @@
+# charts.py
+
+import pandas as pd
+import plotly.express as px
+
+# Above this many projects, charts show the top projects plus one "Other" bucket
+AGGREGATE_THRESHOLD = 25
+# Line charts with more traces than this are drawn with WebGL (Scattergl)
+WEBGL_THRESHOLD = 15
+
+
+def should_aggregate(num_projects, mode="auto"):
+    """Whether charts of num_projects projects are aggregated; mode is "auto", "per project" or "aggregated"."""
+    if mode == "auto":
+        return num_projects > AGGREGATE_THRESHOLD
+    return mode == "aggregated"
+
+
+def top_projects(values, k):
+    """
+    Returns the k projects with the largest values.
+
+    Parameters:
+    - values (pandas.Series): Value per project, indexed by project ID.
+    """
+    return values.nlargest(k, keep="first").index
+
+
+def expenditure_chart(expenditures, projects, aggregate=False, top_k=AGGREGATE_THRESHOLD):
+    """
+    Line chart of cumulative expenditure per project over the years.
+
+    Parameters:
+    - expenditures (pandas.DataFrame): result_tables.expenditures_frame of the result.
+    - projects (list): Project IDs to include.
+    - aggregate (bool): Draw the top_k projects by total expenditure and one line for the rest.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    data = expenditures[expenditures["Project"].isin(projects)]
+    if aggregate:
+        totals = data.groupby("Project", sort=False)["Expenditure"].sum()
+        top = top_projects(totals, top_k)
+        rest = data[~data["Project"].isin(top)]
+        data = data[data["Project"].isin(top)]
+        if len(rest):
+            other = rest.groupby("Year", as_index=False)["Expenditure"].sum().sort_values("Year")
+            other["Cumulative Expenditure"] = other["Expenditure"].cumsum()
+            other["Project"] = f"Other ({rest['Project'].nunique()} projects)"
+            data = pd.concat([data, other], ignore_index=True)
+
+    num_traces = data["Project"].nunique()
+    fig = px.line(
+        data,
+        x='Year',
+        y='Cumulative Expenditure',
+        color='Project',
+        markers=num_traces <= WEBGL_THRESHOLD,
+        render_mode='webgl' if num_traces > WEBGL_THRESHOLD else 'auto',
+        title='Cumulative Expenditures Over Years',
+        labels={'Cumulative Expenditure': 'Cumulative Expenditures (k PLN)'},
+        template='plotly_white'
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def benefit_chart(project_details, projects, aggregate=False, top_k=AGGREGATE_THRESHOLD):
+    """
+    Grouped bar chart of total benefit and ROI per project.
+
+    Parameters:
+    - project_details (pandas.DataFrame): result_tables.projects_frame of the result.
+    - projects (list): Project IDs to include.
+    - aggregate (bool): Draw the top_k projects by total benefit and one bar for the rest,
+      with the summed benefit and the mean ROI of the rest.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    data = project_details.loc[project_details["Project"].isin(projects), ["Project", "Total Benefit", "ROI (%)"]]
+    if aggregate and len(data) > top_k:
+        top = top_projects(data.set_index("Project")["Total Benefit"], top_k)
+        rest = data[~data["Project"].isin(top)]
+        other = pd.DataFrame([{
+            "Project": f"Other ({len(rest)} projects)",
+            "Total Benefit": rest["Total Benefit"].sum(),
+            "ROI (%)": rest["ROI (%)"].mean(),
+        }])
+        data = pd.concat([data[data["Project"].isin(top)], other], ignore_index=True)
+
+    fig = px.bar(
+        data,
+        x='Project',
+        y=['Total Benefit', 'ROI (%)'],
+        barmode='group',
+        title='Total Benefit and ROI of Selected Projects',
+        labels={'value': 'Value', 'variable': 'Metric'},
+        template='plotly_white',
+        hover_data=['ROI (%)']
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def portfolio_spending_chart(expenditures, annual_budget=None):
+    """
+    Line chart of the portfolio's cumulative spending, one point per year.
+
+    Parameters:
+    - expenditures (pandas.DataFrame): result_tables.expenditures_frame of the result.
+    - annual_budget (list, optional): Budget entries; their cumulative amount is drawn for comparison.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    data = expenditures.groupby("Year", as_index=False)["Expenditure"].sum().sort_values("Year")
+    data["Cumulative Spending"] = data["Expenditure"].cumsum()
+    series = data[["Year", "Cumulative Spending"]].assign(Series="Spending")
+    if annual_budget:
+        budget = pd.DataFrame(annual_budget).sort_values("year")
+        series = pd.concat([
+            series.rename(columns={"Cumulative Spending": "Amount"}),
+            pd.DataFrame({"Year": budget["year"], "Amount": budget["amount"].cumsum(), "Series": "Budget"}),
+        ], ignore_index=True)
+    else:
+        series = series.rename(columns={"Cumulative Spending": "Amount"})
+
+    fig = px.line(
+        series,
+        x='Year',
+        y='Amount',
+        color='Series',
+        markers=True,
+        title='Cumulative Portfolio Spending',
+        labels={'Amount': 'Cumulative Amount (k PLN)'},
+        template='plotly_white'
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def selection_frequency_chart(robust_projects, aggregate=False, top_k=AGGREGATE_THRESHOLD):
+    """
+    Bar chart of how often each project is funded across the samples of a robustness analysis.
+
+    Parameters:
+    - robust_projects (pandas.DataFrame): Project table of robustness.robustness_frames.
+    - aggregate (bool): Draw only the top_k projects whose selection is least certain, i.e.
+      whose frequency is closest to 50%.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    data = robust_projects
+    title = 'Selection Frequency per Project'
+    if aggregate and len(data) > top_k:
+        uncertainty = -(data.set_index("Project")["Selection Frequency (%)"] - 50).abs()
+        data = data[data["Project"].isin(top_projects(uncertainty, top_k))]
+        title = f'Selection Frequency of the {top_k} Least Certain Projects'
+
+    fig = px.bar(
+        data,
+        x='Project',
+        y='Selection Frequency (%)',
+        color='Funded in Nominal Plan',
+        title=title,
+        range_y=[0, 100],
+        template='plotly_white'
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def completion_distribution_chart(robust_completion, projects):
+    """
+    Heatmap of the share of samples in which each project is completed in each year.
+
+    Parameters:
+    - robust_completion (pandas.DataFrame): Completion table of robustness.robustness_frames.
+    - projects (list): Project IDs to include, in display order.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    data = robust_completion[robust_completion["Project"].isin(projects)]
+    grid = data.pivot(index="Project", columns="Year", values="Share (%)").reindex(projects)
+    fig = px.imshow(
+        grid,
+        aspect='auto',
+        color_continuous_scale='Greens',
+        labels={'color': 'Share of Samples (%)'},
+        title='Completion Year Distribution',
+        template='plotly_white'
+    )
+    fig.update_layout(title_x=0.5)
+    return fig
+
+
+def benefit_distribution_chart(robust_objectives, nominal_objective=None):
+    """
+    Histogram of the total benefits of the solved samples, with the nominal plan's benefit marked.
+
+    Returns:
+    - plotly.graph_objects.Figure
+    """
+    fig = px.histogram(
+        robust_objectives,
+        x='Total Benefits',
+        nbins=40,
+        title='Distribution of Total Benefits',
+        labels={'Total Benefits': 'Total Benefits (Units)'},
+        template='plotly_white'
+    )
+    if nominal_objective is not None:
+        fig.add_vline(x=nominal_objective, line_dash='dash', annotation_text='Nominal')
+    fig.update_layout(title_x=0.5, yaxis_title='Samples')
+    return fig
@@ -0,0 +1,138 @@
+# cli.py
+
+import argparse
+import json
+import os
+import sys
+
+# Result file formats by suffix; JSON holds the whole result dict, the others the projects table
+OUTPUT_FORMATS = {".json": "json", ".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+def main(argv=None):
+    """
+    Solves a portfolio from files without the Streamlit app.
+
+    Projects and budget are read from JSON files in the app's format (projects as an object
+    of ID to cost and benefit, budget as a list of year and amount) or from CSV, Parquet and
+    Excel files as accepted by the app's import. The result is written as JSON to standard
+    output or to --output, whose suffix selects JSON, CSV or Parquet.
+
+    pandas and the solver bindings are only imported when a file format or engine needs them,
+    so a JSON-to-JSON solve starts without their import cost.
+
+    Returns:
+    - int: 0 if a solution was found, 1 if not, 2 for invalid input.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    output_format = _output_format(args.output)
+    if output_format is None:
+        parser.error(f"cannot infer the result format of '{args.output}', use one of: {', '.join(OUTPUT_FORMATS)}")
+
+    try:
+        projects = _read_projects(args.projects)
+        budget = _read_budget(args.budget)
+    except (OSError, ValueError) as e:
+        print(f"Error reading input: {e}", file=sys.stderr)
+        return 2
+
+    from long_term_investment_programming import SOLVED_STATUSES, run_optimization
+
+    try:
+        results = run_optimization(
+            projects, budget, formulation=args.formulation, engine=args.engine, solver=args.solver,
+            time_limit=args.time_limit, gap=args.gap, threads=args.threads, log_path=args.log,
+            presolve=not args.no_presolve, profile_path=args.profile, window=args.window,
+            window_step=args.window_step, bound=not args.no_bound,
+        )
+    except ValueError as e:
+        print(f"Error during optimization: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        _write_results(results, args.output, output_format)
+    except (OSError, ValueError) as e:
+        print(f"Error writing results: {e}", file=sys.stderr)
+        return 2
+    print(f"Status: {results['status']}, objective: {results['objective']}, "
+          f"{results['performance']['total']:.3f} seconds.", file=sys.stderr)
+    return 0 if results["status"] in SOLVED_STATUSES else 1
+
+
+def _parser():
+    # Kept free of imports from the optimizer so that --help is instant
+    engines = ("pulp", "matrix", "heuristic", "decomposition", "rolling")
+    parser = argparse.ArgumentParser(
+        prog="python -m long_term_investment_programming",
+        description="Selects and schedules projects to maximize total benefit within the annual budget.",
+    )
+    parser.add_argument("projects", help="Projects file (.json, .csv, .parquet or .xlsx).")
+    parser.add_argument("budget", help="Budget file (.json, .csv, .parquet or .xlsx).")
+    parser.add_argument("-o", "--output", help="Result file (.json, .csv or .parquet); JSON to standard output by default.")
+    parser.add_argument("--engine", choices=engines, default="pulp")
+    parser.add_argument("--solver", choices=("cbc", "highs", "glpk"), default="cbc")
+    parser.add_argument("--formulation", choices=("cumulative", "classic", "tight"), default="cumulative")
+    parser.add_argument("--time-limit", type=float, help="Maximum solve time in seconds.")
+    parser.add_argument("--gap", type=float, help="Relative MIP gap at which the solver may stop, e.g. 0.01.")
+    parser.add_argument("--threads", type=int, help="Number of solver threads.")
+    parser.add_argument("--window", type=int, default=5, help="Years the rolling engine models in detail.")
+    parser.add_argument("--window-step", type=int, help="Years the rolling engine fixes per solve; the window by default.")
+    parser.add_argument("--no-presolve", action="store_true", help="Build the model of the full portfolio.")
+    parser.add_argument("--no-bound", action="store_true", help="Skip the bound of the heuristic and rolling engines.")
+    parser.add_argument("--log", help="File the solver log is written to.")
+    parser.add_argument("--profile", help="File a cProfile dump of the solve is written to.")
+    return parser
+
+
+def _read_projects(path):
+    if _is_json(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    from bulk_io import read_projects
+    projects, errors = read_projects(path)
+    _report_rejected(errors, path)
+    return projects
+
+
+def _read_budget(path):
+    if _is_json(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    from bulk_io import read_budget
+    budget, errors = read_budget(path)
+    _report_rejected(errors, path)
+    return budget
+
+
+def _is_json(path):
+    return os.path.splitext(path)[1].lower() == ".json"
+
+
+def _report_rejected(errors, path):
+    if len(errors):
+        print(f"{len(errors)} rows of {path} were rejected:", file=sys.stderr)
+        print(errors.to_string(index=False), file=sys.stderr)
+
+
+def _output_format(path):
+    return OUTPUT_FORMATS.get(os.path.splitext(path)[1].lower()) if path else "json"
+
+
+def _write_results(results, path, file_format):
+    if file_format == "json":
+        text = json.dumps(results, indent=2, default=str)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        else:
+            print(text)
+        return
+
+    from bulk_io import write_table
+    from result_tables import projects_frame
+    write_table(projects_frame(results), path, file_format)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
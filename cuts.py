@@ -0,0 +1,68 @@
+# cuts.py
+
+import numpy as np
+
+
+def earliest_completion(costs, annual_budgets):
+    """
+    Returns the earliest completion year index (1..T) of every project.
+
+    A project cannot be completed before the cumulative budget covers its cost; projects
+    costing more than the whole budget get T + 1.
+    """
+    cumulative = np.cumsum(np.asarray(annual_budgets, dtype=float))
+    tolerance = 1e-9 * max(1.0, cumulative[-1] if len(cumulative) else 0.0)
+    return np.searchsorted(cumulative, np.asarray(costs, dtype=float) - tolerance, side="left") + 1
+
+
+def cardinality_limits(costs, annual_budgets):
+    """
+    Returns, per year, the largest number of projects that can be completed by that year.
+
+    Projects completed by year t have together cost no more than the cumulative budget of
+    years 1..t, so no more of them than the cheapest ones whose costs fit into it can be
+    complete. Σ_i z[i, t] <= k_t is the extended cover inequality of the cumulative budget
+    knapsack Σ_i cost_i * z[i, t] <= Σ_{τ<=t} B_τ for the cover formed by the k_t + 1
+    cheapest projects, and is not implied by the LP relaxation.
+
+    Returns:
+    - numpy.ndarray: k_t per year index 0..T-1.
+    """
+    cumulative = np.cumsum(np.asarray(annual_budgets, dtype=float))
+    tolerance = 1e-9 * max(1.0, cumulative[-1] if len(cumulative) else 0.0)
+    prefix = np.cumsum(np.sort(np.asarray(costs, dtype=float)))
+    return np.searchsorted(prefix, cumulative + tolerance, side="right")
+
+
+def dominance_parents(costs, benefits):
+    """
+    Links projects to a project dominating them, for symmetry-breaking orderings.
+
+    Project i dominates project j if it costs no more and yields at least the same benefit.
+    Some optimal solution then completes i no later than j: if j finishes first, funding i
+    from the combined spending of both and j from the rest finishes i by j's old completion
+    year and j by i's, which never lowers the objective. Repeating the exchange along an order
+    of the projects leaves a solution satisfying z[j, t] <= z[i, t] for every linked pair at
+    once, so the orderings cut off only solutions with an equally good counterpart. Projects
+    with identical cost and benefit are chained in input order, which removes their symmetry.
+
+    Every project is linked to the nearest preceding project in the order (cost ascending,
+    benefit descending) with at least its benefit, so there is at most one ordering per project
+    and the others follow by transitivity.
+
+    Returns:
+    - numpy.ndarray: Index of the dominating project per project, -1 where there is none.
+    """
+    costs = np.asarray(costs, dtype=float)
+    benefits = np.asarray(benefits, dtype=float)
+    order = np.lexsort((np.arange(len(costs)), -benefits, costs))
+    parents = np.full(len(costs), -1)
+    # Projects of the order so far not followed by a higher benefit, benefit descending
+    stack = []
+    for j in order.tolist():
+        while stack and benefits[stack[-1]] < benefits[j]:
+            stack.pop()
+        if stack:
+            parents[j] = stack[-1]
+        stack.append(j)
+    return parents
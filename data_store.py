@@ -0,0 +1,248 @@
+# data_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    cost NUMERIC NOT NULL,
+    benefit NUMERIC NOT NULL
+);
+CREATE TABLE IF NOT EXISTS budget (
+    year INTEGER PRIMARY KEY,
+    amount NUMERIC NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES ('revision', 0);
+"""
+
+
+class DataStore:
+    """
+    SQLite storage of projects, budget and optimization results.
+
+    Every edit writes only the affected row in its own transaction and increments a revision
+    counter, so concurrent users of one server never overwrite each other's changes and
+    readers can skip loading data that has not changed since their last read. The database
+    runs in WAL mode, which lets reads proceed while another connection writes.
+
+    Usage:
+        store = DataStore("investment.db")
+        store.upsert_project("J", cost=120, benefit=12)
+        projects, budget, revision = store.load()
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def revision(self):
+        """Returns the number of writes made to projects and budget so far."""
+        return self._connection().execute("SELECT value FROM meta WHERE name = 'revision'").fetchone()[0]
+
+    def load(self):
+        """
+        Reads all projects and budget entries.
+
+        Returns:
+        - tuple: (projects, budget, revision) with projects in insertion order and the budget
+          sorted by year, in the format run_optimization expects.
+        """
+        conn = self._connection()
+        # One read transaction, so that the data and revision belong together
+        with conn:
+            conn.execute("BEGIN")
+            projects = {
+                project_id: {"cost": cost, "benefit": benefit}
+                for project_id, cost, benefit in conn.execute("SELECT id, cost, benefit FROM projects ORDER BY rowid")
+            }
+            budget = [
+                {"year": year, "amount": amount}
+                for year, amount in conn.execute("SELECT year, amount FROM budget ORDER BY year")
+            ]
+            revision = conn.execute("SELECT value FROM meta WHERE name = 'revision'").fetchone()[0]
+        return projects, budget, revision
+
+    def upsert_project(self, project_id, cost, benefit):
+        """Adds a project or updates the cost and benefit of an existing one."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO projects (id, cost, benefit) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET cost = excluded.cost, benefit = excluded.benefit",
+                (project_id, cost, benefit),
+            )
+
+    def upsert_projects(self, projects):
+        """Adds or updates many projects in one transaction."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO projects (id, cost, benefit) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET cost = excluded.cost, benefit = excluded.benefit",
+                ((project_id, details["cost"], details["benefit"]) for project_id, details in projects.items()),
+            )
+
+    def apply_project_changes(self, upserts, deletes):
+        """Deletes the project IDs in deletes, then adds or updates the projects in upserts, in one transaction."""
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM projects WHERE id = ?", ((project_id,) for project_id in deletes))
+            conn.executemany(
+                "INSERT INTO projects (id, cost, benefit) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET cost = excluded.cost, benefit = excluded.benefit",
+                ((project_id, details["cost"], details["benefit"]) for project_id, details in upserts.items()),
+            )
+
+    def delete_project(self, project_id):
+        """Deletes a project if it exists."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def upsert_budget(self, year, amount):
+        """Adds a budget year or updates the amount of an existing one."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO budget (year, amount) VALUES (?, ?) "
+                "ON CONFLICT (year) DO UPDATE SET amount = excluded.amount",
+                (year, amount),
+            )
+
+    def upsert_budget_entries(self, budget):
+        """Adds or updates many budget years in one transaction."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO budget (year, amount) VALUES (?, ?) "
+                "ON CONFLICT (year) DO UPDATE SET amount = excluded.amount",
+                ((entry["year"], entry["amount"]) for entry in budget),
+            )
+
+    def apply_budget_changes(self, upserts, deletes):
+        """Deletes the years in deletes, then adds or updates the years in upserts (year mapped to amount), in one transaction."""
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM budget WHERE year = ?", ((year,) for year in deletes))
+            conn.executemany(
+                "INSERT INTO budget (year, amount) VALUES (?, ?) "
+                "ON CONFLICT (year) DO UPDATE SET amount = excluded.amount",
+                upserts.items(),
+            )
+
+    def update_budget_year(self, year, new_year, amount):
+        """
+        Moves the budget entry of year to new_year with the given amount.
+
+        Raises:
+        - ValueError: If new_year differs from year and already has a budget entry.
+        """
+        try:
+            with self._transaction() as conn:
+                conn.execute("UPDATE budget SET year = ?, amount = ? WHERE year = ?", (new_year, amount, year))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Year {new_year} already exists.")
+
+    def delete_budget(self, year):
+        """Deletes the budget entry of a year if it exists."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM budget WHERE year = ?", (year,))
+
+    def replace_all(self, projects, budget):
+        """Replaces all projects and budget entries in one transaction."""
+        with self._transaction() as conn:
+            self._replace_projects(conn, projects)
+            self._replace_budget(conn, budget)
+
+    def replace_projects(self, projects):
+        """Replaces all projects in one transaction."""
+        with self._transaction() as conn:
+            self._replace_projects(conn, projects)
+
+    def replace_budget(self, budget):
+        """Replaces all budget entries in one transaction."""
+        with self._transaction() as conn:
+            self._replace_budget(conn, budget)
+
+    def save_result(self, key, result):
+        """Stores an optimization result under key, together with the current data revision."""
+        self._connection().execute(
+            "INSERT INTO results (key, revision, created_at, result) "
+            "VALUES (?, (SELECT value FROM meta WHERE name = 'revision'), ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET revision = excluded.revision, "
+            "created_at = excluded.created_at, result = excluded.result",
+            (key, time.time(), json.dumps(result)),
+        )
+
+    def load_result(self, key):
+        """Returns the result stored under key, or None."""
+        row = self._connection().execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest_result(self):
+        """Returns the most recently stored result, or None."""
+        row = self._connection().execute("SELECT result FROM results ORDER BY created_at DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def import_json(self, projects_path, budget_path):
+        """
+        Copies projects and budget from the JSON files of earlier versions into an empty store.
+
+        Returns:
+        - bool: True if data was imported.
+        """
+        if self.revision() or not (os.path.exists(projects_path) or os.path.exists(budget_path)):
+            return False
+        projects, budget = {}, []
+        if os.path.exists(projects_path):
+            with open(projects_path, "r") as f:
+                projects = json.load(f)
+        if os.path.exists(budget_path):
+            with open(budget_path, "r") as f:
+                budget = json.load(f)
+        self.replace_all(projects, budget)
+        return True
+
+    def _replace_projects(self, conn, projects):
+        conn.execute("DELETE FROM projects")
+        conn.executemany(
+            "INSERT INTO projects (id, cost, benefit) VALUES (?, ?, ?)",
+            ((project_id, details["cost"], details["benefit"]) for project_id, details in projects.items()),
+        )
+
+    def _replace_budget(self, conn, budget):
+        conn.execute("DELETE FROM budget")
+        conn.executemany(
+            "INSERT INTO budget (year, amount) VALUES (?, ?)",
+            ((entry["year"], entry["amount"]) for entry in budget),
+        )
+
+    def _connection(self):
+        # One connection per thread; sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Runs a write transaction that increments the revision counter on commit."""
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'revision'")
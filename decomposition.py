@@ -0,0 +1,207 @@
+# decomposition.py
+
+import time
+
+import numpy as np
+
+import profiling
+from heuristic import _evaluate, _greedy_fill, _schedule
+from long_term_investment_programming import compile_array_results, sort_budget
+
+# Subgradient iterations between two repairs of the subproblem solutions
+REPAIR_INTERVAL = 10
+# Iterations without a better dual bound before the step size is halved
+PATIENCE = 5
+
+
+def solve_decomposition(projects, budget, time_limit=None, gap=None, max_iterations=300):
+    """
+    Solves large portfolios by Lagrangian relaxation of the annual budget constraints.
+
+    With multipliers on the Budget_t constraints the model splits into one subproblem per
+    project: pick a completion year k (not before the cumulative budget covers the cost) and
+    pay the whole cost in the year up to k with the lowest multiplier, or skip the project.
+    The subproblems are solved in closed form for all projects at once as an (N, T) array,
+    and the multipliers are updated by subgradient steps with Polyak step sizes. Every
+    REPAIR_INTERVAL iterations the subproblem solutions are repaired into a feasible
+    portfolio: the chosen projects are scheduled back to back in order of their completion
+    year, then the remaining budget is filled greedily by benefit per unit cost.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - time_limit (float, optional): Seconds the subgradient iterations may run for.
+    - gap (float, optional): Stop once the relative gap between the best portfolio and the
+      dual bound is at most this.
+    - max_iterations (int): Maximum number of subgradient iterations.
+
+    Returns:
+    - dict: Same structure as run_optimization's result, with 'status' "Feasible" (or "Optimal"
+      when the portfolio meets the bound), plus the dual 'bound', the relative 'gap' between
+      portfolio and bound and the number of 'iterations'.
+    """
+    project_ids = list(projects)
+    years, annual_budgets = sort_budget(budget)
+    num_years = len(years)
+
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+    amounts = np.array(annual_budgets, dtype=float)
+    cumulative = np.cumsum(amounts)
+    # Benefit starts the year after completion, so everything must be paid before the last year
+    capacity = cumulative[-2] if num_years > 1 else 0.0
+
+    ratio = np.divide(benefits, costs, out=np.full(len(costs), np.inf), where=costs > 0)
+    priority = np.lexsort((-benefits, -ratio))
+    eligible = (benefits > 0) & (costs <= capacity)
+
+    benefit_years, allowed = _completion_years(costs, cumulative)
+
+    def repair(chosen, completion):
+        # Chosen projects first, by completion year, then everything else by priority
+        with profiling.phase("repair"):
+            key = np.where(chosen, completion, num_years)
+            order = priority[np.argsort(key[priority], kind="stable")]
+            selected = _greedy_fill(np.zeros(len(costs), dtype=bool), order, costs, chosen & eligible, capacity)
+            selected = _greedy_fill(selected, order, costs, eligible, capacity - costs[selected].sum())
+            return selected, order, _evaluate(selected, order, costs, benefits, cumulative)
+
+    best_selected, best_order, objective = repair(np.zeros(len(costs), dtype=bool), np.zeros(len(costs), dtype=int))
+    upper_bound = np.inf
+    multipliers = np.zeros(num_years)
+    step = 2.0
+    stalled = 0
+    iterations = 0
+    deadline = time.perf_counter() + time_limit if time_limit is not None else np.inf
+
+    while (
+        num_years and iterations < max_iterations and time.perf_counter() < deadline and step > 1e-4
+        and not _within(objective, upper_bound, gap or 0.0)
+    ):
+        iterations += 1
+
+        with profiling.phase("subproblems"):
+            dual, chosen, completion, spent = _subproblems(multipliers, costs, benefits, amounts, benefit_years, allowed)
+        if dual < upper_bound - 1e-9 * max(1.0, abs(dual)):
+            upper_bound = dual
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= PATIENCE:
+                step /= 2
+                stalled = 0
+
+        if iterations % REPAIR_INTERVAL == 1:
+            selected, order, value = repair(chosen, completion)
+            if value > objective:
+                best_selected, best_order, objective = selected, order, value
+
+        # Subgradient of the dual function; the multipliers stay nonnegative
+        subgradient = amounts - spent
+        norm = float(subgradient @ subgradient)
+        if norm == 0:
+            break
+        multipliers = np.maximum(multipliers - step * (dual - objective) / norm * subgradient, 0.0)
+
+    upper_bound = max(upper_bound, objective) if np.isfinite(upper_bound) else None
+    x, z = _schedule(best_selected, best_order, costs, cumulative)
+    gap_value = None
+    status = "Feasible"
+    if upper_bound is not None:
+        gap_value = max(upper_bound - objective, 0.0) / max(abs(objective), 1e-9)
+        if _within(objective, upper_bound, 0.0):
+            status = "Optimal"
+
+    with profiling.phase("extract"):
+        results = compile_array_results(project_ids, costs, benefits, years, x, z, best_selected.astype(float),
+                                         status, objective)
+    results["bound"] = upper_bound
+    results["gap"] = gap_value
+    results["iterations"] = iterations
+    return results
+
+
+def lagrangian_bound(costs, benefits, annual_budgets, objective, time_limit=None, max_iterations=300):
+    """
+    Returns the Lagrangian dual bound of solve_decomposition without repairing portfolios.
+
+    Every iteration solves the per-project subproblems in closed form in O(N * T), so the
+    bound is cheap where the LP relaxation of a large portfolio is not. Any multipliers give
+    a valid bound; the subgradient steps only make it tighter.
+
+    Parameters:
+    - costs (numpy.ndarray): Project costs.
+    - benefits (numpy.ndarray): Annual project benefits.
+    - annual_budgets (list): Budget amounts of the years in order.
+    - objective (float): Objective of a feasible portfolio, the target of the step sizes.
+    - time_limit (float, optional): Seconds the subgradient iterations may run for.
+    - max_iterations (int): Maximum number of subgradient iterations.
+
+    Returns:
+    - float: Upper bound on the optimal total benefit, at least objective.
+    """
+    amounts = np.asarray(annual_budgets, dtype=float)
+    if not len(amounts):
+        return max(objective, 0.0)
+    benefit_years, allowed = _completion_years(costs, np.cumsum(amounts))
+    upper_bound = np.inf
+    multipliers = np.zeros(len(amounts))
+    step = 2.0
+    stalled = 0
+    deadline = time.perf_counter() + time_limit if time_limit is not None else np.inf
+
+    for _ in range(max_iterations):
+        dual, _, _, spent = _subproblems(multipliers, costs, benefits, amounts, benefit_years, allowed)
+        if dual < upper_bound - 1e-9 * max(1.0, abs(dual)):
+            upper_bound = dual
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= PATIENCE:
+                step /= 2
+                stalled = 0
+
+        subgradient = amounts - spent
+        norm = float(subgradient @ subgradient)
+        if norm == 0 or step <= 1e-4 or time.perf_counter() >= deadline or _within(objective, upper_bound, 0.0):
+            break
+        multipliers = np.maximum(multipliers - step * (dual - objective) / norm * subgradient, 0.0)
+    return max(upper_bound, objective)
+
+
+def _completion_years(costs, cumulative):
+    """Benefit years of completion in every year index, and the completion years the budget allows."""
+    num_years = len(cumulative)
+    benefit_years = np.arange(num_years - 1, -1, -1, dtype=float)
+    earliest = np.searchsorted(cumulative, costs - 1e-9, side="left")
+    allowed = np.arange(num_years)[None, :] >= earliest[:, None]
+    return benefit_years, allowed
+
+
+def _subproblems(multipliers, costs, benefits, amounts, benefit_years, allowed):
+    """
+    Solves the per-project subproblems for the given multipliers.
+
+    Every project picks the completion year with the best gain, paying its cost in the year
+    with the lowest multiplier up to then, or is skipped if no gain is positive.
+
+    Returns:
+    - tuple: Dual function value, chosen projects, their completion year indices and the
+      spending per year of the chosen projects (the subgradient is amounts minus it).
+    """
+    num_years = len(multipliers)
+    cheapest = np.minimum.accumulate(multipliers)
+    cheapest_year = np.array([np.argmin(multipliers[:k + 1]) for k in range(num_years)], dtype=int)
+    gains = np.where(allowed, benefits[:, None] * benefit_years[None, :] - costs[:, None] * cheapest[None, :], -np.inf)
+    completion = gains.argmax(axis=1)
+    best_gain = gains[np.arange(len(costs)), completion]
+    chosen = best_gain > 0
+    spent = np.bincount(cheapest_year[completion[chosen]], weights=costs[chosen], minlength=num_years)
+    return float(multipliers @ amounts + best_gain[chosen].sum()), chosen, completion, spent
+
+
+def _within(objective, bound, gap):
+    """Whether objective is proven within the relative gap of the bound."""
+    if not np.isfinite(bound):
+        return False
+    return bound - objective <= gap * max(abs(objective), 1e-9) + 1e-6 * max(1.0, abs(bound))
@@ -0,0 +1,150 @@
+# frontier.py
+
+import pandas as pd
+
+from long_term_investment_programming import sort_budget
+from optimizer_session import OptimizerSession
+
+
+def budget_frontier(projects, budget, multipliers, tolerance=1e-6, **solver_options):
+    """
+    Computes the curve of total benefit against total budget over a grid of budget multipliers.
+
+    The optimal benefit never decreases when every annual budget grows, which the sweep uses
+    to avoid solves:
+    - Points are visited by bisection. When two solved points have the same objective, every
+      point between them lies on the same plateau and is filled in without solving.
+    - When the completion schedule of a solved point still fits the cumulative budget of a
+      smaller multiplier, that point has the same objective and is only rescheduled.
+
+    The remaining points are solved with one OptimizerSession, changing only the budget
+    right-hand sides, with the solution of the nearest solved smaller multiplier as MIP start
+    (always feasible). This saves model builds, not solve time: the session solves the model
+    without presolve, and in-process HiGHS does not use the start, so a point costs about as
+    much as a run_optimization call.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - multipliers (list): Factors applied to every annual budget amount.
+    - tolerance (float): Objective difference below which two points count as equal.
+    - solver_options: Passed to OptimizerSession. Plateaus are only inferred between proven
+      optimal points, so time limits reduce how many solves can be skipped.
+
+    Returns:
+    - tuple: (frame, results) where frame is a pandas.DataFrame with one row per multiplier
+      and results maps each multiplier to its run_optimization-style result.
+    """
+    multipliers = sorted(set(multipliers))
+    if not multipliers:
+        return pd.DataFrame(columns=_COLUMNS), {}
+
+    years, amounts = sort_budget(budget)
+    session = OptimizerSession(projects, budget, **solver_options)
+    results, starts, methods = {}, {}, {}
+
+    def scaled(m):
+        return [{"year": year, "amount": amount * m} for year, amount in zip(years, amounts)]
+
+    def solve(k):
+        m = multipliers[k]
+        session.update_budget(scaled(m))
+        # Nearest smaller multiplier with a model solution
+        start = next((starts[multipliers[j]] for j in range(k - 1, -1, -1) if multipliers[j] in starts), None)
+        results[m] = session.solve(start=start)
+        starts[m] = session.solution()
+        methods[m] = "solved"
+
+    def fill(k, source_k, method):
+        m, source = multipliers[k], multipliers[source_k]
+        results[m] = results[source]
+        if source in starts:
+            starts[m] = starts[source]
+        methods[m] = method
+
+    solve(0)
+    if len(multipliers) > 1:
+        solve(len(multipliers) - 1)
+
+    # Bisect every interval whose end points differ
+    pending = [(0, len(multipliers) - 1)]
+    while pending:
+        lo, hi = pending.pop()
+        if hi - lo < 2:
+            continue
+        lo_result, hi_result = results[multipliers[lo]], results[multipliers[hi]]
+        if (lo_result["status"] == hi_result["status"] == "Optimal"
+                and hi_result["objective"] - lo_result["objective"] <= tolerance):
+            for k in range(lo + 1, hi):
+                fill(k, lo, "plateau")
+            continue
+
+        mid = (lo + hi) // 2
+        rescheduled = _reschedule(results[multipliers[hi]], projects, [a * multipliers[mid] for a in amounts], years)
+        if rescheduled is not None:
+            results[multipliers[mid]] = rescheduled
+            methods[multipliers[mid]] = "plateau"
+        else:
+            solve(mid)
+        pending.append((lo, mid))
+        pending.append((mid, hi))
+
+    total_budget = sum(amounts)
+    rows = []
+    for m in multipliers:
+        result = results[m]
+        rows.append({
+            "Multiplier": m,
+            "Total Budget": total_budget * m,
+            "Total Benefits": result["objective"],
+            "Number of Funded Projects": sum(
+                1 for info in (result.get("projects") or {}).values()
+                if info["completion_year"] != "NOT FUNDED"
+            ),
+            "Status": result["status"],
+            "Method": methods[m],
+        })
+    return pd.DataFrame(rows, columns=_COLUMNS), results
+
+
+_COLUMNS = ["Multiplier", "Total Budget", "Total Benefits", "Number of Funded Projects", "Status", "Method"]
+
+
+def _reschedule(result, projects, amounts, years):
+    """
+    Finances the completion years of a result with the given annual amounts, if possible.
+
+    Spending may be moved to any earlier year, so the schedule fits exactly when, for every
+    year, the projects completed by then cost no more than the budget available up to that
+    year. Spending earliest-deadline-first then meets every completion year.
+
+    Returns:
+    - dict: A copy of result with recomputed expenditures, or None if the schedule does not fit.
+    """
+    if result["status"] != "Optimal":
+        return None
+    queue = sorted(
+        (i for i, info in result["projects"].items() if info["completion_year"] != "NOT FUNDED"),
+        key=lambda i: result["projects"][i]["completion_year"],
+    )
+    expenditures = {i: [] for i in result["projects"]}
+    remaining = {i: projects[i]["cost"] for i in queue}
+    for year, amount in zip(years, amounts):
+        while queue and (amount > 1e-9 or remaining[queue[0]] <= 1e-9):
+            i = queue[0]
+            spend = min(remaining[i], amount)
+            if spend > 1e-9:
+                expenditures[i].append({"year": year, "expenditure": spend})
+            remaining[i] -= spend
+            amount -= spend
+            if remaining[i] <= 1e-9:
+                queue.pop(0)
+        if queue and result["projects"][queue[0]]["completion_year"] <= year:
+            return None
+
+    return {
+        **result,
+        "projects": {
+            i: {**info, "expenditures": expenditures[i]} for i, info in result["projects"].items()
+        },
+    }
@@ -0,0 +1,168 @@
+# heuristic.py
+
+import time
+
+import numpy as np
+import pulp
+
+import profiling
+from long_term_investment_programming import compile_array_results, sort_budget
+
+# Candidates tried per pass on each side of a swap
+SWAP_CANDIDATES = 30
+
+
+def solve_heuristic(projects, budget, time_limit=1.0, bound=True):
+    """
+    Finds a good portfolio fast with greedy scheduling and local search, without a MIP solver.
+
+    Projects are scheduled back to back in order of benefit per unit cost, each one spending
+    the budget of the earliest years left over by the projects before it, so a selection is
+    evaluated with one cumulative sum and one binary search. The greedy start accepts every
+    project that still completes before the last year; the local search then swaps a
+    selected project for an unselected one while that raises the total benefit.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - time_limit (float): Seconds the local search may run for, and the bound after it.
+    - bound (bool): Compute the Lagrangian dual bound on the optimal objective (see
+      decomposition.lagrangian_bound), which takes O(N * T) per iteration instead of an LP solve.
+
+    Returns:
+    - dict: Same structure as run_optimization's result, with 'status' "Feasible" (or "Optimal"
+      when the solution meets the bound), plus the dual 'bound' and the relative 'gap' between
+      solution and bound; both are None without bound.
+    """
+    project_ids = list(projects)
+    years, annual_budgets = sort_budget(budget)
+    num_years = len(years)
+
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+    cumulative = np.cumsum(np.array(annual_budgets, dtype=float))
+    # Benefit starts the year after completion, so everything must be paid before the last year
+    capacity = cumulative[-2] if num_years > 1 else 0.0
+
+    ratio = np.divide(benefits, costs, out=np.full(len(costs), np.inf), where=costs > 0)
+    order = np.lexsort((-benefits, -ratio))
+    eligible = (benefits > 0) & (costs <= capacity)
+
+    def evaluate(selected):
+        return _evaluate(selected, order, costs, benefits, cumulative)
+
+    with profiling.phase("search"):
+        selected = _greedy_fill(np.zeros(len(costs), dtype=bool), order, costs, eligible, capacity)
+        objective = evaluate(selected)
+
+        # Local search: swap a selected project for an unselected one while that improves the objective
+        deadline = time.perf_counter() + time_limit
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            slack = capacity - costs[selected].sum()
+            inside = order[selected[order]][::-1]  # Lowest ratio first
+            outside = order[(eligible & ~selected)[order]][:SWAP_CANDIDATES]
+            for j in outside.tolist():
+                removable = inside[costs[inside] >= costs[j] - slack][:SWAP_CANDIDATES]
+                for i in removable.tolist():
+                    trial = selected.copy()
+                    trial[i], trial[j] = False, True
+                    trial = _greedy_fill(trial, order, costs, eligible, capacity - costs[trial].sum())
+                    value = evaluate(trial)
+                    if value > objective + 1e-9:
+                        selected, objective, improved = trial, value, True
+                        break
+                if improved or time.perf_counter() >= deadline:
+                    break
+
+    x, z = _schedule(selected, order, costs, cumulative)
+    upper_bound = None
+    if bound:
+        from decomposition import lagrangian_bound
+        with profiling.phase("bound"):
+            upper_bound = lagrangian_bound(costs, benefits, annual_budgets, objective, time_limit=time_limit)
+    gap = None
+    status = "Feasible"
+    if upper_bound is not None:
+        gap = max(upper_bound - objective, 0.0) / max(abs(objective), 1e-9)
+        if upper_bound - objective <= 1e-6 * max(1.0, abs(upper_bound)):
+            status = "Optimal"
+
+    with profiling.phase("extract"):
+        results = compile_array_results(project_ids, costs, benefits, years, x, z, selected.astype(float),
+                                        status, objective)
+    results["bound"] = upper_bound
+    results["gap"] = gap
+    return results
+
+
+def mip_start(results, budget):
+    """
+    Converts a result into variable values of the cumulative PuLP model, keyed by variable name.
+
+    The values can be passed as start to OptimizerSession.solve or JobManager.submit, so that
+    the exact solve starts from a heuristic solution instead of from scratch.
+    """
+    years, _ = sort_budget(budget)
+    year_index = {year: t for t, year in enumerate(years)}
+    start = {}
+    for i, info in (results.get("projects") or {}).items():
+        if info["completion_year"] == "NOT FUNDED":
+            continue
+        spent = np.zeros(len(years))
+        for exp in info["expenditures"]:
+            spent[year_index[exp["year"]]] += exp["expenditure"]
+        done = year_index[info["completion_year"]]
+        start[_variable_name(f"y_{i}")] = 1
+        for t, s in enumerate(np.cumsum(spent).tolist(), 1):
+            start[_variable_name(f"s_{i}_{t}")] = s
+            start[_variable_name(f"z_{i}_{t}")] = 1 if t - 1 >= done else 0
+    return start
+
+
+def _greedy_fill(selected, order, costs, eligible, slack):
+    """Selects, in priority order, every eligible unselected project that fits into slack."""
+    selected = selected.copy()
+    for i in order[(eligible & ~selected)[order]].tolist():
+        if costs[i] <= slack:
+            selected[i] = True
+            slack -= costs[i]
+    return selected
+
+
+def _evaluate(selected, order, costs, benefits, cumulative):
+    """Returns the total benefit of the selected projects scheduled back to back in priority order."""
+    scheduled = order[selected[order]]
+    done = np.searchsorted(cumulative, np.cumsum(costs[scheduled]) - 1e-9, side="left")
+    return float(benefits[scheduled] @ (len(cumulative) - 1 - done))
+
+
+def _schedule(selected, order, costs, cumulative):
+    """
+    Lays the selected projects out back to back on the cumulative budget.
+
+    Returns:
+    - tuple: (x, z) arrays of shape (N, T) with annual expenditures and completion status.
+    """
+    n, num_years = len(costs), len(cumulative)
+    scheduled = order[selected[order]]
+    finish = np.cumsum(costs[scheduled])
+    begin = finish - costs[scheduled]
+    year_begin = np.concatenate(([0.0], cumulative[:-1]))
+
+    x = np.zeros((n, num_years))
+    z = np.zeros((n, num_years))
+    # Each project pays for the part of its interval [begin, finish) that falls into a year's budget
+    x[scheduled] = np.clip(
+        np.minimum(finish[:, None], cumulative[None, :]) - np.maximum(begin[:, None], year_begin[None, :]),
+        0.0, None,
+    )
+    done = np.searchsorted(cumulative, finish - 1e-9, side="left")
+    z[scheduled] = np.arange(num_years)[None, :] >= done[:, None]
+    return x, z
+
+
+def _variable_name(name):
+    # PuLP replaces characters that are not allowed in LP files the same way
+    return pulp.LpElement.expression.sub("_", name)
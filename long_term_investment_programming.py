@@ -1,49 +1,393 @@
 # long_term_investment_programming.py
 
+import numpy as np
 import pulp
 
-def run_optimization(projects, budget):
+import profiling
+
+FORMULATIONS = ("cumulative", "classic", "tight")
+ENGINES = ("pulp", "matrix", "heuristic", "decomposition", "rolling")
+SOLVERS = ("cbc", "highs", "glpk")
+
+# Statuses for which a result carries a usable solution
+SOLVED_STATUSES = ("Optimal", "Feasible")
+
+
+def run_optimization(projects, budget, formulation="cumulative", engine="pulp", solver="cbc",
+                     time_limit=None, gap=None, threads=None, log_path=None, presolve=True, profile_path=None,
+                     window=5, window_step=None, bound=True):
     """
     Runs the optimization to maximize total benefit given projects and budget.
 
     Parameters:
     - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
     - budget (list): List of dictionaries with 'year' and 'amount'.
+    - formulation (str): "cumulative" (default) models cumulative spend per project and year, so the
+      model grows as O(N*T); "classic" sums annual expenditures for every (project, year) pair, O(N*T^2).
+      "tight" is the cumulative formulation strengthened with valid inequalities (see cuts.py):
+      cumulative budget knapsack rows and cardinality covers over the completion variables,
+      earliest-completion bounds and orderings between projects that dominate one another,
+      which removes the symmetry of identical projects. It has a tighter LP relaxation, so the
+      branch-and-bound tree is smaller. All formulations yield the same optimal objective.
+    - engine (str): "pulp" (default) builds the model from PuLP expressions; "matrix" assembles the
+      cumulative formulation directly as sparse arrays (see matrix_model.py). With solver="highs" the
+      matrix engine solves in-process and avoids the file round trip of the command-line solvers,
+      which dominates the solve time of small and medium portfolios. "heuristic" schedules greedily
+      and improves by local search instead of solving the MIP (see heuristic.py); time_limit bounds
+      the local search and the result carries the Lagrangian dual 'bound' and the 'gap' to it.
+      "decomposition" relaxes the annual budget constraints with Lagrange multipliers and repairs
+      the per-project solutions into a feasible portfolio (see decomposition.py), for portfolios too
+      large for the MIP; time_limit and gap bound its iterations and the result carries the dual
+      'bound' and the 'gap' to it. "rolling" solves a window of years in detail with the later
+      years aggregated, fixes the first years and slides on (see rolling_horizon.py), for long
+      horizons; it supports the "cumulative" and "tight" formulations with the "cbc" and
+      "highs" solvers, time_limit bounds all its solves together and the result carries the
+      full model's dual 'bound' and the 'gap' to it.
+    - solver (str): Solver backend, one of SOLVERS. "highs" runs in-process through highspy when it
+      is installed and falls back to the HiGHS command line otherwise.
+    - time_limit (float, optional): Maximum solve time in seconds.
+    - gap (float, optional): Relative MIP gap at which the solver may stop, e.g. 0.01 for 1%.
+    - threads (int, optional): Number of threads the solver may use; the solver's default when omitted.
+    - log_path (str, optional): File the solver log is written to.
+    - presolve (bool): Remove projects that cannot be part of an optimal solution and fix
+      completion before each project's earliest feasible year before building the model (see
+      presolve.py). The optimal objective is unchanged.
+    - profile_path (str, optional): File a cProfile dump of the run is written to (see profiling.py).
+    - window (int): Years the rolling engine models in detail.
+    - window_step (int, optional): Years the rolling engine fixes per solve, from 1 to window;
+      window by default.
+    - bound (bool): Whether the heuristic and rolling engines compute their 'bound'; without it
+      'bound' and 'gap' are None.
 
     Returns:
-    - dict: Contains 'status', 'objective', and 'projects' with detailed results.
+    - dict: Contains 'status', 'objective', and 'projects' with detailed results. When the time limit
+      stops the solver with a solution in hand, 'status' is "Feasible" and the best solution found
+      is returned. With presolve, 'presolve' reports the removed projects and fixed variables;
+      removed projects are listed as not funded. 'performance' holds the run's timings per phase,
+      model size, solver statistics and peak memory as reported by profiling.profile. Node and
+      iteration counts of the command-line solvers are only available with log_path.
     """
+    with profiling.profile(profile_path) as profiler:
+        results = _run_optimization(projects, budget, formulation, engine, solver, time_limit, gap, threads,
+                                    log_path, presolve, {"window": window, "step": window_step, "bound": bound})
+    results["performance"] = profiler.report
+    return results
+
+
+def _run_optimization(projects, budget, formulation, engine, solver, time_limit, gap, threads, log_path, presolve,
+                      horizon):
+    """
+    Validates the input of run_optimization and dispatches it to the engine; horizon holds the
+    rolling window and whether to compute the bound.
+    """
+    with profiling.phase("validation"):
+        _validate(projects, formulation, engine, solver, horizon)
+
+    if engine == "heuristic":
+        from heuristic import solve_heuristic
+        return solve_heuristic(projects, budget, bound=horizon["bound"],
+                               **({"time_limit": time_limit} if time_limit is not None else {}))
+
+    options = {"time_limit": time_limit, "gap": gap, "threads": threads, "log_path": log_path}
+    if not presolve:
+        return _solve(projects, budget, formulation, engine, solver, options, horizon=horizon)
+
+    from presolve import reduce_portfolio, restore_results
+    with profiling.phase("presolve"):
+        reduction = reduce_portfolio(projects, budget)
+    if reduction["projects"]:
+        results = _solve(reduction["projects"], budget, formulation, engine, solver, options, reduction["earliest"],
+                         horizon)
+    else:
+        # No project can yield benefit, so funding none is optimal
+        results = {"status": "Optimal", "objective": 0.0, "projects": {}}
+    with profiling.phase("presolve"):
+        return restore_results(results, projects, reduction)
+
+
+def _validate(projects, formulation, engine, solver, horizon=None):
+    """Raises ValueError for options run_optimization does not support."""
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation '{formulation}'. Choose one of: {', '.join(FORMULATIONS)}.")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}.")
 
     # Check for unique project IDs
     if len(projects) != len(set(projects.keys())):
         raise ValueError("Project IDs are not unique. Please ensure each project ID is distinct.")
 
-    # Sort budget by year
+    if engine in ("matrix", "rolling"):
+        if formulation == "classic":
+            raise ValueError(f"The {engine} engine only supports the 'cumulative' and 'tight' formulations.")
+        if solver not in ("cbc", "highs"):
+            raise ValueError(f"The {engine} engine only supports the 'cbc' and 'highs' solvers.")
+    if engine == "rolling" and horizon is not None:
+        step = horizon["window"] if horizon["step"] is None else horizon["step"]
+        if horizon["window"] < 1 or not 1 <= step <= horizon["window"]:
+            raise ValueError("The rolling engine needs window >= 1 and 1 <= window_step <= window.")
+
+
+def _solve(projects, budget, formulation, engine, solver, options, earliest=None, horizon=None):
+    """Builds and solves the model of run_optimization; earliest maps projects to their earliest completion year index."""
+    if engine == "decomposition":
+        from decomposition import solve_decomposition
+        return solve_decomposition(projects, budget, time_limit=options["time_limit"], gap=options["gap"])
+
+    if engine == "rolling":
+        from rolling_horizon import solve_rolling_horizon
+        return solve_rolling_horizon(projects, budget, solver=solver, tight=formulation == "tight",
+                                     **(horizon or {}), **options)
+
+    if engine == "matrix":
+        from matrix_model import solve_matrix_model
+        return solve_matrix_model(projects, budget, solver=solver, earliest=earliest,
+                                  tight=formulation == "tight", **options)
+
+    model, x, z, y = build_model(projects, budget, formulation, earliest=earliest)
+
+    # Solve the model
+    with profiling.phase("solve"):
+        model.solve(make_solver(solver, **options))
+    record_solver_statistics(model, options["log_path"])
+
+    years, _ = sort_budget(budget)
+    with profiling.phase("extract"):
+        return compile_results(model, projects, years, x, z, y)
+
+
+def record_solver_statistics(model, log_path=None):
+    """Records model size and, where available, node and iteration counts of a solved model with the active profiler."""
+    profiling.record_pulp_model(model)
+    if getattr(model, "solverModel", None) is not None:
+        # In-process HiGHS keeps its instance on the model
+        profiling.record_highs(model.solverModel)
+    else:
+        profiling.record_cbc_log(log_path)
+
+
+def make_solver(solver="cbc", time_limit=None, gap=None, threads=None, log_path=None, warm_start=False):
+    """
+    Creates the PuLP solver for a backend with the given limits.
+
+    Parameters:
+    - solver (str): One of SOLVERS.
+    - warm_start (bool): Start from the variables' initial values, where the backend supports it.
+      The in-process HiGHS backend does not and ignores it.
+
+    Returns:
+    - pulp.LpSolver: Solver ready to pass to LpProblem.solve.
+    """
+    if solver == "cbc":
+        # msg=0 suppresses solver details
+        command = pulp.PULP_CBC_CMD(msg=0, timeLimit=time_limit, gapRel=gap, threads=threads,
+                                    logPath=log_path, warmStart=warm_start)
+    elif solver == "highs":
+        command = pulp.HiGHS(msg=bool(log_path), timeLimit=time_limit, gapRel=gap, threads=threads,
+                             **({"log_file": log_path, "log_to_console": False} if log_path else {}))
+        if not command.available():
+            command = pulp.HiGHS_CMD(msg=0, timeLimit=time_limit, gapRel=gap, threads=threads,
+                                     logPath=log_path, warmStart=warm_start)
+    elif solver == "glpk":
+        options = ["--mipgap", str(gap)] if gap is not None else []
+        if log_path:
+            options += ["--log", log_path]
+        command = pulp.GLPK_CMD(msg=0, timeLimit=time_limit, options=options)
+    else:
+        raise ValueError(f"Unknown solver '{solver}'. Choose one of: {', '.join(SOLVERS)}.")
+
+    if not command.available():
+        raise ValueError(f"Solver '{solver}' is not installed.")
+    return command
+
+
+def available_solvers():
+    """Returns the backends from SOLVERS that are installed."""
+    available = []
+    for solver in SOLVERS:
+        try:
+            make_solver(solver)
+        except ValueError:
+            continue
+        available.append(solver)
+    return available
+
+
+def solution_status(model):
+    """
+    Returns the status of a solved model in LpStatus wording, or "Feasible" when the solver
+    stopped at a limit with an integer solution that is not proven optimal.
+    """
+    if model.sol_status == pulp.LpSolutionIntegerFeasible:
+        return "Feasible"
+    return pulp.LpStatus[model.status]
+
+
+def compile_results(model, projects, years, x, z, y):
+    """
+    Reads the solution of a solved model into the result dict returned by run_optimization.
+
+    Every variable value is read once into an array; the result is then assembled by
+    compile_array_results.
+    """
+    status = solution_status(model)
+
+    if status not in SOLVED_STATUSES:
+        return {
+            "status": status,
+            "objective": None,
+            "projects": None
+        }
+
+    project_ids = list(projects)
+    T = range(1, len(years) + 1)
+    shape = (len(project_ids), len(years))
+    x_values = np.array([x[(i, t)].value() or 0 for i in project_ids for t in T], dtype=float).reshape(shape)
+    z_values = np.array([z[(i, t)].varValue or 0 for i in project_ids for t in T], dtype=float).reshape(shape)
+    y_values = np.array([y[i].varValue or 0 for i in project_ids], dtype=float)
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+
+    return compile_array_results(project_ids, costs, benefits, years, x_values, z_values, y_values,
+                                 status, pulp.value(model.objective))
+
+
+def compile_array_results(project_ids, costs, benefits, years, x, z, y, status, objective):
+    """
+    Assembles run_optimization's result dict from solution arrays.
+
+    Parameters:
+    - project_ids (list): Project IDs in row order.
+    - costs, benefits (numpy.ndarray): Project costs and benefits, shape (N,).
+    - years (list): Calendar years in ascending order.
+    - x (numpy.ndarray): Annual expenditures, shape (N, T).
+    - z (numpy.ndarray): Completion status, shape (N, T).
+    - y (numpy.ndarray): Selection, shape (N,).
+    - status (str): Solution status, one of SOLVED_STATUSES.
+    - objective (float): Objective value of the solution.
+    """
+    n = len(project_ids)
+    T = len(years)
+
+    # First year with completion status set, only for selected projects
+    done = z > 0.9999
+    funded = done.any(axis=1) & (y > 0.5)
+    done_t = (done.argmax(axis=1) if T else np.zeros(n, dtype=int)) + 1  # Year index 1..T
+
+    total_benefits = np.where(funded, benefits * (T - done_t), 0.0)
+    roi = np.divide(benefits * 100, costs, out=np.zeros(n), where=costs > 0)
+
+    # Annual expenditures, grouped by project through the row-major order of nonzero
+    spend_rows, spend_cols = np.nonzero(x > 1e-6)
+    expenditures = [[] for _ in range(n)]
+    for i, t, val_x in zip(spend_rows.tolist(), spend_cols.tolist(), x[spend_rows, spend_cols].tolist()):
+        expenditures[i].append({"year": years[t], "expenditure": val_x})
+
+    results = {
+        "status": status,
+        "objective": objective,
+        "projects": {}
+    }
+    rows = zip(project_ids, funded.tolist(), done_t.tolist(), total_benefits.tolist(), roi.tolist(), expenditures)
+    for i, is_funded, t, total_benefit, project_roi, project_expenditures in rows:
+        results["projects"][i] = {
+            "completion_year": years[t - 1] if is_funded else "NOT FUNDED",
+            "expenditures": project_expenditures,
+            "total_benefit": total_benefit,
+            "ROI": project_roi,
+        }
+
+    return results
+
+
+def sort_budget(budget):
+    """
+    Sorts budget entries by year.
+
+    Returns:
+    - tuple: (years, annual_budgets) as lists in ascending year order.
+    """
     sorted_budget = sorted(budget, key=lambda x: x['year'])
     years = [entry["year"] for entry in sorted_budget]
     annual_budgets = [entry["amount"] for entry in sorted_budget]
+    return years, annual_budgets
+
+
+def build_model(projects, budget, formulation="cumulative", handles=None, earliest=None):
+    """
+    Builds the PuLP model for the given projects and budget without solving it.
+
+    Parameters:
+    - handles (dict, optional): For the cumulative formulation, filled with the budget and
+      cost-dependent constraints so that their coefficients can be edited in place later.
+    - earliest (dict, optional): Earliest completion year index per project; completion
+      variables of earlier years are fixed to zero. The tight formulation derives them from
+      the budget when they are not given.
+
+    Returns:
+    - tuple: (model, x, z, y) where x holds annual expenditure expressions keyed by
+      (project, year index), z completion and y selection variables.
+    """
+    years, annual_budgets = sort_budget(budget)
     num_years = len(years)
     T = range(1, num_years + 1)  # Years 1 to num_years
 
     # Map year index to budget
     B = {t: annual_budgets[t - 1] for t in T}
 
-    # Map year index to calendar year
-    year_mapping = {t: years[t - 1] for t in T}
-
     # Define optimization model
     model = pulp.LpProblem("Project_Financing", pulp.LpMaximize)
 
     # Decision variables
-    x = { (i, t): pulp.LpVariable(f"x_{i}_{t}", lowBound=0, cat=pulp.LpContinuous)
-           for i in projects for t in T }
+    with profiling.phase("variables"):
+        z = { (i, t): pulp.LpVariable(f"z_{i}_{t}", cat=pulp.LpBinary)
+               for i in projects for t in T }
 
-    z = { (i, t): pulp.LpVariable(f"z_{i}_{t}", cat=pulp.LpBinary)
-           for i in projects for t in T }
+        y = { i: pulp.LpVariable(f"y_{i}", cat=pulp.LpBinary) for i in projects }
 
-    y = { i: pulp.LpVariable(f"y_{i}", cat=pulp.LpBinary) for i in projects }
+        if formulation == "tight" and not earliest and num_years:
+            from cuts import earliest_completion
+            costs = [projects[i]["cost"] for i in projects]
+            earliest = dict(zip(projects, earliest_completion(costs, annual_budgets).tolist()))
 
-    # Constraints
+        if earliest:
+            for (i, t), z_it in z.items():
+                if t < earliest.get(i, 1):
+                    z_it.upBound = 0
+
+    # Spend variables are created along with their constraints
+    with profiling.phase("constraints"):
+        if formulation == "classic":
+            x = _add_classic_constraints(model, projects, T, B, z, y)
+        else:
+            x = _add_cumulative_constraints(model, projects, T, B, z, y, handles)
+            if formulation == "tight":
+                _add_tight_constraints(model, projects, T, B, z)
+
+        # 4. Monotonicity of completion status
+        for i in projects:
+            for t in range(1, num_years):
+                model += z[(i, t)] <= z[(i, t + 1)], f"Monotonicity_{i}_{t}"
+
+        # Objective function: Maximize total benefit
+        model += pulp.lpSum(
+            proj["benefit"] * z[(i, t)]
+            for i, proj in projects.items()
+            for t in T
+            if t < num_years  # Benefit starts the year after completion
+        ), "Total_Benefit"
+
+    return model, x, z, y
+
+
+def _add_classic_constraints(model, projects, T, B, z, y):
+    """
+    Adds financing, budget and completion constraints using annual expenditure variables.
+
+    Returns:
+    - dict: Annual expenditure expressions keyed by (project, year index).
+    """
+    x = { (i, t): pulp.LpVariable(f"x_{i}_{t}", lowBound=0, cat=pulp.LpContinuous)
+           for i in projects for t in T }
 
     # 1. Complete financing for each selected project
     for i in projects:
@@ -61,71 +405,110 @@ def run_optimization(projects, budget):
             model += z[(i, t)] <= y[i], f"CompletionLink_y_{i}_{t}"
             model += z[(i, t)] <= (1.0 / cost_i) * pulp.lpSum(x[(i, tau)] for tau in range(1, t + 1)), f"Completion_{i}_{t}"
 
-    # 4. Monotonicity of completion status
+    return x
+
+
+def _add_cumulative_constraints(model, projects, T, B, z, y, handles=None):
+    """
+    Adds financing, budget and completion constraints using cumulative spend variables.
+
+    s[i, t] is the amount spent on project i up to and including year t, so the annual
+    expenditure is s[i, t] - s[i, t - 1] and every constraint touches O(1) variables per
+    project and year.
+
+    Returns:
+    - dict: Annual expenditure expressions keyed by (project, year index).
+    """
+    s = {}
     for i in projects:
-        for t in range(1, num_years):
-            model += z[(i, t)] <= z[(i, t + 1)], f"Monotonicity_{i}_{t}"
+        s.update(_add_cumulative_project(model, i, projects[i]["cost"], T, z, y, handles))
 
-    # Objective function: Maximize total benefit
-    model += pulp.lpSum(
-        proj["benefit"] * z[(i, t)]
-        for i, proj in projects.items()
-        for t in T
-        if t < num_years  # Benefit starts the year after completion
-    ), "Total_Benefit"
+    x = { (i, t): s[(i, t)] - s[(i, t - 1)] if t > 1 else 1 * s[(i, t)]
+           for i in projects for t in T }
 
-    # Solve the model
-    model.solve(pulp.PULP_CBC_CMD(msg=0))  # msg=0 suppresses solver details
+    # 2. Annual budget constraint
+    for t in T:
+        budget_row = pulp.lpSum(x[(i, t)] for i in projects) <= B[t]
+        model += budget_row, f"Budget_{t}"
+        if handles is not None:
+            handles[("Budget", t)] = budget_row
 
-    # Check status
-    status = pulp.LpStatus[model.status]
+    return x
 
-    if status != "Optimal":
-        return {
-            "status": status,
-            "objective": None,
-            "projects": None
-        }
 
-    # Compile results
-    results = {
-        "status": status,
-        "objective": pulp.value(model.objective),
-        "projects": {}
-    }
+def _add_tight_constraints(model, projects, T, B, z):
+    """
+    Adds the valid inequalities of the tight formulation over the completion variables.
 
-    for i in projects:
-        project_info = {}
+    Projects completed by year t are fully financed, so their costs fit into the cumulative
+    budget of years 1..t. Stated on z alone, as a knapsack row per year, solvers can derive
+    cover cuts from it that the financing through s hides; the cardinality cover bounds the
+    number of completed projects directly. Dominated projects complete no earlier than their
+    dominating project (see cuts.dominance_parents).
+    """
+    from cuts import cardinality_limits, dominance_parents
 
-        # Determine completion year
-        done_t = next((t for t in T if pulp.value(z[(i, t)]) > 0.9999), None)
+    project_ids = list(projects)
+    costs = [projects[i]["cost"] for i in project_ids]
+    benefits = [projects[i]["benefit"] for i in project_ids]
+    limits = cardinality_limits(costs, [B[t] for t in T])
 
-        if done_t and pulp.value(y[i]) > 0.5:
-            actual_year = year_mapping[done_t]
-            project_info["completion_year"] = actual_year
-        else:
-            project_info["completion_year"] = "NOT FUNDED"
+    cumulative_budget = 0
+    for t in T:
+        cumulative_budget += B[t]
+        model += pulp.lpSum(projects[i]["cost"] * z[(i, t)] for i in project_ids) <= cumulative_budget, f"Knapsack_{t}"
+        if limits[t - 1] < len(project_ids):
+            model += pulp.lpSum(z[(i, t)] for i in project_ids) <= int(limits[t - 1]), f"Cover_{t}"
 
-        # Annual expenditures
-        expenditures = []
-        for t in T:
-            val_x = pulp.value(x[(i, t)])
-            if val_x and val_x > 1e-6:
-                actual_year = year_mapping[t]
-                expenditures.append({"year": actual_year, "expenditure": val_x})
+    for j, parent in enumerate(dominance_parents(costs, benefits).tolist()):
+        if parent >= 0:
+            i, k = project_ids[parent], project_ids[j]
+            for t in T:
+                model += z[(k, t)] <= z[(i, t)], f"Dominance_{k}_{t}"
 
-        project_info["expenditures"] = expenditures
 
-        # Total benefit of the project
-        if done_t and pulp.value(y[i]) > 0.5:
-            total_benefit = projects[i]["benefit"] * (num_years - done_t)
-        else:
-            total_benefit = 0
-        project_info["total_benefit"] = total_benefit  # Numerical value
+def _add_cumulative_project(model, i, cost_i, T, z, y, handles=None):
+    """
+    Adds the cumulative spend variables and single-project constraints of project i.
+
+    If handles is given, the constraints whose coefficients depend on the project cost are
+    stored in it under ("Financing", i) and ("Completion", i, t).
+
+    Returns:
+    - dict: Cumulative spend variables of the project keyed by (project, year index).
+    """
+    last = T[-1] if len(T) else 0
+
+    s = { (i, t): pulp.LpVariable(f"s_{i}_{t}", lowBound=0, cat=pulp.LpContinuous) for t in T }
+
+    # Spending cannot be negative, so cumulative spend never decreases
+    for t in T:
+        if t > 1:
+            model += s[(i, t)] >= s[(i, t - 1)], f"Cumulative_{i}_{t}"
+
+    if last:
+        # 1. Complete financing for each selected project
+        financing = s[(i, last)] <= cost_i * y[i]
+        model += financing, f"Financing_{i}"
+
+        # 3. Linking completion status and financing
+        # z is monotone in t, so bounding the final year by y bounds every year
+        model += z[(i, last)] <= y[i], f"CompletionLink_y_{i}"
+        if handles is not None:
+            handles[("Financing", i)] = financing
+
+    for t in T:
+        # z[i,t] can only be 1 if the project is sufficiently financed by year t
+        completion = cost_i * z[(i, t)] <= s[(i, t)]
+        model += completion, f"Completion_{i}_{t}"
+        if handles is not None:
+            handles[("Completion", i, t)] = completion
+
+    return s
 
-        # ROI Calculation
-        project_info["ROI"] = (projects[i]["benefit"] / projects[i]["cost"]) * 100 if projects[i]["cost"] > 0 else 0
 
-        results["projects"][i] = project_info
+if __name__ == "__main__":
+    import sys
 
-    return results
\ No newline at end of file
+    from cli import main
+    sys.exit(main())
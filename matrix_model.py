@@ -0,0 +1,390 @@
+# matrix_model.py
+
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+import pulp
+from scipy import sparse
+
+import profiling
+from long_term_investment_programming import SOLVED_STATUSES, compile_array_results, sort_budget
+
+
+def build_matrix_model(projects, budget, earliest=None, tight=False):
+    """
+    Assembles the cumulative formulation of the financing model as sparse arrays.
+
+    Columns are laid out as s (cumulative spend, N*T), z (completion, N*T) and y (selection, N),
+    each block ordered project-major. Every row has the form A @ v <= b.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - earliest (dict, optional): Earliest completion year index per project; completion
+      columns of earlier years get an upper bound of zero.
+    - tight (bool): Add the valid inequalities of the tight formulation: cumulative budget
+      knapsack and cardinality cover rows per year and dominance orderings (see cuts.py).
+      Earliest completion bounds are derived from the budget when earliest is not given.
+
+    Returns:
+    - dict: Contains the objective 'c' (maximized), constraint matrix 'A' (CSR), right-hand side 'b',
+      variable bounds 'lb'/'ub', 'integrality' flags and the input arrays used to interpret a solution.
+    """
+    project_ids = list(projects)
+    years, annual_budgets = sort_budget(budget)
+    n = len(project_ids)
+    T = len(years)
+
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+
+    # Column indices of every variable block
+    s_col = np.arange(n * T).reshape(n, T)
+    z_col = s_col + n * T
+    y_col = np.arange(n) + 2 * n * T
+    num_cols = 2 * n * T + n
+
+    rows, cols, vals, rhs = [], [], [], []
+    num_rows = 0
+
+    def add_rows(count, row_cols_vals, b):
+        # row_cols_vals holds (row offset within the block, column, value) arrays
+        nonlocal num_rows
+        for r, c, v in row_cols_vals:
+            c = c.ravel()
+            rows.append(r + num_rows)
+            cols.append(c)
+            vals.append(np.broadcast_to(v, c.shape))
+        rhs.append(np.broadcast_to(b, (count,)).astype(float))
+        num_rows += count
+
+    if T:
+        idx_n = np.arange(n)
+        idx_nt = np.arange(n * T)
+        idx_prev = np.arange(n * (T - 1))
+
+        # 1. Complete financing for each selected project: s[i, T] - cost_i * y_i <= 0
+        add_rows(n, [(idx_n, s_col[:, -1], 1.0), (idx_n, y_col, -costs)], 0.0)
+
+        # 2. Annual budget constraint: sum_i s[i, t] - s[i, t - 1] <= B_t
+        year_rows = np.broadcast_to(np.arange(T), (n, T))
+        add_rows(T, [
+            (year_rows.ravel(), s_col, 1.0),
+            (year_rows[:, 1:].ravel(), s_col[:, :-1], -1.0),
+        ], np.array(annual_budgets, dtype=float))
+
+        # Spending cannot be negative: s[i, t - 1] - s[i, t] <= 0
+        add_rows(n * (T - 1), [(idx_prev, s_col[:, :-1], 1.0), (idx_prev, s_col[:, 1:], -1.0)], 0.0)
+
+        # 3. Linking completion status and financing: cost_i * z[i, t] - s[i, t] <= 0, z[i, T] - y_i <= 0
+        add_rows(n * T, [(idx_nt, z_col, np.repeat(costs, T)), (idx_nt, s_col, -1.0)], 0.0)
+        add_rows(n, [(idx_n, z_col[:, -1], 1.0), (idx_n, y_col, -1.0)], 0.0)
+
+        # 4. Monotonicity of completion status: z[i, t] - z[i, t + 1] <= 0
+        add_rows(n * (T - 1), [(idx_prev, z_col[:, :-1], 1.0), (idx_prev, z_col[:, 1:], -1.0)], 0.0)
+
+        if tight:
+            from cuts import cardinality_limits, dominance_parents
+
+            cumulative = np.cumsum(np.array(annual_budgets, dtype=float))
+            # Cumulative budget knapsack: sum_i cost_i * z[i, t] <= B_1 + ... + B_t
+            add_rows(T, [(year_rows.ravel(), z_col, np.repeat(costs, T))], cumulative)
+
+            # Cardinality covers: sum_i z[i, t] <= k_t where they are not redundant
+            limits = cardinality_limits(costs, annual_budgets)
+            binding = np.nonzero(limits < n)[0]
+            add_rows(len(binding), [(np.tile(np.arange(len(binding)), n), z_col[:, binding], 1.0)],
+                     limits[binding].astype(float))
+
+            # Dominance orderings: z[j, t] - z[parent_j, t] <= 0
+            parents = dominance_parents(costs, benefits)
+            linked = np.nonzero(parents >= 0)[0]
+            idx_linked = np.arange(len(linked) * T)
+            add_rows(len(idx_linked), [(idx_linked, z_col[linked], 1.0), (idx_linked, z_col[parents[linked]], -1.0)], 0.0)
+
+    A = sparse.coo_matrix(
+        (np.concatenate(vals) if vals else np.empty(0),
+         (np.concatenate(rows) if rows else np.empty(0, dtype=int),
+          np.concatenate(cols) if cols else np.empty(0, dtype=int))),
+        shape=(num_rows, num_cols),
+    ).tocsr()
+
+    # Objective: benefit_i for every completed year except the last (benefit starts the year after completion)
+    c = np.zeros(num_cols)
+    if T > 1:
+        c[z_col[:, :-1].ravel()] = np.repeat(benefits, T - 1)
+
+    integrality = np.zeros(num_cols, dtype=int)
+    integrality[n * T:] = 1
+    ub = np.full(num_cols, np.inf)
+    ub[n * T:] = 1.0
+    if tight and not earliest and T:
+        from cuts import earliest_completion
+        earliest = dict(zip(project_ids, earliest_completion(costs, annual_budgets).tolist()))
+    if earliest and T:
+        first = np.array([earliest.get(i, 1) for i in project_ids]) - 1
+        ub[z_col[np.arange(T) < first[:, None]]] = 0.0
+
+    return {
+        "c": c,
+        "A": A,
+        "b": np.concatenate(rhs) if rhs else np.empty(0),
+        "lb": np.zeros(num_cols),
+        "ub": ub,
+        "integrality": integrality,
+        "project_ids": project_ids,
+        "costs": costs,
+        "benefits": benefits,
+        "years": years,
+    }
+
+
+def write_mps(matrix_model, path):
+    """
+    Writes a matrix model to a fixed-format MPS file in bulk.
+
+    Columns and rows are named C<index> and R<index>, which keeps every name within the
+    eight characters fixed-format MPS allows for models of up to 10 million columns or rows.
+    The objective is negated because MPS minimizes by convention.
+    """
+    A = matrix_model["A"].tocsc()
+    c = matrix_model["c"]
+    integrality = matrix_model["integrality"]
+    num_rows, num_cols = A.shape
+
+    lines = ["NAME Project_Financing", "ROWS", " N OBJ"]
+    lines.extend(f" L  R{r}" for r in range(num_rows))
+    lines.append("COLUMNS")
+
+    # Nonzeros of each column, objective first, in column order. Columns without any
+    # nonzero get an explicit zero objective entry so that their bounds can refer to them.
+    nnz_per_col = np.diff(A.indptr)
+    col_of_nz = np.repeat(np.arange(num_cols), nnz_per_col)
+    obj_cols = np.nonzero((c != 0) | (nnz_per_col == 0))[0]
+    all_cols = np.concatenate([obj_cols, col_of_nz])
+    all_rows = np.concatenate([np.full(len(obj_cols), -1), A.indices])
+    all_vals = np.concatenate([-c[obj_cols], A.data])
+    order = np.argsort(all_cols, kind="stable")
+
+    in_integer_block = False
+    entries = zip(all_cols[order].tolist(), all_rows[order].tolist(), all_vals[order].tolist())
+    for col, row, val in entries:
+        is_int = bool(integrality[col])
+        if is_int != in_integer_block:
+            lines.append("    MARKER    'MARKER'                 'INTORG'" if is_int
+                         else "    MARKER    'MARKER'                 'INTEND'")
+            in_integer_block = is_int
+        lines.append("    %-8s  %-8s  % .12e" % (f"C{col}", "OBJ" if row < 0 else f"R{row}", val))
+    if in_integer_block:
+        lines.append("    MARKER    'MARKER'                 'INTEND'")
+
+    lines.append("RHS")
+    b = matrix_model["b"]
+    lines.extend("    RHS       %-8s  % .12e" % (f"R{r}", v)
+                 for r, v in zip(np.nonzero(b)[0].tolist(), b[b != 0].tolist()))
+
+    lines.append("BOUNDS")
+    ub = matrix_model["ub"]
+    lines.extend(
+        (" BV BND       %-8s" if ub[col] > 0 else " FX BND       %-8s  0") % f"C{col}"
+        for col in np.nonzero(integrality)[0].tolist()
+    )
+    # Finite upper bounds of continuous columns, e.g. of a relaxed model
+    bounded = np.nonzero((integrality == 0) & np.isfinite(ub))[0]
+    lines.extend(" UP BND       %-8s  % .12e" % (f"C{col}", ub[col]) for col in bounded.tolist())
+    lines.append("ENDATA")
+
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+        f.write("\n")
+
+
+def solve_matrix_model(projects, budget, solver="cbc", time_limit=None, gap=None, threads=None, log_path=None,
+                       earliest=None, tight=False):
+    """
+    Builds the matrix model, solves it and returns the same result structure as run_optimization.
+
+    Parameters:
+    - solver (str): "cbc" runs the bundled CBC binary on a bulk-written MPS file; "highs" passes
+      the arrays to HiGHS in-process through highspy, without files or a subprocess.
+    - time_limit (float, optional): Maximum solve time in seconds.
+    - gap (float, optional): Relative MIP gap at which the solver may stop.
+    - threads (int, optional): Number of threads the solver may use.
+    - log_path (str, optional): File the solver log is written to.
+    - earliest (dict, optional): Earliest completion year index per project, see build_matrix_model.
+    - tight (bool): Solve the tight formulation, see build_matrix_model.
+    """
+    with profiling.phase("build"):
+        matrix_model = build_matrix_model(projects, budget, earliest, tight)
+    record_model_size(matrix_model)
+    options = {"time_limit": time_limit, "gap": gap, "threads": threads, "log_path": log_path}
+    if solver == "cbc":
+        status, values = _solve_cbc(matrix_model, **options)
+    elif solver == "highs":
+        status, values = _solve_highs(matrix_model, **options)
+    else:
+        raise ValueError(f"Unknown solver '{solver}' for the matrix engine. Choose one of: cbc, highs.")
+
+    if status not in SOLVED_STATUSES:
+        return {
+            "status": status,
+            "objective": None,
+            "projects": None
+        }
+
+    with profiling.phase("extract"):
+        return compile_matrix_results(matrix_model, values, status)
+
+
+def record_model_size(matrix_model):
+    """Records the size of a matrix model with the active profiler."""
+    A = matrix_model["A"]
+    profiling.record("model", variables=A.shape[1], constraints=A.shape[0], nonzeros=int(A.nnz))
+
+
+def _solve_cbc(matrix_model, time_limit=None, gap=None, threads=None, log_path=None):
+    """
+    Solves a matrix model with the bundled CBC binary through an MPS file.
+
+    Returns:
+    - tuple: (status, values) as returned by _read_cbc_solution.
+    """
+    num_cols = len(matrix_model["c"])
+
+    options = []
+    if time_limit is not None:
+        options += ["-sec", str(time_limit)]
+    if gap is not None:
+        options += ["-ratio", str(gap)]
+    if threads:
+        options += ["-threads", str(threads)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mps_path = os.path.join(tmp_dir, "model.mps")
+        sol_path = os.path.join(tmp_dir, "model.sol")
+        with profiling.phase("write"):
+            write_mps(matrix_model, mps_path)
+        cbc_path = pulp.PULP_CBC_CMD(msg=0).path
+        if not log_path and profiling.active():
+            # Keep the log for the node and iteration counts
+            log_path = os.path.join(tmp_dir, "model.log")
+        with profiling.phase("solve"):
+            with open(log_path, "w") if log_path else open(os.devnull, "w") as log:
+                subprocess.run(
+                    [cbc_path, mps_path, *options, "-solve", "-printingOptions", "all", "-solution", sol_path],
+                    stdout=log, stderr=subprocess.STDOUT, check=True,
+                )
+        profiling.record_cbc_log(log_path)
+        if not os.path.exists(sol_path):
+            raise pulp.PulpSolverError(f"CBC did not write a solution for {mps_path}")
+        with profiling.phase("read"):
+            return _read_cbc_solution(sol_path, num_cols, matrix_model["integrality"])
+
+
+def _solve_highs(matrix_model, time_limit=None, gap=None, threads=None, log_path=None):
+    """
+    Solves a matrix model in-process with HiGHS.
+
+    The sparse matrix is handed over as CSC arrays and the primal values come back as an
+    array, so a solve involves no files, no subprocess and no per-variable Python objects.
+
+    Returns:
+    - tuple: (status, values) with status in PuLP's LpStatus wording, or "Feasible" when HiGHS
+      stopped at a limit with a solution.
+    """
+    try:
+        import highspy
+    except ImportError:
+        raise ValueError("Solver 'highs' is not installed.")
+
+    A = matrix_model["A"].tocsc()
+    num_rows, num_cols = A.shape
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", bool(log_path))
+    if log_path:
+        h.setOptionValue("log_to_console", False)
+        h.setOptionValue("log_file", log_path)
+    if time_limit is not None:
+        h.setOptionValue("time_limit", float(time_limit))
+    if gap is not None:
+        h.setOptionValue("mip_rel_gap", float(gap))
+    if threads:
+        h.setOptionValue("threads", int(threads))
+
+    with profiling.phase("solve"):
+        h.passModel(
+            num_cols, num_rows, A.nnz, int(highspy.MatrixFormat.kColwise), int(highspy.ObjSense.kMaximize), 0.0,
+            matrix_model["c"], matrix_model["lb"], matrix_model["ub"],
+            np.full(num_rows, -np.inf), matrix_model["b"],
+            A.indptr.astype(np.int32), A.indices.astype(np.int32), A.data,
+            matrix_model["integrality"].astype(np.int32),
+        )
+        h.run()
+    profiling.record_highs(h)
+
+    model_status = h.getModelStatus()
+    has_solution = h.getInfo().primal_solution_status == int(highspy.SolutionStatus.kSolutionStatusFeasible)
+    if model_status == highspy.HighsModelStatus.kOptimal:
+        status = "Optimal"
+    elif model_status == highspy.HighsModelStatus.kInfeasible:
+        status = "Infeasible"
+    elif model_status in (highspy.HighsModelStatus.kUnbounded, highspy.HighsModelStatus.kUnboundedOrInfeasible):
+        status = "Unbounded"
+    elif model_status == highspy.HighsModelStatus.kModelEmpty:
+        status = "Optimal"
+    else:
+        status = "Feasible" if has_solution else "Not Solved"
+
+    values = np.array(h.getSolution().col_value) if has_solution else np.zeros(num_cols)
+    return status, values
+
+
+def _read_cbc_solution(path, num_cols, integrality):
+    """
+    Reads a CBC solution file into a dense array of column values.
+
+    CBC writes the same header when it stops at a limit before finding an integer solution,
+    with the values of the LP relaxation; only integral values count as a solution.
+
+    Returns:
+    - tuple: (status, values) with status in PuLP's LpStatus wording, or "Feasible" when CBC
+      stopped at a limit with an integer solution.
+    """
+    cbc_status = {"Optimal": "Optimal", "Infeasible": "Infeasible", "Integer": "Infeasible",
+                  "Unbounded": "Unbounded", "Stopped": "Not Solved"}
+    values = np.zeros(num_cols)
+    with open(path) as f:
+        header = f.readline().split()
+        status = cbc_status.get(header[0], "Undefined")
+        for line in f:
+            parts = line.split()
+            if parts and parts[0] == "**":
+                parts = parts[1:]
+            if len(parts) >= 3 and parts[1].startswith("C"):
+                values[int(parts[1][1:])] = float(parts[2])
+    if status == "Not Solved" and "objective" in header:
+        integer_values = values[integrality.astype(bool)]
+        if np.all(np.abs(integer_values - np.round(integer_values)) <= 1e-6):
+            status = "Feasible"
+    return status, values
+
+
+def compile_matrix_results(matrix_model, values, status):
+    """
+    Converts a solution vector of the matrix model into run_optimization's result dict.
+    """
+    n = len(matrix_model["project_ids"])
+    T = len(matrix_model["years"])
+
+    s = values[:n * T].reshape(n, T)
+    z = values[n * T:2 * n * T].reshape(n, T)
+    y = values[2 * n * T:]
+    x = np.diff(s, axis=1, prepend=0.0)
+
+    return compile_array_results(
+        matrix_model["project_ids"], matrix_model["costs"], matrix_model["benefits"], matrix_model["years"],
+        x, z, y, status, float(matrix_model["c"] @ values),
+    )
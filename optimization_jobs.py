@@ -0,0 +1,386 @@
+# optimization_jobs.py
+
+import itertools
+import multiprocessing
+import os
+import re
+import signal
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+from long_term_investment_programming import SOLVED_STATUSES
+from optimizer_session import OptimizerSession
+
+QUEUED = "Queued"
+RUNNING = "Running"
+FINISHED = "Finished"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+# CBC: "Integer solution of -328 found ..." and "... -328 best solution, best possible -332.67 ..."
+_CBC_INCUMBENT = re.compile(r"Integer solution of (\S+)")
+_CBC_BOUND = re.compile(r"best solution, best possible (\S+)")
+# HiGHS: node table rows "Src Proc. InQueue Leaves Expl. BestBound BestSol Gap ..."
+_HIGHS_ROW = re.compile(r"^\s*[A-Za-z]?\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+(\S+)\s+(\S+)\s")
+
+
+class OptimizationJob:
+    """
+    A solve submitted to a JobManager.
+
+    status moves from QUEUED to RUNNING and ends as FINISHED, FAILED or CANCELLED. A finished
+    job holds the run_optimization-style result and, if it has a solution, the value of every
+    model variable for warm-starting the next solve.
+    """
+
+    def __init__(self, job_id, log_path):
+        self.id = job_id
+        self.log_path = log_path
+        self.status = QUEUED
+        self.result = None
+        self.solution = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._future = None
+        self._process = None
+        self._cancel_requested = False
+
+    @property
+    def done(self):
+        return self.status in (FINISHED, FAILED, CANCELLED)
+
+    def elapsed(self):
+        """Seconds the job has been running, or ran for; 0 while queued."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def log(self):
+        """Returns the solver log written so far, or an empty string."""
+        try:
+            with open(self.log_path, "r") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def progress(self):
+        """
+        Reads the incumbent objective and best bound from the solver log written so far.
+
+        HiGHS writes its log as it goes. CBC's output reaches the file in blocks of a few
+        kilobytes, so its progress can lag behind or stay empty on short solves.
+
+        Returns:
+        - dict: 'elapsed' seconds, 'incumbent', 'bound' and relative 'gap'; values are None
+          until the solver has reported them.
+        """
+        incumbent = bound = None
+        for line in self.log().splitlines():
+            match = _HIGHS_ROW.match(line)
+            if match:
+                bound, incumbent = _parse_objective(match.group(1)), _parse_objective(match.group(2))
+                continue
+            match = _CBC_INCUMBENT.search(line)
+            if match:
+                incumbent = _parse_objective(match.group(1))
+            match = _CBC_BOUND.search(line)
+            if match:
+                bound = _parse_objective(match.group(1))
+
+        gap = None
+        if incumbent is not None and bound is not None:
+            gap = max(bound - incumbent, 0.0) / max(abs(incumbent), 1e-9)
+        return {"elapsed": self.elapsed(), "incumbent": incumbent, "bound": bound, "gap": gap}
+
+
+def _parse_objective(text):
+    # The objective is a sum of benefits and never negative; solvers that minimize the
+    # negated objective report it with a minus sign
+    try:
+        value = abs(float(text))
+    except ValueError:
+        return None
+    return value if value != float("inf") else None
+
+
+class _Worker:
+    """A solver process serving jobs one at a time over a pipe, see _serve."""
+
+    def __init__(self, context):
+        self.lock = threading.Lock()
+        self.last_used = time.time()
+        self.process = None
+        self.conn = None
+        self._context = context
+
+    def ensure_started(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        self.stop()
+        self.conn, child_conn = self._context.Pipe()
+        self.process = self._context.Process(target=_serve, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        _stop_process(self.process)
+        if self.process is not None:
+            self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+        self.process = self.conn = None
+
+
+class JobManager:
+    """
+    Runs optimization jobs in the background on a bounded number of workers.
+
+    Jobs wait in a first-in, first-out queue shared by every caller, so several users of one
+    server can submit without blocking each other or starting more than max_workers solves
+    at a time. Jobs solve in child processes with the solver log written to a file, which
+    makes progress readable while they run and lets cancel() stop the solver.
+
+    Jobs submitted with a session_id run in one long-lived process per session that keeps
+    its OptimizerSession between jobs: a re-solve after an edit only applies the changes to
+    the built model (see OptimizerSession.sync) instead of paying for a process start,
+    imports and a full model build. The process is replaced after a cancel or crash, and
+    the least recently used idle session processes are stopped beyond max_sessions. Jobs
+    without a session_id get a process of their own.
+
+    Usage:
+        manager = JobManager(max_workers=2)
+        job = manager.submit(projects, budget, session_id="user-1", time_limit=60)
+        ...
+        if job.done:
+            results = job.result
+    """
+
+    def __init__(self, max_workers=2, log_dir=None, max_history=100, max_sessions=8):
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self.max_sessions = max_sessions
+        self.log_dir = log_dir or tempfile.mkdtemp(prefix="optimization_jobs_")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="optimization-job")
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs = OrderedDict()
+        self._workers = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, projects, budget, start=None, session_id=None, **solver_options):
+        """
+        Queues a solve of projects and budget.
+
+        Parameters:
+        - start (dict, optional): Variable values of an earlier job's solution to use as MIP start.
+        - session_id (str, optional): Solve in the long-lived process of this session.
+        - solver_options: Passed to OptimizerSession; log_path is set by the manager. With an
+          engine other than "pulp" the job runs run_optimization with these options instead,
+          and its solution is derived with heuristic.mip_start.
+
+        Returns:
+        - OptimizationJob: The queued job.
+        """
+        with self._lock:
+            job_id = str(next(self._ids))
+            job = OptimizationJob(job_id, os.path.join(self.log_dir, f"job_{job_id}.log"))
+            self._jobs[job_id] = job
+            self._prune()
+        options = {**solver_options, "log_path": job.log_path}
+        job._future = self._executor.submit(self._run, job, session_id, (projects, budget, start, options))
+        return job
+
+    def close_session(self, session_id):
+        """Stops the process of a session, unless one of its jobs is running."""
+        with self._lock:
+            worker = self._workers.get(session_id)
+            if worker is None or worker.lock.locked():
+                return
+            del self._workers[session_id]
+        worker.stop()
+
+    def get(self, job_id):
+        """Returns the job with the given ID, or None if it is unknown or was pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job.
+
+        Returns:
+        - bool: True if the job was still queued or running.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with self._lock:
+            if job.done:
+                return False
+            job._cancel_requested = True
+            if job.status == QUEUED and job._future.cancel():
+                self._finish(job, CANCELLED)
+                return True
+        _stop_process(job._process)
+        return True
+
+    def queue_position(self, job_id):
+        """Returns the number of queued jobs ahead of job_id plus one, or 0 if it is not queued."""
+        with self._lock:
+            queued = [i for i, job in self._jobs.items() if job.status == QUEUED]
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def stats(self):
+        """Returns the number of queued and running jobs."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {"queued": statuses.count(QUEUED), "running": statuses.count(RUNNING)}
+
+    def shutdown(self):
+        """Cancels every job and stops the workers."""
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), OrderedDict()
+        for worker in workers:
+            worker.stop()
+
+    def _worker(self, session_id):
+        """Returns the session's worker, or a new one for jobs without a session."""
+        if session_id is None:
+            return _Worker(self._context)
+        evicted = []
+        with self._lock:
+            worker = self._workers.pop(session_id, None) or _Worker(self._context)
+            self._workers[session_id] = worker
+            idle = [i for i, w in self._workers.items() if i != session_id and not w.lock.locked()]
+            for i in idle[:max(0, len(self._workers) - self.max_sessions)]:
+                evicted.append(self._workers.pop(i))
+        for w in evicted:
+            w.stop()
+        return worker
+
+    def _run(self, job, session_id, request):
+        with self._lock:
+            if job._cancel_requested:
+                self._finish(job, CANCELLED)
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        worker = self._worker(session_id)
+        with worker.lock:
+            message, exitcode = self._exchange(job, worker, request)
+            if message is None or session_id is None:
+                # Cancelled or crashed; the next job of the session starts a fresh process
+                worker.stop()
+            worker.last_used = time.time()
+
+        with self._lock:
+            if job._cancel_requested:
+                self._finish(job, CANCELLED)
+            elif message is None:
+                job.error = f"The solver process exited with code {exitcode}."
+                self._finish(job, FAILED)
+            elif message[0] == "error":
+                job.error = message[1]
+                self._finish(job, FAILED)
+            else:
+                job.result, job.solution = message[1], message[2]
+                self._finish(job, FINISHED)
+
+    def _exchange(self, job, worker, request):
+        """Sends a request to the worker and waits for its answer; returns (message, exit code)."""
+        try:
+            worker.ensure_started()
+            job._process = worker.process
+            worker.conn.send(request)
+            while worker.process.is_alive():
+                if job._cancel_requested:
+                    _stop_process(worker.process)
+                    return None, None
+                if worker.conn.poll(0.2):
+                    return worker.conn.recv(), None
+            if not job._cancel_requested and worker.conn.poll():
+                return worker.conn.recv(), None
+            worker.process.join()
+            return None, worker.process.exitcode
+        except (EOFError, OSError) as e:
+            worker.stop()
+            return ("error", str(e), None), None
+        finally:
+            job._process = None
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+
+    def _prune(self):
+        # Forget the oldest finished jobs beyond max_history
+        finished = [i for i, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            job = self._jobs.pop(job_id)
+            try:
+                os.remove(job.log_path)
+            except OSError:
+                pass
+
+
+def _serve(conn):
+    """
+    Worker process: answers (projects, budget, start, options) requests until the pipe closes.
+
+    The OptimizerSession of the last request is kept and brought up to date with sync() when
+    the next request has the same solver options; otherwise, and after an error, the model is
+    built anew.
+    """
+    if hasattr(os, "setpgrp"):
+        # Own process group, so that cancelling also stops the solver subprocess
+        os.setpgrp()
+    session = session_options = None
+    while True:
+        try:
+            projects, budget, start, options = conn.recv()
+        except EOFError:
+            return
+        try:
+            engine = options.get("engine", "pulp")
+            if engine != "pulp":
+                from heuristic import mip_start
+                from long_term_investment_programming import run_optimization
+                result = run_optimization(projects, budget, **options)
+                solution = mip_start(result, budget) if result["status"] in SOLVED_STATUSES else None
+            else:
+                options = {name: value for name, value in options.items() if name != "engine"}
+                reusable = {name: value for name, value in options.items() if name != "log_path"}
+                with profiling.profile() as profiler:
+                    if session is None or reusable != session_options:
+                        session, session_options = OptimizerSession(projects, budget, **options), reusable
+                    else:
+                        session.solver_options["log_path"] = options.get("log_path")
+                        session.sync(projects, budget)
+                    result = session.solve(start=start)
+                result["performance"] = profiler.report
+                solution = session.solution() if result["status"] in SOLVED_STATUSES else None
+            conn.send(("ok", result, solution))
+        except Exception as e:
+            session = session_options = None
+            conn.send(("error", str(e), None))
+
+
+def _stop_process(process):
+    if process is None or not process.is_alive():
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, OSError):
+        # No process groups on this platform, or the child has not created its group yet
+        process.terminate()
@@ -0,0 +1,196 @@
+# optimizer_session.py
+
+import pulp
+
+import profiling
+from long_term_investment_programming import (
+    SOLVED_STATUSES,
+    _add_cumulative_project,
+    build_model,
+    compile_results,
+    make_solver,
+    record_solver_statistics,
+    solution_status,
+    sort_budget,
+)
+
+
+class OptimizerSession:
+    """
+    Keeps a built optimization model between solves so that small edits do not rebuild it.
+
+    Project cost/benefit changes, added or deleted projects and changed budget amounts are
+    applied to the model's coefficients and right-hand sides in place. Every solve after the
+    first starts the solver from the previous solution (MIP start). Adding or removing budget
+    years changes the planning horizon, so those edits rebuild the model.
+
+    Solver options (solver, time_limit, gap, threads, log_path) are passed to make_solver for
+    every solve.
+
+    Usage:
+        session = OptimizerSession(projects, budget)
+        results = session.solve()
+        session.update_project("A", cost=120)
+        results = session.solve()
+    """
+
+    def __init__(self, projects, budget, **solver_options):
+        # Check for unique project IDs
+        if len(projects) != len(set(projects.keys())):
+            raise ValueError("Project IDs are not unique. Please ensure each project ID is distinct.")
+
+        self.projects = {i: dict(details) for i, details in projects.items()}
+        self.budget = [dict(entry) for entry in budget]
+        self.solver_options = solver_options
+        self.rebuilds = 0
+        self._build()
+
+    def _build(self):
+        """(Re)builds the model from the current projects and budget."""
+        self.years, _ = sort_budget(self.budget)
+        self.T = range(1, len(self.years) + 1)
+        self.handles = {}
+        self.model, self.x, self.z, self.y = build_model(self.projects, self.budget, "cumulative", self.handles)
+        # Projects whose variables stay in the model, fixed to zero, after deletion
+        self.inactive = {}
+        self.has_solution = False
+        self.rebuilds += 1
+
+    def update_project(self, project_id, cost=None, benefit=None):
+        """Changes the cost and/or benefit of an existing project in place."""
+        if project_id not in self.projects:
+            raise KeyError(f"Project {project_id} does not exist.")
+        if cost is not None:
+            self.projects[project_id]["cost"] = cost
+            self._set_cost(project_id, cost)
+        if benefit is not None:
+            self.projects[project_id]["benefit"] = benefit
+            self._set_benefit(project_id, benefit)
+
+    def add_project(self, project_id, cost, benefit):
+        """Adds a new project, reusing the variables of a previously deleted project with the same ID."""
+        if project_id in self.projects:
+            raise ValueError("Project ID already exists.")
+        self.projects[project_id] = {"cost": cost, "benefit": benefit}
+
+        if project_id in self.inactive:
+            # Release the variables fixed at deletion
+            for var in self.inactive.pop(project_id):
+                var.upBound = None if var.cat == pulp.LpContinuous else 1
+            self._set_cost(project_id, cost)
+            self._set_benefit(project_id, benefit)
+            return
+
+        T = self.T
+        for t in T:
+            self.z[(project_id, t)] = pulp.LpVariable(f"z_{project_id}_{t}", cat=pulp.LpBinary)
+        self.y[project_id] = pulp.LpVariable(f"y_{project_id}", cat=pulp.LpBinary)
+
+        s = _add_cumulative_project(self.model, project_id, cost, T, self.z, self.y, self.handles)
+
+        for t in T:
+            self.x[(project_id, t)] = s[(project_id, t)] - s[(project_id, t - 1)] if t > 1 else 1 * s[(project_id, t)]
+            budget_row = self.handles[("Budget", t)]
+            budget_row.expr[s[(project_id, t)]] = 1
+            if t > 1:
+                budget_row.expr[s[(project_id, t - 1)]] = -1
+            if t < len(T):
+                self.model.objective[self.z[(project_id, t)]] = benefit
+            if t > 1:
+                self.model += self.z[(project_id, t - 1)] <= self.z[(project_id, t)], f"Monotonicity_{project_id}_{t - 1}"
+
+    def remove_project(self, project_id):
+        """Deletes a project by fixing its variables to zero."""
+        if project_id not in self.projects:
+            raise KeyError(f"Project {project_id} does not exist.")
+        del self.projects[project_id]
+
+        variables = [self.y[project_id]]
+        for t in self.T:
+            variables.append(self.z[(project_id, t)])
+            variables.extend(self.x[(project_id, t)].keys())
+        variables = list({var.name: var for var in variables}.values())
+        for var in variables:
+            var.upBound = 0
+            var.varValue = 0
+        self.inactive[project_id] = variables
+
+    def update_budget(self, budget):
+        """
+        Applies a new budget list. Changed amounts only update right-hand sides; a different
+        number of years rebuilds the model.
+        """
+        self.budget = [dict(entry) for entry in budget]
+        years, annual_budgets = sort_budget(self.budget)
+        if len(years) != len(self.years):
+            self._build()
+            return
+
+        self.years = years
+        for t in self.T:
+            self.handles[("Budget", t)].changeRHS(annual_budgets[t - 1])
+
+    def sync(self, projects, budget):
+        """
+        Brings the session in line with the given projects and budget by applying only the differences.
+        """
+        for project_id in [i for i in self.projects if i not in projects]:
+            self.remove_project(project_id)
+        for project_id, details in projects.items():
+            current = self.projects.get(project_id)
+            if current is None:
+                self.add_project(project_id, details["cost"], details["benefit"])
+            elif current != details:
+                self.update_project(project_id, cost=details["cost"], benefit=details["benefit"])
+        if sort_budget(budget) != sort_budget(self.budget):
+            self.update_budget(budget)
+
+    def solve(self, start=None):
+        """
+        Solves the current model, warm-started from the previous solution if there is one.
+
+        Parameters:
+        - start (dict, optional): Variable values from solution() to use as the MIP start
+          instead of the previous solution.
+
+        Returns:
+        - dict: Same structure as run_optimization's result.
+        """
+        if start is not None:
+            for var in self.model.variables():
+                var.setInitialValue(_within_bounds(var, start.get(var.name, 0)))
+        elif self.has_solution:
+            for var in self.model.variables():
+                var.setInitialValue(_within_bounds(var, var.varValue or 0))
+
+        warm_start = start is not None or self.has_solution
+        with profiling.phase("solve"):
+            self.model.solve(make_solver(**self.solver_options, warm_start=warm_start))
+        record_solver_statistics(self.model, self.solver_options.get("log_path"))
+        self.has_solution = solution_status(self.model) in SOLVED_STATUSES
+
+        with profiling.phase("extract"):
+            return compile_results(self.model, self.projects, self.years, self.x, self.z, self.y)
+
+    def solution(self):
+        """Returns the value of every model variable after the last solve, keyed by variable name and clamped into its bounds."""
+        return {var.name: _within_bounds(var, var.varValue or 0) for var in self.model.variables()}
+
+    def _set_cost(self, project_id, cost):
+        self.handles[("Financing", project_id)].expr[self.y[project_id]] = -cost
+        for t in self.T:
+            self.handles[("Completion", project_id, t)].expr[self.z[(project_id, t)]] = cost
+
+    def _set_benefit(self, project_id, benefit):
+        for t in self.T:
+            if t < len(self.T):
+                self.model.objective[self.z[(project_id, t)]] = benefit
+
+
+def _within_bounds(var, value):
+    """Clamps value into the bounds of var; solvers return noise such as -1e-15 for variables at a bound."""
+    if var.lowBound is not None:
+        value = max(value, var.lowBound)
+    if var.upBound is not None:
+        value = min(value, var.upBound)
+    return value
@@ -0,0 +1,134 @@
+# presolve.py
+
+import numpy as np
+
+from long_term_investment_programming import sort_budget
+
+# Reasons a project is removed before the model is built
+NO_BENEFIT = "no benefit"
+OVER_BUDGET = "cost exceeds the budget available before the last year"
+DOMINATED = "dominated by a project that costs no more, yields at least the same benefit and cannot be funded alongside it"
+
+
+def reduce_portfolio(projects, budget):
+    """
+    Decides the projects that cannot be part of an optimal solution before the model is built.
+
+    A project is removed when
+    - its benefit is zero or negative,
+    - its cost exceeds the cumulative budget of all years but the last, so it can never be
+      completed in time to yield benefit (benefit starts the year after completion), or
+    - a project that costs no more and yields at least the same benefit exists and the two
+      cannot both be completed before the last year. Swapping the removed project for that
+      one completes no later and never lowers the objective, so the optimum is unchanged.
+
+    For the remaining projects the earliest year in which the cumulative budget covers the
+    cost is computed; completion before that year is impossible and can be fixed to zero.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+
+    Returns:
+    - dict: 'projects' the remaining projects in their original order, 'earliest' the earliest
+      completion year index (1..T) of each remaining project and 'removed' the reason every
+      removed project was dropped for.
+    """
+    project_ids = list(projects)
+    _, annual_budgets = sort_budget(budget)
+    num_years = len(annual_budgets)
+
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+    cumulative = np.cumsum(np.array(annual_budgets, dtype=float))
+    capacity = cumulative[-2] if num_years > 1 else 0.0
+    tolerance = 1e-9 * max(1.0, capacity)
+
+    reasons = np.full(len(project_ids), "", dtype=object)
+    reasons[benefits <= 0] = NO_BENEFIT
+    reasons[(reasons == "") & (costs > capacity + tolerance)] = OVER_BUDGET
+
+    # Order the candidates by cost ascending, then benefit descending, so that every project's
+    # potential dominators precede it. Those that cannot be funded together with project k are
+    # the ones costing more than capacity - cost_k, a contiguous range ending just before k.
+    candidates = np.nonzero(reasons == "")[0]
+    order = candidates[np.lexsort((candidates, -benefits[candidates], costs[candidates]))]
+    sorted_costs = costs[order]
+    first = np.searchsorted(sorted_costs, capacity - sorted_costs + tolerance, side="right")
+    best_alternative = _range_max(benefits[order], first, np.arange(len(order)))
+    reasons[order[best_alternative >= benefits[order]]] = DOMINATED
+
+    kept = reasons == ""
+    earliest = np.searchsorted(cumulative, costs - tolerance, side="left") + 1
+    return {
+        "projects": {i: projects[i] for i, keep in zip(project_ids, kept.tolist()) if keep},
+        "earliest": {i: e for i, e, keep in zip(project_ids, earliest.tolist(), kept.tolist()) if keep},
+        "removed": {i: reason for i, reason in zip(project_ids, reasons.tolist()) if reason},
+    }
+
+
+def presolve_report(projects, reduction):
+    """
+    Summarizes a reduction for the result dict.
+
+    Returns:
+    - dict: 'projects_before' and 'projects_after' counts, the number of completion variables
+      fixed to zero by earliest-completion bounds and the 'removed' projects with their reasons.
+    """
+    return {
+        "projects_before": len(projects),
+        "projects_after": len(reduction["projects"]),
+        "fixed_completion_years": sum(e - 1 for e in reduction["earliest"].values()),
+        "removed": dict(reduction["removed"]),
+    }
+
+
+def restore_results(results, projects, reduction):
+    """
+    Adds the removed projects back to a result of the reduced portfolio as not funded, in the
+    original project order, and attaches the presolve report.
+    """
+    if results["projects"] is not None:
+        solved = results["projects"]
+        results["projects"] = {
+            i: solved[i] if i in solved else _not_funded(projects[i])
+            for i in projects
+        }
+    results["presolve"] = presolve_report(projects, reduction)
+    return results
+
+
+def _not_funded(project):
+    cost = project["cost"]
+    return {
+        "completion_year": "NOT FUNDED",
+        "expenditures": [],
+        "total_benefit": 0.0,
+        "ROI": project["benefit"] * 100 / cost if cost > 0 else 0.0,
+    }
+
+
+def _range_max(values, start, stop):
+    """
+    Returns the maximum of values[start[k]:stop[k]] for every k, -inf for empty ranges.
+
+    Uses a sparse table of maxima over power-of-two windows, so every query costs O(1)
+    after O(n log n) preparation.
+    """
+    result = np.full(len(start), -np.inf)
+    length = stop - start
+    nonempty = length > 0
+    if not nonempty.any():
+        return result
+
+    table = [values]
+    while 2 ** len(table) <= length.max():
+        half = 2 ** (len(table) - 1)
+        table.append(np.maximum(table[-1][:-half], table[-1][half:]))
+
+    level = np.zeros(len(start), dtype=int)
+    level[nonempty] = np.log2(length[nonempty]).astype(int)
+    for j in np.unique(level[nonempty]).tolist():
+        rows = nonempty & (level == j)
+        result[rows] = np.maximum(table[j][start[rows]], table[j][stop[rows] - 2 ** j])
+    return result
@@ -0,0 +1,153 @@
+# profiling.py
+
+import contextvars
+import cProfile
+import json
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# CBC summary lines written with "-printingOptions all" or by PuLP's CBC command
+_CBC_NODES = re.compile(r"Enumerated nodes:\s+(\d+)")
+_CBC_ITERATIONS = re.compile(r"Total iterations:\s+(\d+)")
+
+_active = contextvars.ContextVar("profiler", default=None)
+
+
+class Profiler:
+    """
+    Collects the performance figures of one optimization run.
+
+    Code running inside profile() reports to the active profiler through the module-level
+    phase() and record() functions, so the solve functions need no extra parameters and cost
+    nothing when no profiler is active.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.model = {}
+        self.solver = {}
+        self.report = None
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the wall time of the block to phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def profile(profile_path=None):
+    """
+    Activates a Profiler for the block.
+
+    On exit the profiler's report is set: 'total' seconds, seconds per 'phases' entry, 'model'
+    size (variables, constraints, nonzeros), 'solver' statistics (nodes, iterations) where the
+    solver reports them and the process's peak resident memory in MB, None where the platform
+    does not report it. The report is logged as one JSON line at INFO level.
+
+    Parameters:
+    - profile_path (str, optional): File a cProfile dump of the block is written to, for
+      offline analysis with pstats or snakeviz.
+    """
+    profiler = Profiler()
+    token = _active.set(profiler)
+    profile_run = cProfile.Profile() if profile_path else None
+    peak_before = _peak_memory_mb()
+    start = time.perf_counter()
+    if profile_run:
+        profile_run.enable()
+    try:
+        yield profiler
+    finally:
+        if profile_run:
+            profile_run.disable()
+            profile_run.dump_stats(profile_path)
+        _active.reset(token)
+        peak = _peak_memory_mb()
+        profiler.report = {
+            "total": time.perf_counter() - start,
+            "phases": dict(profiler.phases),
+            "model": dict(profiler.model),
+            "solver": dict(profiler.solver),
+            "peak_memory_mb": peak,
+            # Growth of the process's high-water mark during the block
+            "peak_memory_increase_mb": peak - peak_before if peak is not None else None,
+        }
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({"event": "optimization_performance", **profiler.report}))
+
+
+def phase(name):
+    """Times the block as phase name of the active profiler, if any."""
+    profiler = _active.get()
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def record(section, **values):
+    """Stores values in section ("model" or "solver") of the active profiler, if any."""
+    profiler = _active.get()
+    if profiler is not None:
+        getattr(profiler, section).update(values)
+
+
+@contextmanager
+def suspended():
+    """Hides the active profiler from the block, e.g. for a nested computation timed as one phase."""
+    token = _active.set(None)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def active():
+    """Whether a profiler is collecting, so that costly figures can be skipped otherwise."""
+    return _active.get() is not None
+
+
+def record_pulp_model(model):
+    """Records the size of a PuLP model."""
+    if active():
+        record("model", variables=model.numVariables(), constraints=model.numConstraints(),
+               nonzeros=sum(len(constraint) for constraint in model.constraints.values()))
+
+
+def record_highs(highs):
+    """Records the node and simplex iteration counts of a solved highspy.Highs instance."""
+    info = highs.getInfo()
+    record("solver", nodes=int(info.mip_node_count), iterations=int(info.simplex_iteration_count))
+
+
+def record_cbc_log(path):
+    """Records the node and iteration counts from a CBC log file, if it has them."""
+    if not active() or not path:
+        return
+    try:
+        with open(path) as f:
+            log = f.read()
+    except OSError:
+        return
+    nodes = _CBC_NODES.findall(log)
+    iterations = _CBC_ITERATIONS.findall(log)
+    if nodes:
+        record("solver", nodes=int(nodes[-1]))
+    if iterations:
+        record("solver", iterations=int(iterations[-1]))
+
+
+def _peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
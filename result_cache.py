@@ -0,0 +1,150 @@
+# result_cache.py
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from long_term_investment_programming import run_optimization
+
+
+def cache_key(projects, budget, **options):
+    """
+    Computes a canonical hash of an optimization input.
+
+    Project order, budget order and int/float spelling of amounts do not change the key.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - options: Keyword arguments passed to run_optimization.
+
+    Returns:
+    - str: Hex SHA-256 digest.
+    """
+    canonical = {
+        "projects": {
+            str(i): [float(details["cost"]), float(details["benefit"])]
+            for i, details in projects.items()
+        },
+        "budget": sorted([int(entry["year"]), float(entry["amount"])] for entry in budget),
+        "options": options,
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of run_optimization results keyed by cache_key.
+
+    The memory tier keeps the most recently used max_entries results; the optional disk tier
+    stores every result as <key>.json in directory and survives restarts. Stored and returned
+    results are copies, so callers may add fields to them freely.
+    """
+
+    def __init__(self, max_entries=128, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """Returns a copy of the cached result for key, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        """Stores a copy of result under key in both tiers."""
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._remember(key, result)
+        self._write_disk(key, result)
+
+    def clear(self):
+        """Empties the memory tier and resets the counters. The disk tier is left untouched."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """Returns the hit/miss counters and the number of entries held in memory."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+            }
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, result):
+        if not self.directory:
+            return
+        # Write to a temporary file first so readers never see a partial result
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, self._path(key))
+
+
+# Cache used by cached_run_optimization when none is passed
+default_cache = ResultCache()
+
+
+def cached_run_optimization(projects, budget, cache=None, **options):
+    """
+    Returns run_optimization's result from cache, solving and storing it on a miss.
+
+    Only results with status "Optimal" are stored.
+
+    Parameters:
+    - cache (ResultCache, optional): Cache to use; defaults to the module-level default_cache.
+    - options: Keyword arguments passed to run_optimization.
+    """
+    cache = default_cache if cache is None else cache
+    key = cache_key(projects, budget, **options)
+    result = cache.get(key)
+    if result is None:
+        result = run_optimization(projects, budget, **options)
+        if result["status"] == "Optimal":
+            cache.put(key, result)
+    return result
@@ -0,0 +1,85 @@
+# result_tables.py
+
+import pandas as pd
+
+PROJECT_COLUMNS = ["Project", "Completion Year", "Total Benefit", "ROI (%)", "Total Expenditure", "Annual Expenditures"]
+EXPENDITURE_COLUMNS = ["Project", "Year", "Expenditure", "Cumulative Expenditure", "Completed"]
+
+
+def expenditures_frame(results):
+    """
+    Flattens the expenditures of a run_optimization result into a long-format table.
+
+    Parameters:
+    - results (dict): Result of run_optimization.
+
+    Returns:
+    - pandas.DataFrame: One row per project and year with spending, in project order, with the
+      cumulative expenditure of the project up to that year and whether the project is
+      completed in that year.
+    """
+    projects = results.get("projects") or {}
+    frame = pd.DataFrame.from_records(
+        [
+            (project, exp["year"], exp["expenditure"])
+            for project, info in projects.items()
+            for exp in info.get("expenditures") or []
+        ],
+        columns=EXPENDITURE_COLUMNS[:3],
+    ).astype({"Year": "int64", "Expenditure": "float64"})
+    # Cumulative sums need every project's rows in year order
+    frame = frame.sort_values("Year", kind="stable")
+    frame["Cumulative Expenditure"] = frame.groupby("Project", sort=False)["Expenditure"].cumsum()
+    frame = frame.sort_index()
+
+    completion_years = pd.to_numeric(
+        pd.Series({project: info["completion_year"] for project, info in projects.items()}, dtype=object),
+        errors="coerce",
+    )
+    frame["Completed"] = frame["Year"] >= frame["Project"].map(completion_years)
+    return frame
+
+
+def projects_frame(results, expenditures=None):
+    """
+    Flattens the per-project part of a run_optimization result into one table.
+
+    Parameters:
+    - results (dict): Result of run_optimization.
+    - expenditures (pandas.DataFrame, optional): expenditures_frame(results), if already built.
+
+    Returns:
+    - pandas.DataFrame: One row per project with completion year, total benefit, ROI, total
+      expenditure and the annual expenditures as display text ("2024: 50.0k PLN, ...").
+    """
+    if expenditures is None:
+        expenditures = expenditures_frame(results)
+    projects = results.get("projects") or {}
+    frame = pd.DataFrame.from_records(
+        [
+            (project, info.get("completion_year", "N/A"), info.get("total_benefit", 0), info.get("ROI", 0))
+            for project, info in projects.items()
+        ],
+        columns=PROJECT_COLUMNS[:4],
+    )
+
+    by_project = expenditures.groupby("Project", sort=False)
+    text = expenditures["Year"].astype(str) + ": " + expenditures["Expenditure"].map("{:.1f}".format).astype(str) + "k PLN"
+    frame["Total Expenditure"] = frame["Project"].map(by_project["Expenditure"].sum()).fillna(0.0)
+    frame["Annual Expenditures"] = frame["Project"].map(text.groupby(expenditures["Project"], sort=False).agg(", ".join))
+    frame["Annual Expenditures"] = frame["Annual Expenditures"].fillna("No Expenditures")
+
+    for column in ("Total Benefit", "ROI (%)"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
+
+
+def result_frames(results):
+    """
+    Builds both result tables of a run_optimization result.
+
+    Returns:
+    - tuple: (projects_frame, expenditures_frame).
+    """
+    expenditures = expenditures_frame(results)
+    return projects_frame(results, expenditures), expenditures
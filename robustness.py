@@ -0,0 +1,236 @@
+# robustness.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from long_term_investment_programming import SOLVED_STATUSES, sort_budget
+
+DISTRIBUTIONS = ("normal", "uniform", "triangular", "lognormal")
+METHODS = ("exact", "heuristic")
+
+# Status of a sample whose solve raised an error
+FAILED = "Error"
+
+# Sampled costs never fall below this share of the nominal cost, so every cost stays positive
+MIN_COST_FACTOR = 0.01
+
+
+def sample_factors(num_samples, num_projects, spread, distribution="normal", rng=None):
+    """
+    Draws multiplicative perturbation factors with mean 1.
+
+    Parameters:
+    - spread (float): Relative spread, e.g. 0.1. It is the standard deviation for "normal" and
+      "lognormal" and the half-width of the range for "uniform" and "triangular".
+    - distribution (str): One of DISTRIBUTIONS.
+    - rng (numpy.random.Generator, optional): Source of randomness.
+
+    Returns:
+    - numpy.ndarray: Factors of shape (num_samples, num_projects); negative draws are cut to 0.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    shape = (num_samples, num_projects)
+    if distribution == "normal":
+        factors = 1.0 + spread * rng.standard_normal(shape)
+    elif distribution == "uniform":
+        factors = rng.uniform(1.0 - spread, 1.0 + spread, shape)
+    elif distribution == "triangular":
+        factors = rng.triangular(1.0 - spread, 1.0, 1.0 + spread, shape) if spread > 0 else np.ones(shape)
+    elif distribution == "lognormal":
+        # Parameters of the underlying normal that give mean 1 and standard deviation spread
+        sigma = np.sqrt(np.log1p(spread ** 2))
+        factors = rng.lognormal(-sigma ** 2 / 2, sigma, shape)
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}'. Choose one of: {', '.join(DISTRIBUTIONS)}.")
+    return np.maximum(factors, 0.0)
+
+
+def robustness_analysis(projects, budget, num_samples=1000, cost_spread=0.1, benefit_spread=0.1,
+                        distribution="normal", seed=0, method="exact", workers=None, threads=1,
+                        **solver_options):
+    """
+    Solves the portfolio for many random perturbations of project costs and benefits.
+
+    Costs and benefits of all samples are drawn at once as (samples, projects) arrays. The
+    samples are split into chunks that worker processes solve in parallel. A worker keeps
+    one model for its whole chunk and only changes coefficients between samples (see
+    OptimizerSession), and every exact solve starts from the solution of the nominal
+    portfolio. Selections and completion years come back as arrays and are aggregated with
+    vectorized counts.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - num_samples (int): Number of perturbed portfolios.
+    - cost_spread, benefit_spread (float): Relative spread of costs and benefits, see sample_factors.
+    - distribution (str): One of DISTRIBUTIONS, used for costs and benefits.
+    - seed (int): Seed of the random draws; the same seed yields the same samples.
+    - method (str): "exact" solves the MIP; "heuristic" uses the greedy engine without LP bound.
+    - workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+    - threads (int): Solver threads per solve.
+    - solver_options: Passed to OptimizerSession for exact solves, e.g. solver and time_limit;
+      time_limit also bounds the local search of heuristic solves.
+
+    Returns:
+    - dict: 'project_ids' and 'years'; per sample 'costs', 'benefits' (samples x projects),
+      'objectives', 'statuses' (FAILED where the solve raised) and 'completion' (year index per
+      project, -1 when not funded);
+      aggregated over the solved samples 'selection_frequency' per project, 'completion_counts'
+      (projects x years) and 'solved' (the number of solved samples); and the 'nominal' result.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose one of: {', '.join(METHODS)}.")
+    if len(projects) != len(set(projects.keys())):
+        raise ValueError("Project IDs are not unique. Please ensure each project ID is distinct.")
+
+    project_ids = list(projects)
+    years, _ = sort_budget(budget)
+    nominal_costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    nominal_benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+
+    rng = np.random.default_rng(seed)
+    cost_factors = sample_factors(num_samples, len(project_ids), cost_spread, distribution, rng)
+    costs = nominal_costs * np.maximum(cost_factors, MIN_COST_FACTOR)
+    benefits = nominal_benefits * sample_factors(num_samples, len(project_ids), benefit_spread, distribution, rng)
+
+    options = {"threads": threads, **solver_options}
+    nominal, start = _solve_nominal(projects, budget, method, options)
+
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker, so that workers finishing early pick up more
+    chunks = [chunk for chunk in np.array_split(np.arange(num_samples), workers * 4) if len(chunk)]
+    objectives = np.full(num_samples, np.nan)
+    statuses = np.full(num_samples, "", dtype=object)
+    completion = np.full((num_samples, len(project_ids)), -1, dtype=np.int16)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            (chunk, executor.submit(_solve_chunk, project_ids, budget, costs[chunk], benefits[chunk],
+                                    start, method, options))
+            for chunk in chunks
+        ]
+        for chunk, future in futures:
+            objectives[chunk], statuses[chunk], completion[chunk] = future.result()
+
+    solved = np.isin(statuses, SOLVED_STATUSES)
+    done = completion[solved]
+    funded = done >= 0
+    num_years = len(years)
+    rows = np.nonzero(funded)[1]
+    completion_counts = np.bincount(rows * num_years + done[funded], minlength=len(project_ids) * num_years)
+
+    return {
+        "project_ids": project_ids,
+        "years": years,
+        "costs": costs,
+        "benefits": benefits,
+        "objectives": objectives,
+        "statuses": statuses,
+        "completion": completion,
+        "solved": int(solved.sum()),
+        "selection_frequency": funded.mean(axis=0) if len(done) else np.zeros(len(project_ids)),
+        "completion_counts": completion_counts.reshape(len(project_ids), num_years),
+        "nominal": nominal,
+    }
+
+
+def robustness_frames(analysis):
+    """
+    Tabulates a robustness analysis for display.
+
+    Returns:
+    - tuple: (projects, completion, objectives) pandas.DataFrames: one row per project with the
+      selection frequency and the mean and spread of its completion year, one row per project
+      and year with the share of solved samples completing it then, and one row per solved
+      sample with its total benefit.
+    """
+    project_ids, years = analysis["project_ids"], np.array(analysis["years"])
+    counts = analysis["completion_counts"]
+    funded = counts.sum(axis=1)
+    mean_year = np.divide(counts @ years, funded, out=np.full(len(project_ids), np.nan), where=funded > 0)
+    variance = np.divide(counts @ years ** 2, funded, out=np.zeros(len(project_ids)), where=funded > 0)
+    deviation = np.sqrt(np.clip(variance - np.nan_to_num(mean_year) ** 2, 0.0, None))
+    nominal = analysis["nominal"].get("projects") or {}
+    projects = pd.DataFrame({
+        "Project": project_ids,
+        "Selection Frequency (%)": analysis["selection_frequency"] * 100,
+        "Funded in Nominal Plan": [nominal.get(i, {}).get("completion_year", "NOT FUNDED") != "NOT FUNDED"
+                                   for i in project_ids],
+        "Mean Completion Year": mean_year,
+        "Completion Year Std. Dev.": np.where(funded > 0, deviation, np.nan),
+    })
+
+    solved = max(analysis["solved"], 1)
+    completion = pd.DataFrame({
+        "Project": np.repeat(project_ids, len(years)),
+        "Year": np.tile(years, len(project_ids)),
+        "Share (%)": counts.ravel() / solved * 100,
+    })
+
+    solved_mask = np.isin(analysis["statuses"], SOLVED_STATUSES)
+    objectives = pd.DataFrame({"Total Benefits": analysis["objectives"][solved_mask]})
+    return projects, completion, objectives
+
+
+def _solve_nominal(projects, budget, method, options):
+    """Solves the unperturbed portfolio; returns (result, start values for exact solves)."""
+    if method == "heuristic":
+        from heuristic import solve_heuristic
+        return solve_heuristic(projects, budget, time_limit=options.get("time_limit") or 1.0, bound=False), None
+
+    from optimizer_session import OptimizerSession
+    session = OptimizerSession(projects, budget, **options)
+    result = session.solve()
+    if result["status"] not in SOLVED_STATUSES:
+        return result, None
+    # Values clamped into their bounds, so that solver noise such as -1e-15 is a valid start
+    return result, session.solution()
+
+
+def _solve_chunk(project_ids, budget, costs, benefits, start, method, options):
+    """
+    Solves the samples of one chunk in a worker process.
+
+    Samples whose solve raises are recorded with status FAILED instead of aborting the chunk.
+
+    Returns:
+    - tuple: (objectives, statuses, completion) arrays of the chunk's samples.
+    """
+    years, _ = sort_budget(budget)
+    year_index = {year: t for t, year in enumerate(years)}
+    objectives = np.full(len(costs), np.nan)
+    statuses = np.full(len(costs), "", dtype=object)
+    completion = np.full(costs.shape, -1, dtype=np.int16)
+
+    session = None
+    for k in range(len(costs)):
+        projects = {
+            i: {"cost": c, "benefit": b}
+            for i, c, b in zip(project_ids, costs[k].tolist(), benefits[k].tolist())
+        }
+        try:
+            if method == "heuristic":
+                from heuristic import solve_heuristic
+                result = solve_heuristic(projects, budget, time_limit=options.get("time_limit") or 1.0, bound=False)
+            else:
+                if session is None:
+                    from optimizer_session import OptimizerSession
+                    session = OptimizerSession(projects, budget, **options)
+                else:
+                    session.sync(projects, budget)
+                result = session.solve(start=start)
+        except Exception:
+            # A failed sample is recorded as such; the next one starts from a fresh model
+            statuses[k] = FAILED
+            session = None
+            continue
+
+        statuses[k] = result["status"]
+        if result["status"] in SOLVED_STATUSES:
+            objectives[k] = result["objective"]
+            completion[k] = [
+                year_index.get(info["completion_year"], -1) for info in result["projects"].values()
+            ]
+    return objectives, statuses, completion
@@ -0,0 +1,192 @@
+# rolling_horizon.py
+
+import time
+
+import numpy as np
+
+import profiling
+from long_term_investment_programming import SOLVED_STATUSES, compile_array_results, sort_budget
+
+# Relative MIP gap of every window solve unless one is given; a window only approximates the
+# years after it, so proving it optimal costs time without making the plan better
+WINDOW_GAP = 0.01
+# Share of the time left that a window solve may use; the first windows fix the most years
+# with the most projects still open, so they get the most time
+WINDOW_TIME_SHARE = 0.5
+# Seconds every window solve gets at least, however little of time_limit is left
+MIN_WINDOW_TIME = 1.0
+
+
+def solve_rolling_horizon(projects, budget, window=5, step=None, solver="highs", time_limit=None, gap=None,
+                          threads=None, log_path=None, tight=False, bound=True):
+    """
+    Solves long planning horizons by a sequence of short models.
+
+    Every model covers the first window years still open year by year and the remaining years
+    aggregated into blocks of window years, each with the summed budget of its years. A
+    project completed within a block counts as completed in its last year, and completion in
+    the tail is relaxed to fractions, so the tail keeps later years in view at the cost of an
+    LP rather than adding to the branch-and-bound search. The expenditures of the first
+    step years are fixed, projects reduce to their remaining cost, and the window slides on
+    by step years until the horizon is covered. A model has O(N * (window + T / window))
+    variables instead of O(N * T).
+
+    When a window solve ends without a solution, e.g. at its time limit, the fixed years are
+    scheduled greedily instead (see heuristic.py), so their budget is never left unspent. The
+    plan of the greedy heuristic for the whole horizon is returned instead if it is better.
+
+    Rolling pays off where the timing of spending matters, e.g. many projects competing for
+    tight annual budgets over a long horizon. When budgets are loose relative to costs the
+    heuristic alone gets as close to the bound in a fraction of the time.
+
+    Parameters:
+    - projects (dict): Dictionary where keys are project IDs and values are dicts with 'cost' and 'benefit'.
+    - budget (list): List of dictionaries with 'year' and 'amount'.
+    - window (int): Years modelled in detail, also the length of the tail blocks.
+    - step (int, optional): Years fixed after every solve, from 1 to window; window by default.
+      Smaller steps look further ahead before fixing a year but solve more windows.
+    - solver (str): "highs" (in-process) or "cbc", see matrix_model.solve_matrix_model.
+    - time_limit (float, optional): Seconds for all solves together. Every solve may use
+      WINDOW_TIME_SHARE of the time left, but at least MIN_WINDOW_TIME.
+    - gap (float, optional): Relative MIP gap of every solve, WINDOW_GAP by default.
+    - threads (int, optional): Number of solver threads.
+    - log_path (str, optional): File the log of the last solve is written to.
+    - tight (bool): Solve the tight formulation in every window, see matrix_model.build_matrix_model.
+    - bound (bool): Compute the Lagrangian dual bound of the full model, see heuristic.solve_heuristic.
+
+    Returns:
+    - dict: Same structure as run_optimization's result, with 'status' "Feasible" (or "Optimal"
+      when the objective meets the bound), the full model's dual 'bound', the relative
+      'gap' to it and the number of 'windows' solved.
+    """
+    from matrix_model import _solve_cbc, _solve_highs, build_matrix_model, record_model_size
+    from cuts import earliest_completion
+
+    step = window if step is None else step
+    if window < 1 or not 1 <= step <= window:
+        raise ValueError("The rolling horizon needs window >= 1 and 1 <= step <= window.")
+    if solver not in ("cbc", "highs"):
+        raise ValueError(f"Unknown solver '{solver}' for the rolling horizon. Choose one of: cbc, highs.")
+    solve = _solve_highs if solver == "highs" else _solve_cbc
+    gap = WINDOW_GAP if gap is None else gap
+
+    project_ids = list(projects)
+    years, annual_budgets = sort_budget(budget)
+    num_years = len(years)
+    amounts = np.array(annual_budgets, dtype=float)
+    costs = np.array([projects[i]["cost"] for i in project_ids], dtype=float)
+    benefits = np.array([projects[i]["benefit"] for i in project_ids], dtype=float)
+    tolerance = 1e-6 * max(1.0, costs.max() if len(costs) else 0.0)
+
+    x = np.zeros((len(costs), num_years))
+    spent = np.zeros(len(costs))
+    completion = np.full(len(costs), -1)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    windows = 0
+    first = 0
+
+    while first < num_years:
+        active = np.nonzero((completion < 0) & (benefits > 0))[0]
+        if not len(active):
+            break
+
+        # Last year index of every period: window single years, then blocks of window years
+        detailed = min(window, num_years - first)
+        ends = list(range(first, first + detailed))
+        while ends[-1] < num_years - 1:
+            ends.append(min(ends[-1] + window, num_years - 1))
+        starts = [first] + [end + 1 for end in ends[:-1]]
+        period_amounts = np.array([amounts[a:e + 1].sum() for a, e in zip(starts, ends)])
+        num_periods = len(ends)
+
+        remaining = costs[active] - spent[active]
+        window_projects = {
+            project_ids[i]: {"cost": c, "benefit": b}
+            for i, c, b in zip(active.tolist(), remaining.tolist(), benefits[active].tolist())
+        }
+        window_budget = [{"year": p, "amount": a} for p, a in enumerate(period_amounts.tolist())]
+        with profiling.phase("build"):
+            earliest = dict(zip(window_projects, earliest_completion(remaining, period_amounts).tolist()))
+            matrix_model = build_matrix_model(window_projects, window_budget, earliest, tight)
+            # Completion in period p yields benefit for the years after its end
+            benefit_years = np.diff(np.append(ends, num_years - 1)).astype(float)
+            n = len(active)
+            matrix_model["c"][n * num_periods:2 * n * num_periods] = np.outer(benefits[active], benefit_years).ravel()
+            # Only completion within the window is integer; the tail and the selection are relaxed
+            tail = np.zeros((n, num_periods), dtype=bool)
+            tail[:, detailed:] = True
+            matrix_model["integrality"][n * num_periods:2 * n * num_periods][tail.ravel()] = 0
+            matrix_model["integrality"][2 * n * num_periods:] = 0
+        record_model_size(matrix_model)
+
+        limit = None
+        if deadline is not None:
+            limit = max((deadline - time.perf_counter()) * WINDOW_TIME_SHARE, MIN_WINDOW_TIME)
+        status, values = solve(matrix_model, time_limit=limit, gap=gap, threads=threads, log_path=log_path)
+        windows += 1
+
+        fixed = min(step, num_years - first)
+        if status in SOLVED_STATUSES:
+            s = values[:n * num_periods].reshape(n, num_periods)
+            annual = np.diff(s[:, :fixed], axis=1, prepend=0.0).clip(min=0.0)
+        else:
+            with profiling.phase("fallback"):
+                annual = _greedy_years(remaining, benefits[active], amounts[first:])[:, :fixed]
+        x[active, first:first + fixed] = annual
+        paid = np.cumsum(annual, axis=1) + spent[active, None]
+        reached = paid >= costs[active, None] - tolerance
+        done = reached.any(axis=1)
+        completion[active[done]] = first + reached[done].argmax(axis=1)
+        spent[active] = paid[:, -1]
+        first += fixed
+
+    # Spending on projects never completed yields nothing
+    x[completion < 0] = 0.0
+    funded = completion >= 0
+    objective = float(benefits[funded] @ (num_years - 1 - completion[funded]))
+
+    from heuristic import solve_heuristic
+    # Timed as one phase; the phases solve_heuristic records would count twice
+    with profiling.phase("heuristic"), profiling.suspended():
+        greedy = solve_heuristic(projects, budget, bound=bound)
+
+    upper_bound = greedy["bound"]
+    gap_value = None
+    status = "Feasible"
+    objective = max(objective, greedy["objective"])
+    if upper_bound is not None:
+        upper_bound = max(upper_bound, objective)
+        gap_value = (upper_bound - objective) / max(abs(objective), 1e-9)
+        if upper_bound - objective <= 1e-6 * max(1.0, abs(upper_bound)):
+            status = "Optimal"
+
+    if greedy["objective"] == objective:
+        results = {**greedy, "status": status}
+    else:
+        z = (np.arange(num_years)[None, :] >= completion[:, None]) & funded[:, None]
+        with profiling.phase("extract"):
+            results = compile_array_results(project_ids, costs, benefits, years, x, z.astype(float),
+                                             funded.astype(float), status, objective)
+    results["bound"] = upper_bound
+    results["gap"] = gap_value
+    results["windows"] = windows
+    return results
+
+
+def _greedy_years(costs, benefits, amounts):
+    """
+    Schedules projects greedily on the given years, see heuristic.solve_heuristic.
+
+    Returns:
+    - numpy.ndarray: Annual expenditures of shape (N, len(amounts)).
+    """
+    from heuristic import _greedy_fill, _schedule
+
+    cumulative = np.cumsum(amounts)
+    capacity = cumulative[-2] if len(cumulative) > 1 else 0.0
+    ratio = np.divide(benefits, costs, out=np.full(len(costs), np.inf), where=costs > 0)
+    order = np.lexsort((-benefits, -ratio))
+    eligible = (benefits > 0) & (costs <= capacity)
+    selected = _greedy_fill(np.zeros(len(costs), dtype=bool), order, costs, eligible, capacity)
+    x, _ = _schedule(selected, order, costs, cumulative)
+    return x
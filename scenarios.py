@@ -0,0 +1,143 @@
+# scenarios.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from long_term_investment_programming import run_optimization
+
+
+def run_scenarios(scenarios, workers=None, threads=1):
+    """
+    Solves many scenarios in parallel and yields their results as they finish.
+
+    Each scenario is solved in its own worker process, and each CBC run is limited to
+    `threads` threads so that workers * threads does not oversubscribe the machine.
+
+    Parameters:
+    - scenarios (list): Dicts with 'name', 'projects', 'budget' and optionally 'options',
+      a dict of keyword arguments for run_optimization.
+    - workers (int, optional): Number of worker processes; defaults to the number of CPUs.
+    - threads (int): CBC threads per solve.
+
+    Yields:
+    - tuple: (name, result) in completion order. A failed solve yields a result with
+      status "Error" and the message under 'error'.
+    """
+    names = [scenario["name"] for scenario in scenarios]
+    if len(names) != len(set(names)):
+        raise ValueError("Scenario names are not unique. Please ensure each scenario name is distinct.")
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_solve_scenario, scenario, threads): scenario["name"]
+            for scenario in scenarios
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, future.result()
+            except Exception as e:
+                yield name, {"status": "Error", "objective": None, "projects": None, "error": str(e)}
+
+
+def _solve_scenario(scenario, threads):
+    options = {"threads": threads, **scenario.get("options", {})}
+    return run_optimization(scenario["projects"], scenario["budget"], **options)
+
+
+def budget_scaling_scenarios(projects, budget, factors=(0.7, 0.8, 0.9, 1.0, 1.1, 1.2, 1.3)):
+    """Returns one scenario per factor with every annual budget amount scaled by it."""
+    return [
+        {
+            "name": f"budget x{factor:g}",
+            "projects": projects,
+            "budget": [{"year": entry["year"], "amount": entry["amount"] * factor} for entry in budget],
+        }
+        for factor in factors
+    ]
+
+
+def year_shift_scenarios(projects, budget, shifts=(-2, -1, 1, 2)):
+    """
+    Returns one scenario per shift with the budget profile moved by that many years.
+
+    The planning horizon stays the same: amounts shifted past its end are dropped and
+    years left uncovered get no budget.
+    """
+    years = sorted(entry["year"] for entry in budget)
+    amounts = {entry["year"]: entry["amount"] for entry in budget}
+    scenarios = []
+    for shift in shifts:
+        shifted = []
+        for k, year in enumerate(years):
+            source = k - shift
+            shifted.append({"year": year, "amount": amounts[years[source]] if 0 <= source < len(years) else 0})
+        scenarios.append({"name": f"years {shift:+d}", "projects": projects, "budget": shifted})
+    return scenarios
+
+
+def project_subset_scenarios(projects, budget, subsets):
+    """
+    Returns one scenario per named subset of project IDs.
+
+    Parameters:
+    - subsets (dict): Scenario name mapped to the project IDs to keep.
+    """
+    return [
+        {
+            "name": name,
+            "projects": {i: projects[i] for i in project_ids if i in projects},
+            "budget": budget,
+        }
+        for name, project_ids in subsets.items()
+    ]
+
+
+def scenarios_frame(results):
+    """
+    Consolidates scenario results into one comparison table.
+
+    Parameters:
+    - results (dict or iterable): Scenario name mapped to result, or (name, result) pairs
+      as yielded by run_scenarios.
+
+    Returns:
+    - pandas.DataFrame: One row per scenario with status, objective, funded project count and
+      earliest, mean and latest completion year.
+    """
+    items = results.items() if isinstance(results, dict) else results
+    rows = []
+    for name, result in items:
+        completion_years = [
+            info["completion_year"] for info in (result.get("projects") or {}).values()
+            if info["completion_year"] != "NOT FUNDED"
+        ]
+        rows.append({
+            "Scenario": name,
+            "Status": result["status"],
+            "Total Benefits": result["objective"],
+            "Number of Funded Projects": len(completion_years),
+            "First Completion Year": min(completion_years) if completion_years else None,
+            "Mean Completion Year": sum(completion_years) / len(completion_years) if completion_years else None,
+            "Last Completion Year": max(completion_years) if completion_years else None,
+        })
+    return pd.DataFrame(rows)
+
+
+def completion_matrix(results):
+    """
+    Returns the completion year of every project in every scenario.
+
+    Returns:
+    - pandas.DataFrame: Projects as rows, scenarios as columns; "NOT FUNDED" where a project
+      is not funded and missing where it is not part of the scenario.
+    """
+    items = results.items() if isinstance(results, dict) else results
+    columns = {
+        name: {i: info["completion_year"] for i, info in (result.get("projects") or {}).items()}
+        for name, result in items
+    }
+    return pd.DataFrame(columns)
@@ -0,0 +1,306 @@
+# service.py
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from result_cache import ResultCache, cache_key
+
+# run_optimization options a caller may set; log and profile files stay on the caller's side
+REQUEST_OPTIONS = ("formulation", "engine", "solver", "time_limit", "gap", "threads", "presolve", "window",
+                   "window_step", "bound")
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class OptimizationService:
+    """
+    Serves run_optimization over HTTP/JSON.
+
+    Solves run in a pool of max_workers processes, so no more than max_workers solver
+    processes ever run at once, however many callers there are. Requests with the same input
+    hash (see result_cache.cache_key) share one solve while it is in flight, and optimal
+    results are answered from a ResultCache afterwards. Once max_pending distinct solves are
+    waiting or running, further solves are refused with 503 and a Retry-After header.
+
+    Endpoints:
+    - POST /optimize with {"projects": {...}, "budget": [...], "options": {...}} returns the
+      result dict; options are keyword arguments of run_optimization from REQUEST_OPTIONS.
+    - GET /metrics returns request counters, queue depth and latency percentiles.
+    - GET /health returns {"status": "ok"}.
+
+    Usage:
+        asyncio.run(OptimizationService(max_workers=2).serve("127.0.0.1", 8000))
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, cache=None, max_body_bytes=64 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.cache = ResultCache() if cache is None else cache
+        self.started_at = time.time()
+        self.counters = {"requests": 0, "solves": 0, "coalesced": 0, "cache_hits": 0, "rejected": 0, "errors": 0}
+        self._latencies = deque(maxlen=1000)
+        self._in_flight = {}
+        self._executor = None
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        """Listens until cancelled."""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def start(self, host="127.0.0.1", port=8000):
+        """Starts listening and returns the asyncio server; port 0 picks a free port."""
+        self._executor = self._new_executor()
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def shutdown(self):
+        """Stops the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def optimize(self, projects, budget, options):
+        """
+        Returns the result for an input, joining an identical in-flight solve if there is one.
+
+        Raises:
+        - OverflowError: max_pending distinct solves are already waiting or running.
+        """
+        key = cache_key(projects, budget, **options)
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(shared)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.counters["cache_hits"] += 1
+            return cached
+
+        if len(self._in_flight) >= self.max_pending:
+            raise OverflowError("Too many pending optimizations.")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, _solve, projects, budget, options)
+        self._in_flight[key] = future
+        self.counters["solves"] += 1
+        try:
+            result = await asyncio.shield(future)
+        except BrokenProcessPool:
+            # A worker died, e.g. killed by the system; later solves get a fresh pool
+            self._executor = self._new_executor()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        if result["status"] == "Optimal":
+            self.cache.put(key, result)
+        return result
+
+    def metrics(self):
+        """Returns the request counters, queue depth and latency of answered optimize requests."""
+        latencies = sorted(self._latencies)
+        pending = len(self._in_flight)
+        return {
+            **self.counters,
+            "uptime": time.time() - self.started_at,
+            "workers": self.max_workers,
+            "pending": pending,
+            "running": min(pending, self.max_workers),
+            "queue_depth": max(0, pending - self.max_workers),
+            "max_pending": self.max_pending,
+            "latency": {
+                "count": len(latencies),
+                "mean": statistics.fmean(latencies) if latencies else None,
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+            "cache": self.cache.stats(),
+        }
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            try:
+                status, body, headers = await self._respond(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception as e:
+                status, body, headers = 500, {"error": str(e)}, {}
+            payload = json.dumps(body, default=str).encode("utf-8")
+            head = [f"HTTP/1.1 {status} {_REASONS[status]}", "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}", "Connection: close"]
+            head += [f"{name}: {value}" for name, value in headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        """Reads one request and returns (status, JSON body, extra headers)."""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) < 2:
+            return 400, {"error": "Malformed request line."}, {}
+        method, path = request_line[0], request_line[1].split("?")[0]
+
+        if path == "/health":
+            return 200, {"status": "ok"}, {}
+        if path == "/metrics":
+            return 200, self.metrics(), {}
+        if path != "/optimize":
+            return 404, {"error": f"Unknown path '{path}'."}, {}
+        if method != "POST":
+            return 405, {"error": "Use POST."}, {"Allow": "POST"}
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return 400, {"error": "Invalid Content-Length header."}, {}
+        if length < 0:
+            return 400, {"error": "Invalid Content-Length header."}, {}
+        if length > self.max_body_bytes:
+            return 413, {"error": f"Request body exceeds {self.max_body_bytes} bytes."}, {}
+        try:
+            body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return 400, {"error": "Request body shorter than Content-Length."}, {}
+        self.counters["requests"] += 1
+        started = time.perf_counter()
+        try:
+            projects, budget, options = _parse_request(body)
+            result = await self.optimize(projects, budget, options)
+        except OverflowError as e:
+            self.counters["rejected"] += 1
+            return 503, {"error": str(e)}, {"Retry-After": "1"}
+        except ValueError as e:
+            self.counters["errors"] += 1
+            return 400, {"error": str(e)}, {}
+        except Exception as e:
+            self.counters["errors"] += 1
+            return 500, {"error": str(e)}, {}
+        self._latencies.append(time.perf_counter() - started)
+        return 200, result, {}
+
+
+class OptimizationClient:
+    """
+    Minimal blocking client of an OptimizationService, using only the standard library.
+
+    Usage:
+        client = OptimizationClient("http://127.0.0.1:8000")
+        result = client.optimize(projects, budget, time_limit=60)
+    """
+
+    def __init__(self, url, timeout=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def optimize(self, projects, budget, **options):
+        """
+        Returns the result of run_optimization(projects, budget, **options) from the service.
+
+        Raises:
+        - RuntimeError: The service answered with an error; the message includes the HTTP status.
+        """
+        body = json.dumps({"projects": projects, "budget": budget, "options": options}).encode("utf-8")
+        request = urllib.request.Request(f"{self.url}/optimize", data=body, headers={"Content-Type": "application/json"})
+        return self._send(request)
+
+    def metrics(self):
+        """Returns the service's metrics."""
+        return self._send(urllib.request.Request(f"{self.url}/metrics"))
+
+    def _send(self, request):
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.load(e).get("error", "")
+            except ValueError:
+                message = ""
+            raise RuntimeError(f"HTTP {e.code}: {message}") from None
+
+
+def _parse_request(body):
+    """Returns (projects, budget, options) of an /optimize body, raising ValueError when it is invalid."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise ValueError("Request body is not valid JSON.")
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object.")
+    projects, budget = payload.get("projects"), payload.get("budget")
+    options = payload.get("options") or {}
+    if not isinstance(projects, dict) or not isinstance(budget, list) or not isinstance(options, dict):
+        raise ValueError("Expected 'projects' as an object, 'budget' as a list and 'options' as an object.")
+    unknown = sorted(set(options) - set(REQUEST_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unknown options: {', '.join(unknown)}. Allowed: {', '.join(REQUEST_OPTIONS)}.")
+    for i, details in projects.items():
+        if not isinstance(details, dict) or not _is_number(details.get("cost")) or not _is_number(details.get("benefit")):
+            raise ValueError(f"Project '{i}' needs a numeric 'cost' and 'benefit'.")
+    for entry in budget:
+        if not isinstance(entry, dict) or not isinstance(entry.get("year"), int) or not _is_number(entry.get("amount")):
+            raise ValueError("Every budget entry needs an integer 'year' and a numeric 'amount'.")
+    return projects, budget, options
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _percentile(values, q):
+    """Returns the q-quantile of sorted values by nearest rank, or None if there are none."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _solve(projects, budget, options):
+    # Runs in a worker process
+    from long_term_investment_programming import run_optimization
+    return run_optimization(projects, budget, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON service for run_optimization.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2, help="Solver processes running at most at once.")
+    parser.add_argument("--max-pending", type=int, default=32, help="Distinct solves accepted before refusing with 503.")
+    args = parser.parse_args(argv)
+
+    service = OptimizationService(max_workers=args.workers, max_pending=args.max_pending)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# test_bulk_io.py
+
+import io
+
+import pytest
+
+from bulk_io import budget_table, projects_table, read_budget, read_projects, table_bytes
+
+PROJECTS_CSV = """Project ID, Cost, Benefit
+A, 100, 10
+, 50, 5
+B, abc, 5
+C, 0, 5
+D, 80, x
+E, 80, -1
+F, 120.5, 7
+A, 90, 9
+G, 60, 0
+"""
+
+BUDGET_CSV = """Year,Budget
+2024,100
+2025.5,100
+x,100
+2026,abc
+2027,-5
+2024,90
+2028,150.5
+"""
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.mark.parametrize("chunksize", [2, 50_000])
+def test_read_projects_rejects_bad_rows(chunksize):
+    projects, errors = read_projects(csv_file(PROJECTS_CSV), "csv", chunksize=chunksize)
+    assert projects == {
+        "A": {"cost": 100, "benefit": 10},
+        "F": {"cost": 120.5, "benefit": 7},
+        "G": {"cost": 60, "benefit": 0},
+    }
+    assert list(errors.columns) == ["Row", "Project", "Reason"]
+    assert errors["Row"].tolist() == [2, 3, 4, 5, 6, 8]
+    assert errors["Reason"].tolist() == [
+        "missing project ID", "cost is not a number", "cost is not positive",
+        "benefit is not a number", "benefit is negative", "duplicate project ID",
+    ]
+
+
+def test_invalid_row_does_not_shadow_later_duplicate():
+    projects, errors = read_projects(csv_file("id,cost,benefit\nA,x,1\nA,10,2\n"), "csv")
+    assert projects == {"A": {"cost": 10, "benefit": 2}}
+    assert errors["Reason"].tolist() == ["cost is not a number"]
+
+
+@pytest.mark.parametrize("chunksize", [3, 50_000])
+def test_read_budget_rejects_bad_rows(chunksize):
+    budget, errors = read_budget(csv_file(BUDGET_CSV), "csv", chunksize=chunksize)
+    assert budget == [{"year": 2024, "amount": 100}, {"year": 2028, "amount": 150.5}]
+    assert errors["Row"].tolist() == [2, 3, 4, 5, 6]
+    assert errors["Reason"].tolist() == [
+        "year is not a whole number", "year is not a number", "amount is not a number",
+        "amount is negative", "duplicate year",
+    ]
+
+
+def test_missing_column_is_an_error():
+    with pytest.raises(ValueError, match="Column 'benefit' is missing"):
+        read_projects(csv_file("id,cost\nA,10\n"), "csv")
+
+
+def test_unknown_format_is_an_error():
+    with pytest.raises(ValueError, match="Unknown file format 'xml'"):
+        read_projects(csv_file("id,cost,benefit\n"), "xml")
+    with pytest.raises(ValueError, match="Cannot infer the file format"):
+        read_projects("projects.json")
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "excel"])
+def test_round_trip(file_format):
+    if file_format == "parquet":
+        pytest.importorskip("pyarrow")
+    if file_format == "excel":
+        pytest.importorskip("openpyxl")
+    projects = {"A": {"cost": 100, "benefit": 10}, "B 2": {"cost": 55.5, "benefit": 3}}
+    budget = [{"year": 2025, "amount": 80}, {"year": 2024, "amount": 100}]
+
+    read, errors = read_projects(io.BytesIO(table_bytes(projects_table(projects), file_format)), file_format)
+    assert read == projects and errors.empty
+    read, errors = read_budget(io.BytesIO(table_bytes(budget_table(budget), file_format)), file_format)
+    assert read == sorted(budget, key=lambda entry: entry["year"]) and errors.empty
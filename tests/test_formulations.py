@@ -0,0 +1,48 @@
+# test_formulations.py
+
+import random
+
+import pytest
+
+from long_term_investment_programming import run_optimization
+
+# Portfolio and budget the app starts with
+DEFAULT_PROJECTS = {
+    "A": {"cost": 100, "benefit": 10},
+    "B": {"cost": 110, "benefit": 9},
+    "C": {"cost": 100, "benefit": 8},
+    "D": {"cost": 120, "benefit": 9},
+    "E": {"cost": 90, "benefit": 11},
+    "F": {"cost": 80, "benefit": 7},
+    "G": {"cost": 95, "benefit": 10},
+    "H": {"cost": 200, "benefit": 20},
+    "I": {"cost": 105, "benefit": 10},
+}
+DEFAULT_BUDGET = [{"year": year, "amount": 100} for year in range(2024, 2034)]
+
+
+def random_portfolio(seed):
+    rng = random.Random(seed)
+    projects = {
+        f"P{k}": {"cost": rng.randint(50, 200), "benefit": rng.randint(1, 20)}
+        for k in range(rng.randint(3, 8))
+    }
+    budget = [{"year": 2024 + t, "amount": rng.randint(40, 200)} for t in range(rng.randint(2, 6))]
+    return projects, budget
+
+
+def assert_same_objective(projects, budget):
+    # Without presolve, so that each formulation is solved on the full portfolio
+    classic = run_optimization(projects, budget, formulation="classic", presolve=False)
+    cumulative = run_optimization(projects, budget, formulation="cumulative", presolve=False)
+    assert classic["status"] == cumulative["status"] == "Optimal"
+    assert cumulative["objective"] == pytest.approx(classic["objective"], abs=1e-6)
+
+
+def test_default_portfolio():
+    assert_same_objective(DEFAULT_PROJECTS, DEFAULT_BUDGET)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_portfolio(seed):
+    assert_same_objective(*random_portfolio(seed))
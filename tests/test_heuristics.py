@@ -0,0 +1,59 @@
+# test_heuristics.py
+
+import pytest
+
+from benchmark import synthetic_portfolio
+from long_term_investment_programming import run_optimization
+from test_formulations import random_portfolio
+
+
+def assert_feasible(results, projects, budget):
+    amounts = {entry["year"]: entry["amount"] for entry in budget}
+    spend = dict.fromkeys(amounts, 0.0)
+    total = 0.0
+    for project_id, info in results["projects"].items():
+        paid = sum(exp["expenditure"] for exp in info["expenditures"])
+        for exp in info["expenditures"]:
+            assert exp["expenditure"] >= -1e-6
+            spend[exp["year"]] += exp["expenditure"]
+        if info["completion_year"] == "NOT FUNDED":
+            assert paid == pytest.approx(0.0, abs=1e-6)
+            continue
+        # Funded projects are paid in full by their completion year, which precedes the last year
+        assert paid == pytest.approx(projects[project_id]["cost"])
+        assert all(exp["year"] <= info["completion_year"] for exp in info["expenditures"] if exp["expenditure"] > 1e-6)
+        assert info["completion_year"] < max(amounts)
+        total += info["total_benefit"]
+    assert all(spend[year] <= amounts[year] + 1e-6 for year in amounts)
+    assert total == pytest.approx(results["objective"])
+
+
+@pytest.mark.parametrize("engine", ["heuristic", "decomposition"])
+@pytest.mark.parametrize("seed", range(10))
+def test_engine_is_feasible_and_within_bound_of_optimum(engine, seed):
+    projects, budget = random_portfolio(seed)
+    results = run_optimization(projects, budget, engine=engine)
+    optimum = run_optimization(projects, budget, engine="matrix", solver="highs")["objective"]
+
+    assert_feasible(results, projects, budget)
+    assert results["objective"] <= optimum + 1e-6
+    assert results["bound"] >= optimum - 1e-6
+    assert results["gap"] == pytest.approx((results["bound"] - results["objective"]) / max(results["objective"], 1e-9))
+
+
+@pytest.mark.parametrize("engine", ["heuristic", "decomposition"])
+def test_engine_on_larger_portfolio(engine):
+    projects, budget = synthetic_portfolio(300, 20, seed=2)
+    results = run_optimization(projects, budget, engine=engine, time_limit=2)
+    assert_feasible(results, projects, budget)
+    assert results["objective"] <= results["bound"] + 1e-6
+    # Both stay close to the bound on portfolios of many small projects
+    assert results["gap"] < 0.05
+
+
+def test_heuristic_without_bound():
+    projects, budget = synthetic_portfolio(50, 10, seed=3)
+    results = run_optimization(projects, budget, engine="heuristic", bound=False)
+    assert_feasible(results, projects, budget)
+    assert results["bound"] is None and results["gap"] is None
+    assert results["status"] == "Feasible"
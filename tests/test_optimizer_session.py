@@ -0,0 +1,81 @@
+# test_optimizer_session.py
+
+import random
+
+import pytest
+
+from long_term_investment_programming import run_optimization
+from optimizer_session import OptimizerSession
+from test_formulations import DEFAULT_BUDGET, DEFAULT_PROJECTS, random_portfolio
+
+
+def assert_matches_fresh_solve(results, projects, budget):
+    fresh = run_optimization(projects, budget, presolve=False)
+    assert results["status"] == fresh["status"] == "Optimal"
+    assert results["objective"] == pytest.approx(fresh["objective"], abs=1e-6)
+    assert set(results["projects"]) == set(projects)
+
+
+def test_edits_match_fresh_solve():
+    projects = {i: dict(details) for i, details in DEFAULT_PROJECTS.items()}
+    budget = [dict(entry) for entry in DEFAULT_BUDGET]
+    session = OptimizerSession(projects, budget)
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    session.update_project("H", cost=150, benefit=25)
+    projects["H"] = {"cost": 150, "benefit": 25}
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    session.add_project("J", 60, 12)
+    projects["J"] = {"cost": 60, "benefit": 12}
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    session.remove_project("E")
+    del projects["E"]
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    # A deleted project coming back reuses its variables with the new data
+    session.add_project("E", 70, 6)
+    projects["E"] = {"cost": 70, "benefit": 6}
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    budget[3]["amount"] = 40
+    session.update_budget(budget)
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+    assert session.rebuilds == 1
+
+    budget = budget[:7]
+    session.update_budget(budget)
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+    assert session.rebuilds == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sync_matches_fresh_solve(seed):
+    rng = random.Random(seed)
+    projects, budget = random_portfolio(seed)
+    session = OptimizerSession(projects, budget)
+    assert_matches_fresh_solve(session.solve(), projects, budget)
+
+    for round_ in range(4):
+        projects = {i: dict(details) for i, details in projects.items()}
+        for i in rng.sample(sorted(projects), k=min(2, len(projects))):
+            projects[i]["cost"] = rng.randint(50, 200)
+            projects[i]["benefit"] = rng.randint(1, 20)
+        if len(projects) > 2:
+            del projects[rng.choice(sorted(projects))]
+        projects[f"N{round_}"] = {"cost": rng.randint(50, 200), "benefit": rng.randint(1, 20)}
+        budget = [{**entry, "amount": rng.randint(40, 200)} for entry in budget]
+
+        session.sync(projects, budget)
+        assert_matches_fresh_solve(session.solve(), projects, budget)
+    assert session.rebuilds == 1
+
+
+def test_solve_accepts_start_with_solver_noise():
+    session = OptimizerSession(DEFAULT_PROJECTS, DEFAULT_BUDGET)
+    session.solve()
+    # Values slightly outside the bounds, as solvers report them
+    start = {name: value - 1e-14 if value == 0 else value + 1e-14 for name, value in session.solution().items()}
+    assert_matches_fresh_solve(session.solve(start=start), DEFAULT_PROJECTS, DEFAULT_BUDGET)
+    assert all(value >= 0 for value in session.solution().values())
@@ -0,0 +1,55 @@
+# test_presolve.py
+
+import random
+
+import pytest
+
+from long_term_investment_programming import run_optimization
+from presolve import DOMINATED, NO_BENEFIT, OVER_BUDGET, reduce_portfolio
+from test_formulations import DEFAULT_BUDGET, DEFAULT_PROJECTS
+
+
+def reducible_portfolio(seed):
+    """Random portfolio with projects of every kind presolve removes, and ties between projects."""
+    rng = random.Random(seed)
+    budget = [{"year": 2024 + t, "amount": rng.randint(40, 150)} for t in range(rng.randint(2, 6))]
+    projects = {}
+    for k in range(rng.randint(4, 9)):
+        projects[f"P{k}"] = {"cost": rng.choice([60, 80, 100, 120, 300, 900]), "benefit": rng.choice([0, 3, 5, 5, 8, 12])}
+    # Identical twin of an existing project
+    projects["Twin"] = dict(projects["P0"])
+    return projects, budget
+
+
+def test_reasons():
+    budget = [{"year": 2024, "amount": 100}, {"year": 2025, "amount": 100}, {"year": 2026, "amount": 100}]
+    projects = {
+        "Free": {"cost": 10, "benefit": 0},
+        "Huge": {"cost": 250, "benefit": 50},
+        "Better": {"cost": 150, "benefit": 10},
+        "Worse": {"cost": 160, "benefit": 9},
+        "Small": {"cost": 40, "benefit": 2},
+    }
+    reduction = reduce_portfolio(projects, budget)
+    assert reduction["removed"] == {"Free": NO_BENEFIT, "Huge": OVER_BUDGET, "Worse": DOMINATED}
+    assert list(reduction["projects"]) == ["Better", "Small"]
+    assert reduction["earliest"] == {"Better": 2, "Small": 1}
+
+
+@pytest.mark.parametrize("engine", ["pulp", "matrix"])
+@pytest.mark.parametrize("seed", range(12))
+def test_presolve_keeps_the_optimum(engine, seed):
+    projects, budget = reducible_portfolio(seed)
+    full = run_optimization(projects, budget, engine=engine, presolve=False)
+    reduced = run_optimization(projects, budget, engine=engine)
+    assert full["status"] == reduced["status"] == "Optimal"
+    assert reduced["objective"] == pytest.approx(full["objective"], abs=1e-6)
+    assert set(reduced["projects"]) == set(projects)
+    for project_id in reduced["presolve"]["removed"]:
+        assert reduced["projects"][project_id]["completion_year"] == "NOT FUNDED"
+
+
+def test_presolve_keeps_the_optimum_of_default_portfolio():
+    full = run_optimization(DEFAULT_PROJECTS, DEFAULT_BUDGET, presolve=False)
+    reduced = run_optimization(DEFAULT_PROJECTS, DEFAULT_BUDGET)
+    assert reduced["objective"] == pytest.approx(full["objective"], abs=1e-6)
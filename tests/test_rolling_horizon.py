@@ -0,0 +1,44 @@
+# test_rolling_horizon.py
+
+import pytest
+
+import heuristic
+import rolling_horizon
+from benchmark import synthetic_portfolio
+from long_term_investment_programming import run_optimization
+
+
+def annual_spend(results, budget):
+    spend = {entry["year"]: 0.0 for entry in budget}
+    for info in results["projects"].values():
+        for exp in info["expenditures"]:
+            spend[exp["year"]] += exp["expenditure"]
+    return [spend[year] for year in sorted(spend)]
+
+
+def test_failed_windows_still_spend_the_budget(monkeypatch):
+    projects, budget = synthetic_portfolio(60, 20, seed=0)
+    # No window solve gets time for a solution, and the whole-horizon heuristic plan is
+    # hidden, so the plan consists of fallback schedules only
+    monkeypatch.setattr(rolling_horizon, "MIN_WINDOW_TIME", 0.0)
+    greedy = heuristic.solve_heuristic
+    monkeypatch.setattr(heuristic, "solve_heuristic", lambda *args, **kwargs: {**greedy(*args, **kwargs), "objective": 0.0})
+
+    results = rolling_horizon.solve_rolling_horizon(projects, budget, time_limit=0.0)
+
+    spend = annual_spend(results, budget)
+    amounts = [entry["amount"] for entry in budget]
+    last = max(t for t, value in enumerate(spend) if value > 1e-6)
+    # Every year before the last one with spending uses its whole budget
+    assert spend[:last] == pytest.approx(amounts[:last])
+    assert results["objective"] >= 0.9 * results["bound"]
+
+
+def test_short_time_limit_keeps_budget_within_limits():
+    projects, budget = synthetic_portfolio(40, 15, seed=1)
+    results = run_optimization(projects, budget, engine="rolling", solver="highs", time_limit=1)
+    amounts = [entry["amount"] for entry in budget]
+    assert all(value <= amount + 1e-6 for value, amount in zip(annual_spend(results, budget), amounts))
+    total = sum(info["total_benefit"] for info in results["projects"].values())
+    assert total == pytest.approx(results["objective"])
+    assert results["objective"] <= results["bound"] + 1e-6
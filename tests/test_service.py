@@ -0,0 +1,150 @@
+# test_service.py
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import service
+from service import OptimizationService
+
+PROJECTS = {"A": {"cost": 100, "benefit": 10}, "B": {"cost": 50, "benefit": 3}}
+BUDGET = [{"year": 2024, "amount": 80}, {"year": 2025, "amount": 80}, {"year": 2026, "amount": 80}]
+
+
+@pytest.fixture
+def gated_solve(monkeypatch):
+    """Replaces the worker's solve by one that waits for release and counts its calls."""
+    release = threading.Event()
+    calls = []
+
+    def solve(projects, budget, options):
+        calls.append(options)
+        release.wait(10)
+        return {"status": "Optimal", "objective": 1.0, "projects": {}}
+
+    monkeypatch.setattr(service, "_solve", solve)
+    return release, calls
+
+
+async def start(**kwargs):
+    svc = OptimizationService(**kwargs)
+    server = await svc.start("127.0.0.1", 0)
+    # Threads instead of processes, so that the gated solve above runs in them
+    svc._executor.shutdown()
+    svc._executor = ThreadPoolExecutor(max_workers=svc.max_workers)
+    return svc, server, server.sockets[0].getsockname()[1]
+
+
+async def send(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    writer.write_eof()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(body)
+
+
+def optimize_request(options=None, length=None):
+    body = json.dumps({"projects": PROJECTS, "budget": BUDGET, "options": options or {}}).encode("utf-8")
+    length = len(body) if length is None else length
+    return f"POST /optimize HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1") + body
+
+
+async def wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not reached.")
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length_is_rejected(length):
+    async def run():
+        svc, server, port = await start()
+        raw = f"POST /optimize HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1")
+        status, _, body = await send(port, raw)
+        server.close()
+        svc.shutdown()
+        return status, body
+
+    status, body = asyncio.run(run())
+    assert status == 400
+    assert body["error"] == "Invalid Content-Length header."
+
+
+def test_short_body_is_rejected():
+    async def run():
+        svc, server, port = await start()
+        raw = optimize_request()
+        status, _, body = await send(port, raw.replace(b"Content-Length: ", b"Content-Length: 1"))
+        server.close()
+        svc.shutdown()
+        return status, body, svc.counters
+
+    status, body, counters = asyncio.run(run())
+    assert status == 400
+    assert body["error"] == "Request body shorter than Content-Length."
+    assert counters["errors"] == 0
+
+
+def test_invalid_request_is_rejected():
+    async def run():
+        svc, server, port = await start()
+        status, _, body = await send(port, optimize_request({"engine": "nonsense", "unknown": 1}))
+        server.close()
+        svc.shutdown()
+        return status, body
+
+    status, body = asyncio.run(run())
+    assert status == 400
+    assert body["error"].startswith("Unknown options: unknown.")
+
+
+def test_full_queue_is_refused(gated_solve):
+    release, calls = gated_solve
+
+    async def run():
+        svc, server, port = await start(max_workers=1, max_pending=1)
+        first = asyncio.create_task(send(port, optimize_request({"time_limit": 1})))
+        await wait_for(lambda: calls)
+        refused = await send(port, optimize_request({"time_limit": 2}))
+        release.set()
+        answered = await first
+        server.close()
+        svc.shutdown()
+        return refused, answered, svc.counters
+
+    refused, answered, counters = asyncio.run(run())
+    assert refused[0] == 503
+    assert refused[1]["Retry-After"] == "1"
+    assert answered[0] == 200
+    assert counters["rejected"] == 1
+
+
+def test_identical_requests_share_one_solve(gated_solve):
+    release, calls = gated_solve
+
+    async def run():
+        svc, server, port = await start(max_workers=2)
+        tasks = [asyncio.create_task(send(port, optimize_request({"time_limit": 5}))) for _ in range(3)]
+        await wait_for(lambda: svc.counters["coalesced"] == 2)
+        release.set()
+        responses = await asyncio.gather(*tasks)
+        # Answered from the cache once the solve is done
+        cached = await send(port, optimize_request({"time_limit": 5}))
+        server.close()
+        svc.shutdown()
+        return responses, cached, svc.counters
+
+    responses, cached, counters = asyncio.run(run())
+    assert [status for status, _, _ in responses] == [200, 200, 200]
+    assert all(body == responses[0][2] for _, _, body in responses + [cached])
+    assert len(calls) == 1
+    assert counters["solves"] == 1 and counters["coalesced"] == 2 and counters["cache_hits"] == 1